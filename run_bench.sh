@@ -0,0 +1 @@
+python -m src.bench_api "$@"
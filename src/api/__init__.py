@@ -1,13 +1,36 @@
 """Public API functions for student data access."""
 
+from .add_score import add_score
+from .compact_score_log import compact_score_log
 from .get_avg_overall_score import get_avg_overall_score
 from .get_avg_score import get_avg_score
+from .get_avg_score_many import get_avg_score_many
+from .get_data_version import get_data_version
+from .get_score_histogram import get_score_histogram
+from .get_score_percentiles import get_score_percentiles
 from .get_top_students import get_top_students
+from .get_top_students_many import get_top_students_many
+from .get_top_students_page import get_top_students_page, iter_top_students
+from .query_students import query_students
+from .upsert_score import upsert_score
 from .vector_search import vector_search
+from .vector_search_many import vector_search_many
 
 __all__ = [
     'get_top_students',
+    'get_top_students_many',
+    'get_top_students_page',
+    'iter_top_students',
     'get_avg_score',
+    'get_avg_score_many',
     'get_avg_overall_score',
+    'get_score_percentiles',
+    'get_score_histogram',
+    'query_students',
+    'add_score',
+    'upsert_score',
+    'compact_score_log',
+    'get_data_version',
     'vector_search',
+    'vector_search_many',
 ]
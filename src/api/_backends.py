@@ -0,0 +1,79 @@
+"""Storage backends for students data."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Protocol
+
+from . import _common
+from ._index import get_students_index
+from ._query import QueryStats, RankingKey, StudentsQuery
+from ._sketches import SubjectSketches
+
+
+class StudentsBackend(Protocol):
+    """Source of students rows and score aggregates."""
+
+    def load(self) -> Sequence[dict[str, str]]: ...
+
+    def avg_score(self, subject_name: str) -> float | None: ...
+
+    def avg_overall_score(self) -> float | None: ...
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]: ...
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]: ...
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats: ...
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches: ...
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]: ...
+
+
+class CsvBackend:
+    """Students from students.csv or its columnar copy, aggregated in memory."""
+
+    def load(self) -> Sequence[dict[str, str]]:
+        return _common.load_students_file_rows()
+
+    def avg_score(self, subject_name: str) -> float | None:
+        return get_students_index(self.load()).avg_score(subject_name)
+
+    def avg_overall_score(self) -> float | None:
+        return get_students_index(self.load()).avg_overall_score()
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        return get_students_index(self.load()).top_students(subject_name, k)
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        return get_students_index(self.load()).query_rows(query)
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        return get_students_index(self.load()).query_stats(query)
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        return get_students_index(self.load()).score_sketches(subject_name)
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        return get_students_index(self.load()).ranking_page(subject_name, after, size)
+
+
+_CSV_BACKEND = CsvBackend()
+
+
+def get_backend() -> StudentsBackend:
+    """Return backend selected by STUDENTS_BACKEND."""
+    if _common.STUDENTS_BACKEND == 'csv':
+        return _CSV_BACKEND
+    if _common.STUDENTS_BACKEND == 'sqlite':
+        from ._sqlite import get_sqlite_backend
+
+        return get_sqlite_backend(_common.STUDENTS_DB)
+    raise RuntimeError(
+        f'students backend // unknown backend: {_common.STUDENTS_BACKEND!r}'
+    )
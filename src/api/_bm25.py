@@ -0,0 +1,128 @@
+"""BM25 inverted index over RAG chunks, written by prepare_data."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# crude stemming: Russian word forms mostly differ in endings, so terms are
+# cut to a prefix ('теории' and 'теория' both become 'теори')
+TERM_PREFIX = 5
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word prefixes, ё is folded into е."""
+    return [
+        token[:TERM_PREFIX]
+        for token in _TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+def build_bm25_arrays(
+    chunks: list[str], k1: float = BM25_K1, b: float = BM25_B
+) -> dict[str, np.ndarray]:
+    """
+    Build postings with precomputed BM25 weights.
+
+    Postings of terms[i] are doc_ids/weights[term_offsets[i]:term_offsets[i+1]],
+    so a query only sums weights of its terms' postings.
+    """
+    counts: list[dict[str, int]] = []
+    for chunk in chunks:
+        doc_counts: dict[str, int] = {}
+        for term in tokenize(chunk):
+            doc_counts[term] = doc_counts.get(term, 0) + 1
+        counts.append(doc_counts)
+
+    n_docs = len(chunks)
+    doc_lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+    avg_length = float(doc_lengths.mean()) if n_docs and doc_lengths.any() else 1.0
+    postings: dict[str, list[tuple[int, int]]] = {}
+    for doc_id, doc_counts in enumerate(counts):
+        for term, tf in doc_counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    doc_ids: list[int] = []
+    weights: list[float] = []
+    for idx, term in enumerate(terms):
+        term_postings = postings[term]
+        df = len(term_postings)
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc_id, tf in term_postings:
+            norm = k1 * (1.0 - b + b * doc_lengths[doc_id] / avg_length)
+            doc_ids.append(doc_id)
+            weights.append(idf * tf * (k1 + 1.0) / (tf + norm))
+        term_offsets[idx + 1] = len(doc_ids)
+
+    return {
+        'terms': np.array(terms, dtype=str),
+        'term_offsets': term_offsets,
+        'doc_ids': np.array(doc_ids, dtype=np.int32),
+        'weights': np.array(weights, dtype=np.float32),
+        'n_docs': np.array(n_docs, dtype=np.int64),
+    }
+
+
+@dataclass(frozen=True, eq=False)
+class Bm25Index:
+    """Read-only BM25 postings, searched without network or FAISS."""
+
+    terms: dict[str, int]
+    term_offsets: np.ndarray
+    doc_ids: np.ndarray
+    weights: np.ndarray
+    n_docs: int
+
+    def search(self, query: str, k: int) -> list[int]:
+        """Return up to k ids of chunks sharing terms with query, best first."""
+        term_ids = [
+            self.terms[term] for term in set(tokenize(query)) if term in self.terms
+        ]
+        if not term_ids or k < 1:
+            return []
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.term_offsets[term_id : term_id + 2].tolist()
+            # doc ids are unique within one term's postings
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        matched = np.flatnonzero(scores)
+        # stable sort keeps lower chunk ids first on equal scores
+        order = np.argsort(-scores[matched], kind='stable')[:k]
+        return matched[order].tolist()
+
+
+def load_bm25_index(path: Path) -> Bm25Index:
+    """Read BM25 arrays written by prepare_data and check they are consistent."""
+    try:
+        with np.load(path) as arrays:
+            terms = arrays['terms']
+            term_offsets = arrays['term_offsets']
+            doc_ids = arrays['doc_ids']
+            weights = arrays['weights']
+            n_docs = int(arrays['n_docs'])
+    except (KeyError, OSError, ValueError) as exc:
+        raise RuntimeError('vector_search // failed to read BM25 index') from exc
+
+    if (
+        term_offsets.shape != (len(terms) + 1,)
+        or int(term_offsets[-1]) != len(doc_ids)
+        or doc_ids.shape != weights.shape
+        or (len(doc_ids) and not 0 <= int(doc_ids.max()) < n_docs)
+    ):
+        raise RuntimeError('vector_search // BM25 index arrays do not match')
+    return Bm25Index(
+        {str(term): idx for idx, term in enumerate(terms)},
+        term_offsets,
+        doc_ids,
+        weights,
+        n_docs,
+    )
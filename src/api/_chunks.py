@@ -0,0 +1,86 @@
+"""Memory-mapped RAG chunks and flat vectors written by prepare_data."""
+
+from __future__ import annotations
+
+import mmap
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class ChunkStore(Sequence):
+    """
+    Chunks as one UTF-8 blob and n + 1 byte offsets.
+
+    Both files are mapped read-only, so worker processes share one copy of
+    the text in the page cache and only requested chunks are decoded.
+    """
+
+    blob: mmap.mmap
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0]) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('chunks index out of range')
+        start, end = self.offsets[idx : idx + 2].tolist()
+        return self.blob[start:end].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[idx] for idx in range(len(self)))
+
+
+def load_chunk_store(blob_path: Path, offsets_path: Path) -> ChunkStore:
+    """Map chunks blob and offsets, check that offsets fit the blob."""
+    offsets = np.load(offsets_path, mmap_mode='r')
+    with blob_path.open('rb') as file:
+        blob = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if (
+        offsets.ndim != 1
+        or not len(offsets)
+        or offsets[0] != 0
+        or int(offsets[-1]) != len(blob)
+    ):
+        raise RuntimeError('vector_search // chunks offsets do not match blob')
+    return ChunkStore(blob, offsets)
+
+
+@dataclass(frozen=True, eq=False)
+class MmapFlatIndex:
+    """
+    Exact L2 search over memory-mapped vectors, same results as IndexFlatL2.
+
+    faiss.read_index copies flat codes into process memory, while a mapped
+    .npy file is shared by all processes and opens in constant time.
+    """
+
+    vectors: np.ndarray
+
+    @property
+    def d(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @property
+    def ntotal(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        import faiss
+
+        return faiss.knn(queries, self.vectors, k)
+
+
+def load_flat_vectors(vectors_path: Path) -> MmapFlatIndex:
+    vectors = np.load(vectors_path, mmap_mode='r')
+    if vectors.ndim != 2 or vectors.dtype != np.float32:
+        raise RuntimeError('vector_search // flat vectors must be 2D float32')
+    return MmapFlatIndex(vectors)
@@ -0,0 +1,85 @@
+"""Memory-mapped columnar students data written by prepare_data."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from . import _common
+
+COLUMN_NAMES = (
+    'student_names',
+    'subject_names',
+    'student_codes',
+    'subject_codes',
+    'scores',
+)
+
+
+@dataclass(frozen=True, eq=False)
+class StudentsColumns(Sequence):
+    """
+    Dictionary-encoded students table.
+
+    student_names/subject_names are sorted dictionaries, so code order equals
+    name order. Behaves as a read-only sequence of students.csv-like rows.
+    """
+
+    student_names: np.ndarray
+    subject_names: np.ndarray
+    student_codes: np.ndarray
+    subject_codes: np.ndarray
+    scores: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return {
+            'student_name': str(self.student_names[self.student_codes[idx]]),
+            'subject_name': str(self.subject_names[self.subject_codes[idx]]),
+            'score': f'{float(self.scores[idx]):.1f}',
+        }
+
+    def score_index(self):
+        """Return vectorized aggregates over these columns."""
+        from ._vectorized import ColumnarIndex
+
+        return ColumnarIndex(self)
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        student_names = self.student_names.tolist()
+        subject_names = self.subject_names.tolist()
+        for student_code, subject_code, score in zip(
+            self.student_codes.tolist(),
+            self.subject_codes.tolist(),
+            self.scores.tolist(),
+        ):
+            yield {
+                'student_name': student_names[student_code],
+                'subject_name': subject_names[subject_code],
+                'score': f'{score:.1f}',
+            }
+
+
+def load_students_columns(columns_dir: Path) -> StudentsColumns:
+    """
+    Open columnar students files with np.load(mmap_mode='r').
+
+    meta.json names the directory of the current version, files of a version
+    are never rewritten; partition directories hold the files directly.
+    """
+    meta = _common._read_meta(columns_dir / 'meta.json') or {}
+    data_dir = columns_dir / meta.get('data_dir', '')
+    arrays = {
+        name: np.load(data_dir / f'{name}.npy', mmap_mode='r') for name in COLUMN_NAMES
+    }
+    rows_count = arrays['scores'].shape[0]
+    if any(arrays[name].shape[0] != rows_count for name in COLUMN_NAMES[2:]):
+        raise RuntimeError('students columns // columns have different lengths')
+    return StudentsColumns(**arrays)
@@ -1,17 +1,166 @@
-"""Shared helpers for working with students CSV."""
+"""Shared helpers for working with students data."""
 
 from __future__ import annotations
 
 import csv
+import json
+import os
+import threading
+import time
+from collections.abc import Sequence
 from pathlib import Path
 
 DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
 STUDENTS_CSV = DATA_DIR / 'students.csv'
+STUDENTS_COLUMNS_DIR = DATA_DIR / 'students_columns'
+STUDENTS_PARTITIONS_DIR = DATA_DIR / 'students_partitions'
+STUDENTS_DB = DATA_DIR / 'students.db'
+STUDENTS_LOG = DATA_DIR / 'students_log.jsonl'
 
+# storage backend for students data: 'csv' (CSV or its columnar copy) or 'sqlite'
+STUDENTS_BACKEND = os.getenv('STUDENTS_BACKEND', 'csv')
 
-def load_students_rows() -> list[dict[str, str]]:
-    """Load all rows from students.csv."""
-    if not STUDENTS_CSV.exists():
-        return []
-    with STUDENTS_CSV.open('r', encoding='utf-8', newline='') as file:
+# seconds between file revalidations, 0 means stat on every call
+STUDENTS_CACHE_TTL = 1.0
+
+# score log size after which it is folded into the main store
+STUDENTS_LOG_COMPACT_BYTES = 1 << 20
+
+# worker processes for partitioned data, 0 means one per CPU
+STUDENTS_WORKERS = int(os.getenv('STUDENTS_WORKERS', '0'))
+# partitioned queries over fewer rows run in-process
+STUDENTS_PARALLEL_MIN_ROWS = 1_000_000
+
+# signatures of students CSV, columns meta.json and partitions.json
+Signature = tuple[tuple[int, int] | None, ...]
+
+# (signature, rows, checked_at) of the last loaded data, replaced as a whole
+_ROWS_CACHE: tuple[Signature | None, Sequence[dict[str, str]], float] = (
+    None,
+    [],
+    0.0,
+)
+_ROWS_LOCK = threading.Lock()
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) of file or None when it is missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _data_signature() -> Signature:
+    """Return signatures of students CSV, columns and partitions metadata."""
+    return (
+        _file_signature(STUDENTS_CSV),
+        _file_signature(STUDENTS_COLUMNS_DIR / 'meta.json'),
+        _file_signature(STUDENTS_PARTITIONS_DIR / 'partitions.json'),
+    )
+
+
+def _read_students_csv(path: Path) -> list[dict[str, str]]:
+    """Parse students CSV into list of rows."""
+    with path.open('r', encoding='utf-8', newline='') as file:
         return list(csv.DictReader(file))
+
+
+def _read_meta(path: Path) -> dict | None:
+    """Return metadata JSON or None when it is missing or malformed."""
+    try:
+        meta = json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return meta if isinstance(meta, dict) else None
+
+
+def _meta_fresh(meta: dict | None, csv_signature: tuple[int, int] | None) -> bool:
+    """Check that derived files were written from current CSV or there is none."""
+    if meta is None:
+        return False
+    source_signature = meta.get('source_signature')
+    return csv_signature is None or (
+        source_signature is not None and tuple(source_signature) == csv_signature
+    )
+
+
+def _read_students_data(signature: Signature) -> Sequence[dict[str, str]]:
+    """
+    Read students data from the fastest up-to-date source.
+
+    Partitions, then columnar files are used when they were written from
+    the current CSV (or there is no CSV at all), otherwise the CSV is parsed.
+    """
+    csv_signature, meta_signature, partitions_signature = signature
+    if partitions_signature is not None:
+        manifest = _read_meta(STUDENTS_PARTITIONS_DIR / 'partitions.json')
+        if _meta_fresh(manifest, csv_signature):
+            from ._partitions import load_students_partitions
+
+            return load_students_partitions(
+                STUDENTS_PARTITIONS_DIR, manifest, partitions_signature
+            )
+    if meta_signature is not None:
+        meta = _read_meta(STUDENTS_COLUMNS_DIR / 'meta.json')
+        if _meta_fresh(meta, csv_signature):
+            from ._columns import load_students_columns
+
+            return load_students_columns(STUDENTS_COLUMNS_DIR)
+    if csv_signature is None:
+        return []
+    return _read_students_csv(STUDENTS_CSV)
+
+
+def load_students_rows() -> Sequence[dict[str, str]]:
+    """
+    Load all rows from the configured students backend.
+
+    Rows are loaded once per data version and shared between callers,
+    so the returned sequence must be treated as read-only.
+    """
+    from ._backends import get_backend
+
+    return get_backend().load()
+
+
+def load_students_file_rows() -> Sequence[dict[str, str]]:
+    """
+    Load all rows from students files.
+
+    When partitioned or columnar files are up to date the result is
+    memory-mapped StudentsPartitions or StudentsColumns, otherwise parsed
+    CSV rows.
+    """
+    global _ROWS_CACHE
+
+    cached_signature, cached_rows, checked_at = _ROWS_CACHE
+    now = time.monotonic()
+    if cached_signature is not None and now - checked_at < STUDENTS_CACHE_TTL:
+        return cached_rows
+
+    signature = _data_signature()
+    if not any(signature):
+        return []
+    if cached_signature == signature:
+        _ROWS_CACHE = (cached_signature, cached_rows, now)
+        return cached_rows
+
+    with _ROWS_LOCK:
+        cached_signature, cached_rows, _ = _ROWS_CACHE
+        if cached_signature == signature:
+            return cached_rows
+        rows = _read_students_data(signature)
+        # data changed while being read: serve rows but do not cache them
+        if _data_signature() != signature:
+            return rows
+        _ROWS_CACHE = (signature, rows, time.monotonic())
+        return rows
+
+
+def clear_students_cache() -> None:
+    """Drop cached students rows, next call re-reads the data."""
+    global _ROWS_CACHE
+    with _ROWS_LOCK:
+        _ROWS_CACHE = (None, [], 0.0)
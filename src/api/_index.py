@@ -0,0 +1,240 @@
+"""Precomputed aggregates over students rows."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Protocol
+
+from ._log import apply_score_log
+from ._query import (
+    QueryStats,
+    RankingKey,
+    SkipKeys,
+    StudentsQuery,
+    entries_stats,
+    ranking_key,
+    select_entries,
+)
+from ._sketches import ScoreHistogram, SubjectSketches, TDigest, merge_sketches
+
+
+class ScoreIndex(Protocol):
+    """Aggregates needed by the students API functions."""
+
+    def avg_score(self, subject_name: str) -> float | None: ...
+
+    def avg_overall_score(self) -> float | None: ...
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]: ...
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]: ...
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]: ...
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]: ...
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats: ...
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches: ...
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]: ...
+
+
+@dataclass(frozen=True)
+class StudentsIndex:
+    """Per-subject sums, counts and rankings built once per data version."""
+
+    subject_sums: dict[str, float]
+    subject_counts: dict[str, int]
+    total_sum: float
+    total_count: int
+    rankings: dict[str, list[tuple[str, float]]]
+    entries: list[tuple[int, str, str, float]]
+    sketches: dict[str, SubjectSketches]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict[str, str]]) -> StudentsIndex:
+        """Build index from students rows."""
+        all_scores: list[float] = []
+        subject_scores: dict[str, list[float]] = {}
+        rankings: dict[str, list[tuple[str, float]]] = {}
+        entries: list[tuple[int, str, str, float]] = []
+        for row_idx, row in enumerate(rows):
+            score = float(row['score'])
+            subject_name = row.get('subject_name')
+            all_scores.append(score)
+            if subject_name is None:
+                continue
+            entries.append((row_idx, row['student_name'], subject_name, score))
+            subject_scores.setdefault(subject_name, []).append(score)
+            rankings.setdefault(subject_name, []).append((row['student_name'], score))
+
+        for ranking in rankings.values():
+            ranking.sort(key=ranking_key)
+
+        sketches = {
+            name: (
+                TDigest.from_sorted([score for _, score in reversed(ranking)]),
+                ScoreHistogram.from_values(subject_scores[name]),
+            )
+            for name, ranking in rankings.items()
+        }
+
+        # builtin sum in row order keeps averages identical to a plain scan
+        return cls(
+            subject_sums={name: sum(scores) for name, scores in subject_scores.items()},
+            subject_counts={
+                name: len(scores) for name, scores in subject_scores.items()
+            },
+            total_sum=sum(all_scores),
+            total_count=len(all_scores),
+            rankings=rankings,
+            entries=entries,
+            sketches=sketches,
+        )
+
+    def avg_score(self, subject_name: str) -> float | None:
+        """Return unrounded average for subject or None when it has no rows."""
+        count = self.subject_counts.get(subject_name, 0)
+        if not count:
+            return None
+        return self.subject_sums[subject_name] / count
+
+    def avg_overall_score(self) -> float | None:
+        """Return unrounded average across all rows or None when empty."""
+        if not self.total_count:
+            return None
+        return self.total_sum / self.total_count
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]:
+        """
+        Return (sum, count) of subject scores, of all rows for None.
+
+        Rows of (name, subject) pairs in skip are left out and tail scores
+        are added after the last row; one builtin sum runs over them in row
+        order, like a plain scan of the rows with tail appended.
+        """
+        scores = [
+            score
+            for _, name, row_subject, score in self.entries
+            if subject_name in (None, row_subject) and (name, row_subject) not in skip
+        ]
+        scores += tail
+        return sum(scores), len(scores)
+
+    @cached_property
+    def _scores_by_key(self) -> dict[tuple[str, str], list[float]]:
+        scores: dict[tuple[str, str], list[float]] = {}
+        for _, name, subject_name, score in self.entries:
+            scores.setdefault((name, subject_name), []).append(score)
+        return scores
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]:
+        """Return scores of student rows in subject, in row order."""
+        return list(self._scores_by_key.get((name, subject_name), ()))
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        """Return first k (name, score) pairs of subject ranking."""
+        return self.rankings.get(subject_name, [])[:k]
+
+    def _ranked_entries(
+        self, query: StudentsQuery
+    ) -> list[tuple[int, str, str, float]]:
+        """Walk presorted subject ranking and stop after limit matches."""
+        subject_name = query.subject_name
+        selected: list[tuple[int, str, str, float]] = []
+        for rank, (name, score) in enumerate(self.rankings.get(subject_name, [])):
+            if len(selected) >= query.limit:
+                break
+            if query.matches(name, subject_name, score):
+                selected.append((rank, name, subject_name, score))
+        return selected
+
+    def _select(self, query: StudentsQuery) -> list[tuple[int, str, str, float]]:
+        if (
+            query.subject_name is not None
+            and query.order_by == 'score_desc'
+            and query.limit is not None
+        ):
+            return self._ranked_entries(query)
+        return select_entries(self.entries, query)
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        """Return (name, subject, score) rows selected by query."""
+        return [entry[1:] for entry in self._select(query)]
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        """Return (count, sum, min, max) of scores selected by query."""
+        return entries_stats(self._select(query))
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        """Return (digest, histogram) of subject, of all subjects for None."""
+        if subject_name is None:
+            return merge_sketches(self.sketches.values())
+        return self.sketches.get(subject_name, (None, None))
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        """Return next size ranking items after key, bisecting the ranking."""
+        ranking = self.rankings.get(subject_name, [])
+        start = 0
+        if after is not None:
+            score, name, seen = after
+            low = bisect_left(ranking, (-score, name), key=ranking_key)
+            high = bisect_right(ranking, (-score, name), key=ranking_key)
+            start = low + min(seen, high - low)
+        return ranking[start : start + max(size, 0)]
+
+
+# (rows, index) of the last built index, replaced as a whole
+_INDEX_CACHE: tuple[Sequence[dict[str, str]] | None, ScoreIndex | None] = (
+    None,
+    None,
+)
+_INDEX_LOCK = threading.Lock()
+
+
+def _build_index(rows: Sequence[dict[str, str]]) -> ScoreIndex:
+    """
+    Use index provided by rows source, build pure-Python one otherwise.
+
+    Columnar data and database backends expose score_index() to answer
+    queries natively instead of scanning rows.
+    """
+    score_index = getattr(rows, 'score_index', None)
+    if score_index is not None:
+        return score_index()
+    return StudentsIndex.from_rows(rows)
+
+
+def get_students_index(rows: Sequence[dict[str, str]]) -> ScoreIndex:
+    """
+    Return aggregates for rows, reusing the last index for the same rows object.
+
+    load_students_rows returns one shared sequence per data version, so
+    identity is enough to detect a data change. Entries of the score log
+    are applied on top of the index.
+    """
+    global _INDEX_CACHE
+
+    cached_rows, cached_index = _INDEX_CACHE
+    if cached_rows is rows and cached_index is not None:
+        return apply_score_log(rows, cached_index)
+
+    with _INDEX_LOCK:
+        cached_rows, cached_index = _INDEX_CACHE
+        if cached_rows is not rows or cached_index is None:
+            cached_index = _build_index(rows)
+            _INDEX_CACHE = (rows, cached_index)
+    return apply_score_log(rows, cached_index)
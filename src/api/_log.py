@@ -0,0 +1,581 @@
+"""Append-only log of score updates served on top of the main students store."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, the log is then locked per process only
+    fcntl = None
+
+from . import _common
+from ._query import (
+    QueryStats,
+    RankingKey,
+    SkipKeys,
+    StudentsQuery,
+    order_key,
+    ranking_key,
+    select_entries,
+)
+from ._sketches import ScoreHistogram, SubjectSketches, TDigest, merge_sketches
+
+if TYPE_CHECKING:
+    from ._index import ScoreIndex
+
+LOG_OPS = ('add', 'upsert')
+
+# (op, student_name, subject_name, score)
+LogEntry = tuple[str, str, str, float]
+
+
+class LoggedIndex:
+    """
+    Index of the main store with score log entries applied in place.
+
+    Each entry costs a sorted insert into the subject ranking; base rows
+    replaced by an upsert are looked up by (name, subject) once. Queries
+    merge base results with the log rows, so nothing is rebuilt when a score
+    arrives. Averages are summed again over the merged rows in row order
+    after a change of the subject, like a scan of the compacted store would.
+    Entries read after the index was published are applied to a copy,
+    readers never see a half-applied one.
+    """
+
+    def __init__(self, base: ScoreIndex):
+        self.base = base
+        # log rows by sequence number, dict order is log order
+        self.rows: dict[int, tuple[str, str, float]] = {}
+        self.positions: dict[tuple[str, str], list[int]] = {}
+        self.rankings: dict[str, list[tuple[str, float]]] = {}
+        # (name, subject) pairs whose base rows are hidden by an upsert
+        self.replaced: set[tuple[str, str]] = set()
+        # subject -> Counter of hidden base (name, score) items
+        self.removed: dict[str, Counter] = {}
+        # subject, None for all rows -> (sum, count) of merged rows, dropped
+        # when a log entry changes them
+        self.sums: dict[str | None, tuple[float, int]] = {}
+        self._sequence = 0
+
+    def copy(self) -> LoggedIndex:
+        """Return independent copy sharing only the immutable base index."""
+        logged = LoggedIndex(self.base)
+        logged.rows = dict(self.rows)
+        logged.positions = {key: list(items) for key, items in self.positions.items()}
+        logged.rankings = {name: list(items) for name, items in self.rankings.items()}
+        logged.replaced = set(self.replaced)
+        logged.removed = {name: Counter(items) for name, items in self.removed.items()}
+        logged.sums = dict(self.sums)
+        logged._sequence = self._sequence
+        return logged
+
+    def _replace(self, name: str, subject_name: str) -> None:
+        """Hide base and log rows of student in subject."""
+        if (name, subject_name) not in self.replaced:
+            self.replaced.add((name, subject_name))
+            removed = self.removed.setdefault(subject_name, Counter())
+            for score in self.base.student_scores(name, subject_name):
+                removed[(name, score)] += 1
+
+        for sequence in self.positions.pop((name, subject_name), []):
+            _, _, score = self.rows.pop(sequence)
+            self.rankings[subject_name].remove((name, score))
+
+    def apply(self, op: str, name: str, subject_name: str, score: float) -> None:
+        """Apply one log entry."""
+        self.sums.pop(subject_name, None)
+        self.sums.pop(None, None)
+        if op == 'upsert':
+            self._replace(name, subject_name)
+        self._sequence += 1
+        self.rows[self._sequence] = (name, subject_name, score)
+        self.positions.setdefault((name, subject_name), []).append(self._sequence)
+        insort(
+            self.rankings.setdefault(subject_name, []),
+            (name, score),
+            key=ranking_key,
+        )
+
+    def _removed_rows(self, query: StudentsQuery) -> Counter:
+        """Return hidden base rows selected by query filters."""
+        return Counter(
+            {
+                (name, subject_name, score): count
+                for subject_name, removed in self.removed.items()
+                for (name, score), count in removed.items()
+                if query.matches(name, subject_name, score)
+            }
+        )
+
+    def _touched(self, subject_name: str) -> bool:
+        return subject_name in self.rankings
+
+    def _average(self, subject_name: str | None) -> float | None:
+        if subject_name is not None and not self._touched(subject_name):
+            return self.base.avg_score(subject_name)
+        if subject_name is None and not self.rows and not self.replaced:
+            return self.base.avg_overall_score()
+        total = self.sums.get(subject_name)
+        if total is None:
+            total = self.sums[subject_name] = self.score_sum(subject_name)
+        total_sum, count = total
+        return total_sum / count if count else None
+
+    def avg_score(self, subject_name: str) -> float | None:
+        return self._average(subject_name)
+
+    def avg_overall_score(self) -> float | None:
+        return self._average(None)
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]:
+        """Sum base rows without replaced ones, then log rows in log order."""
+        log_scores = [
+            score
+            for name, row_subject, score in self.rows.values()
+            if subject_name in (None, row_subject) and (name, row_subject) not in skip
+        ]
+        return self.base.score_sum(
+            subject_name, self.replaced.union(skip), [*log_scores, *tail]
+        )
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]:
+        """Return base scores unless hidden by an upsert, then log scores."""
+        scores = []
+        if (name, subject_name) not in self.replaced:
+            scores = self.base.student_scores(name, subject_name)
+        positions = self.positions.get((name, subject_name), [])
+        return scores + [self.rows[sequence][2] for sequence in positions]
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        return self.ranking_page(subject_name, None, k)
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        """Merge base ranking page without hidden rows with log ranking."""
+        if not self._touched(subject_name):
+            return self.base.ranking_page(subject_name, after, size)
+        if size < 1:
+            return []
+
+        removed = Counter(self.removed.get(subject_name, ()))
+        extra = sum(removed.values())
+        ranking = self.rankings.get(subject_name, [])
+        seen = 0
+        if after is None:
+            base_items = self.base.ranking_page(subject_name, None, size + extra)
+            start = 0
+        else:
+            score, name, seen = after
+            base_items = self.base.ranking_page(
+                subject_name, (score, name, 0), size + seen + extra
+            )
+            start = bisect_left(ranking, (-score, name), key=ranking_key)
+
+        kept: list[tuple[str, float]] = []
+        for item in base_items:
+            if removed[item] > 0:
+                removed[item] -= 1
+                continue
+            kept.append(item)
+        merged = list(
+            heapq.merge(kept, ranking[start : start + size + seen], key=ranking_key)
+        )
+
+        skip = 0
+        if after is not None:
+            while skip < min(seen, len(merged)) and merged[skip] == (name, score):
+                skip += 1
+        return merged[skip : skip + size]
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        """Merge base rows without hidden ones with log rows, base first on ties."""
+        removed = self._removed_rows(query)
+        base_query = query
+        if removed and query.limit is not None:
+            base_query = replace(query, limit=query.limit + sum(removed.values()))
+
+        entries: list[tuple[int, str, str, float]] = []
+        for row in self.base.query_rows(base_query):
+            if removed[row] > 0:
+                removed[row] -= 1
+                continue
+            entries.append((0, *row))
+        log_entries = [(1, *row) for row in self.rows.values()]
+        entries += select_entries(log_entries, query)
+
+        entries.sort(key=order_key(query.order_by))
+        if query.limit is not None:
+            entries = entries[: max(query.limit, 0)]
+        return [entry[1:] for entry in entries]
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        if query.limit is not None or self._removed_rows(query):
+            scores = [score for _, _, score in self.query_rows(query)]
+            if not scores:
+                return 0, 0.0, None, None
+            return len(scores), sum(scores), min(scores), max(scores)
+
+        count, total, min_score, max_score = self.base.query_stats(query)
+        for name, subject_name, score in self.rows.values():
+            if not query.matches(name, subject_name, score):
+                continue
+            count += 1
+            total += score
+            min_score = score if min_score is None else min(min_score, score)
+            max_score = score if max_score is None else max(max_score, score)
+        return count, total, min_score, max_score
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        """Merge base sketches with log sketches, rebuild when rows were hidden."""
+        if subject_name is None:
+            hidden = any(self.removed.values())
+            log_scores = [score for _, _, score in self.rows.values()]
+        elif not self._touched(subject_name):
+            return self.base.score_sketches(subject_name)
+        else:
+            hidden = bool(self.removed.get(subject_name))
+            log_scores = [score for _, score in self.rankings.get(subject_name, [])]
+
+        if hidden:
+            query = StudentsQuery(subject_name=subject_name, order_by='score_asc')
+            scores = [score for _, _, score in self.query_rows(query)]
+            if not scores:
+                return None, None
+            return TDigest.from_sorted(scores), ScoreHistogram.from_values(scores)
+        if not log_scores:
+            return self.base.score_sketches(subject_name)
+        return merge_sketches(
+            [
+                self.base.score_sketches(subject_name),
+                (
+                    TDigest.from_values(log_scores),
+                    ScoreHistogram.from_values(log_scores),
+                ),
+            ]
+        )
+
+
+def merge_log_rows(
+    rows: Iterable[dict[str, str]], entries: Iterable[LogEntry]
+) -> list[dict[str, str]]:
+    """Return store rows with log entries applied, log rows go last."""
+    replaced: set[tuple[str, str]] = set()
+    log_rows: dict[int, tuple[str, str, float]] = {}
+    positions: dict[tuple[str, str], list[int]] = {}
+    for sequence, (op, name, subject_name, score) in enumerate(entries):
+        if op == 'upsert':
+            replaced.add((name, subject_name))
+            for position in positions.pop((name, subject_name), []):
+                del log_rows[position]
+        log_rows[sequence] = (name, subject_name, score)
+        positions.setdefault((name, subject_name), []).append(sequence)
+
+    merged = [
+        {
+            'student_name': row['student_name'],
+            'subject_name': row['subject_name'],
+            'score': row['score'],
+        }
+        for row in rows
+        if (row['student_name'], row['subject_name']) not in replaced
+    ]
+    merged += [
+        {'student_name': name, 'subject_name': subject_name, 'score': f'{score:.1f}'}
+        for name, subject_name, score in log_rows.values()
+    ]
+    return merged
+
+
+def _store_signature() -> list | None:
+    """Return JSON-ready signature of the main store the log applies to."""
+    if _common.STUDENTS_BACKEND == 'sqlite':
+        signature = _common._file_signature(_common.STUDENTS_DB)
+    else:
+        signatures = [item for item in _common._data_signature() if item is not None]
+        signature = signatures[0] if signatures else None
+    return None if signature is None else list(signature)
+
+
+def _log_state() -> tuple[int, int] | None:
+    """Return (inode, size) of log file or None when it is missing."""
+    try:
+        stat = _common.STUDENTS_LOG.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size
+
+
+def _parse_entry(line: bytes) -> LogEntry:
+    try:
+        entry = json.loads(line)
+        return (
+            entry['op'],
+            entry['student_name'],
+            entry['subject_name'],
+            float(entry['score']),
+        )
+    except (ValueError, KeyError, TypeError) as ex:
+        raise RuntimeError(f'score log // malformed entry: {line[:200]!r}') from ex
+
+
+def _read_log(offset: int) -> tuple[dict | None, list[LogEntry], int]:
+    """
+    Read complete log lines from byte offset.
+
+    Returns (header, entries, new offset); header is only read at offset 0.
+    A trailing line without newline is being written and is left for later.
+    """
+    try:
+        with _common.STUDENTS_LOG.open('rb') as file:
+            file.seek(offset)
+            data = file.read()
+    except FileNotFoundError:
+        return None, [], 0
+    end = data.rfind(b'\n') + 1
+    lines = data[:end].splitlines()
+    header = None
+    if offset == 0 and lines:
+        try:
+            header = json.loads(lines.pop(0))
+        except ValueError:
+            header = None
+    entries = [_parse_entry(line) for line in lines if line.strip()]
+    return header, entries, offset + end
+
+
+def _read_log_header() -> dict | None:
+    """Read only the first log line."""
+    try:
+        with _common.STUDENTS_LOG.open('rb') as file:
+            first_line = file.readline()
+    except FileNotFoundError:
+        return None
+    try:
+        return json.loads(first_line)
+    except ValueError:
+        return None
+
+
+def _log_matches_store(header: dict | None) -> bool:
+    return isinstance(header, dict) and header.get('base') == _store_signature()
+
+
+# (rows, logged index or None, store signature, log state, offset, checked_at)
+_LOG_CACHE: tuple = (None, None, None, None, 0, 0.0)
+_LOG_LOCK = threading.Lock()
+# background thread folding the log into the main store
+_COMPACTION: threading.Thread | None = None
+
+
+def _refresh(rows: Sequence[dict[str, str]], index: ScoreIndex) -> ScoreIndex:
+    """Tail the log into the cached index, re-read it when store or log changed."""
+    global _LOG_CACHE
+
+    cached_rows, logged, cached_store, cached_state, offset, _ = _LOG_CACHE
+    store = _store_signature()
+    state = _log_state()
+    now = time.monotonic()
+    if cached_rows is rows and cached_store == store and cached_state == state:
+        _LOG_CACHE = (rows, logged, store, state, offset, now)
+        return logged or index
+
+    reuse = (
+        cached_rows is rows
+        and cached_store == store
+        and logged is not None
+        and state is not None
+        and cached_state is not None
+        and state[0] == cached_state[0]
+        and state[1] >= offset
+    )
+    if reuse:
+        _, entries, offset = _read_log(offset)
+        # readers may hold the published index, new entries go to a copy
+        if entries:
+            logged = logged.copy()
+    else:
+        header, entries, offset = _read_log(0)
+        logged = LoggedIndex(index) if _log_matches_store(header) else None
+        if logged is None:
+            entries = []
+
+    if logged is not None:
+        for entry in entries:
+            logged.apply(*entry)
+    _LOG_CACHE = (rows, logged, store, state, offset, now)
+    return logged or index
+
+
+def apply_score_log(rows: Sequence[dict[str, str]], index: ScoreIndex) -> ScoreIndex:
+    """
+    Return index with score log applied, index itself when there is no log.
+
+    The log is revalidated at most once per STUDENTS_CACHE_TTL, writes of
+    this process reset the timer so they are visible to the next call.
+    """
+    cached_rows, logged, _, _, _, checked_at = _LOG_CACHE
+    if (
+        cached_rows is rows
+        and time.monotonic() - checked_at < _common.STUDENTS_CACHE_TTL
+    ):
+        return logged or index
+    with _LOG_LOCK:
+        return _refresh(rows, index)
+
+
+def _expire_log_cache() -> None:
+    global _LOG_CACHE
+    _LOG_CACHE = (*_LOG_CACHE[:5], 0.0)
+
+
+@contextmanager
+def _locked_log() -> Iterator[None]:
+    """
+    Hold _LOG_LOCK and an exclusive lock of the log lock file.
+
+    The file lock keeps writers of other processes from appending to a log
+    that is being started again or compacted.
+    """
+    log_path = _common.STUDENTS_LOG
+    with _LOG_LOCK, log_path.with_name(log_path.name + '.lock').open('ab') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def _start_log() -> None:
+    """Replace missing or outdated log with an empty one for current store."""
+    log_path = _common.STUDENTS_LOG
+    tmp_path = log_path.with_name(log_path.name + '.tmp')
+    tmp_path.write_text(
+        json.dumps({'base': _store_signature()}) + '\n', encoding='utf-8'
+    )
+    tmp_path.replace(log_path)
+
+
+def append_score(op: str, student_name: str, subject_name: str, score: float) -> float:
+    """
+    Append entry to the score log and return the stored score.
+
+    Scores are stored with one decimal like in students.csv. Once the log
+    exceeds STUDENTS_LOG_COMPACT_BYTES it is compacted into the main store
+    by a background thread, the caller does not wait for it.
+    """
+    if op not in LOG_OPS:
+        raise ValueError(f'op must be one of {LOG_OPS}')
+    if not student_name.strip() or not subject_name.strip():
+        raise ValueError('student_name and subject_name must be non-empty')
+    score = float(score)
+    if not math.isfinite(score):
+        raise ValueError('score must be a finite number')
+    score = round(score, 1)
+
+    line = json.dumps(
+        {
+            'op': op,
+            'student_name': student_name,
+            'subject_name': subject_name,
+            'score': score,
+        },
+        ensure_ascii=False,
+    )
+    with _locked_log():
+        if not _log_matches_store(_read_log_header()):
+            _start_log()
+        with _common.STUDENTS_LOG.open('ab') as file:
+            file.write(line.encode('utf-8') + b'\n')
+            file.flush()
+            os.fsync(file.fileno())
+            size = file.tell()
+        _expire_log_cache()
+    if size > _common.STUDENTS_LOG_COMPACT_BYTES:
+        _compact_in_background()
+    return score
+
+
+def _write_store(rows: list[dict[str, str]]) -> None:
+    """
+    Replace the main store of current backend with rows.
+
+    Every writer builds the new store off to the side and swaps it in, so
+    readers that mapped the old columns or partitions keep valid data.
+    """
+    from src.prepare_data import (
+        write_students_columns,
+        write_students_csv,
+        write_students_db,
+        write_students_partitions,
+    )
+
+    if _common.STUDENTS_BACKEND == 'sqlite':
+        write_students_db(rows, _common.STUDENTS_DB)
+        return
+    has_columns = (_common.STUDENTS_COLUMNS_DIR / 'meta.json').exists()
+    manifest = _common._read_meta(_common.STUDENTS_PARTITIONS_DIR / 'partitions.json')
+    has_csv = _common.STUDENTS_CSV.exists()
+    if has_csv or not (has_columns or manifest):
+        write_students_csv(rows, _common.STUDENTS_CSV)
+    source_path = _common.STUDENTS_CSV if has_csv else None
+    if has_columns:
+        write_students_columns(rows, _common.STUDENTS_COLUMNS_DIR, source_path)
+    if manifest:
+        write_students_partitions(
+            rows,
+            _common.STUDENTS_PARTITIONS_DIR,
+            manifest.get('hash_buckets', 1),
+            source_path,
+        )
+
+
+def _compact() -> int:
+    """Fold log into the main store and drop it, caller holds _locked_log()."""
+    header, entries, _ = _read_log(0)
+    if not _log_matches_store(header):
+        _common.STUDENTS_LOG.unlink(missing_ok=True)
+        return 0
+    if entries:
+        _common.clear_students_cache()
+        _write_store(merge_log_rows(_common.load_students_rows(), entries))
+    _common.STUDENTS_LOG.unlink(missing_ok=True)
+    _common.clear_students_cache()
+    _expire_log_cache()
+    return len(entries)
+
+
+def compact_log() -> int:
+    """Fold score log into the main store, return number of folded entries."""
+    with _locked_log():
+        return _compact()
+
+
+def _compact_in_background() -> None:
+    """Start compaction thread unless one is running already."""
+    global _COMPACTION
+
+    with _LOG_LOCK:
+        if _COMPACTION is not None and _COMPACTION.is_alive():
+            return
+        _COMPACTION = threading.Thread(target=compact_log, name='score-log-compaction')
+        _COMPACTION.start()
+
+
+def wait_for_compaction(timeout: float | None = None) -> None:
+    """Wait until background compaction started by append_score finishes."""
+    compaction = _COMPACTION
+    if compaction is not None:
+        compaction.join(timeout)
@@ -0,0 +1,279 @@
+"""Students data partitioned by subject, aggregated by scatter-gather."""
+
+from __future__ import annotations
+
+import heapq
+import multiprocessing
+import os
+import threading
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+
+from . import _common
+from ._columns import StudentsColumns, load_students_columns
+from ._query import (
+    QueryStats,
+    RankingKey,
+    SkipKeys,
+    StudentsQuery,
+    order_key,
+    ranking_key,
+)
+from ._sketches import SubjectSketches, merge_sketches
+from ._vectorized import ColumnarIndex, iter_floats
+
+
+@dataclass(frozen=True, eq=False)
+class StudentsPartitions(Sequence):
+    """
+    Students split into per-subject (and per student hash bucket) columns.
+
+    Row order is partition order from partitions.json, then row order inside
+    a partition. A student always lands in one bucket of a subject, so all
+    rows with the same (subject, student) are in one partition.
+    """
+
+    version: tuple[int, int]
+    part_dirs: tuple[Path, ...]
+    subjects: tuple[str, ...]
+    parts: tuple[StudentsColumns, ...]
+    # cumulative row offsets of partitions, len(parts) + 1 items
+    offsets: tuple[int, ...]
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('students index out of range')
+        part = bisect_right(self.offsets, idx) - 1
+        return self.parts[part][idx - self.offsets[part]]
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        return chain.from_iterable(self.parts)
+
+    def score_index(self) -> PartitionedIndex:
+        """Return scatter-gather aggregates over partitions."""
+        return PartitionedIndex(self)
+
+
+def load_students_partitions(
+    partitions_dir: Path, manifest: dict, version: tuple[int, int]
+) -> StudentsPartitions:
+    """Open partitions listed in partitions.json, columns are memory-mapped."""
+    items = manifest.get('partitions') or []
+    part_dirs = tuple(partitions_dir / item['dir'] for item in items)
+    parts = tuple(load_students_columns(part_dir) for part_dir in part_dirs)
+    offsets = [0]
+    for part in parts:
+        offsets.append(offsets[-1] + len(part))
+    if offsets[-1] != manifest.get('rows'):
+        raise RuntimeError('students partitions // rows do not match manifest')
+    return StudentsPartitions(
+        version=version,
+        part_dirs=part_dirs,
+        subjects=tuple(item['subject_name'] for item in items),
+        parts=parts,
+        offsets=tuple(offsets),
+    )
+
+
+# partition dir -> (data version, index) inside a worker process
+_WORKER_INDEXES: dict[str, tuple[tuple[int, int], ColumnarIndex]] = {}
+
+
+def _call_partition(
+    part_dir: str, version: tuple[int, int], method: str, args: tuple
+) -> object:
+    """Run index method on one partition, worker keeps the index warm."""
+    cached = _WORKER_INDEXES.get(part_dir)
+    if cached is None or cached[0] != version:
+        # every data version has its own partition dirs, drop older ones
+        for stale_dir in [
+            key
+            for key, (key_version, _) in _WORKER_INDEXES.items()
+            if key_version != version
+        ]:
+            del _WORKER_INDEXES[stale_dir]
+        index = ColumnarIndex(load_students_columns(Path(part_dir)))
+        cached = _WORKER_INDEXES[part_dir] = (version, index)
+    return getattr(cached[1], method)(*args)
+
+
+_EXECUTOR: ProcessPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return process-wide pool of STUDENTS_WORKERS spawned workers."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ProcessPoolExecutor(
+                    max_workers=_common.STUDENTS_WORKERS or os.cpu_count(),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _EXECUTOR
+
+
+class PartitionedIndex:
+    """
+    Answer score queries by merging partial results of partitions.
+
+    Every partition computes partial aggregates (local top-k, sorted query
+    rows, sketches) with ColumnarIndex; over STUDENTS_PARALLEL_MIN_ROWS rows
+    the partitions run on a process pool. Averages are not merged from
+    partial sums: partitions return their scores, which are summed in
+    global row order by one builtin sum, as a plain scan of the rows would.
+    """
+
+    def __init__(self, partitions: StudentsPartitions):
+        self.partitions = partitions
+        self._indexes: dict[int, ColumnarIndex] = {}
+        # subject, None for all rows -> (sum, count), once per data version
+        self._totals: dict[str | None, tuple[float, int]] = {}
+        self._sketches: dict[str | None, SubjectSketches] = {}
+
+    def _parts(self, subject_name: str | None) -> list[int]:
+        subjects = self.partitions.subjects
+        if subject_name is None:
+            return list(range(len(subjects)))
+        return [part for part, name in enumerate(subjects) if name == subject_name]
+
+    def _index(self, part: int) -> ColumnarIndex:
+        index = self._indexes.get(part)
+        if index is None:
+            index = self._indexes[part] = ColumnarIndex(self.partitions.parts[part])
+        return index
+
+    def _scatter(self, parts: list[int], method: str, *args) -> list:
+        """Call ColumnarIndex method on partitions, on the pool for large data."""
+        rows = sum(len(self.partitions.parts[part]) for part in parts)
+        if len(parts) < 2 or rows < _common.STUDENTS_PARALLEL_MIN_ROWS:
+            return [getattr(self._index(part), method)(*args) for part in parts]
+        executor = get_executor()
+        futures = [
+            executor.submit(
+                _call_partition,
+                str(self.partitions.part_dirs[part]),
+                self.partitions.version,
+                method,
+                args,
+            )
+            for part in parts
+        ]
+        return [future.result() for future in futures]
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]:
+        """Sum partition scores in partition order, which is global row order."""
+        values = self._scatter(
+            self._parts(subject_name), 'row_values', subject_name, skip
+        )
+        scores = chain(chain.from_iterable(map(iter_floats, values)), tail)
+        return sum(scores), sum(map(len, values)) + len(tail)
+
+    def _average(self, subject_name: str | None) -> float | None:
+        total = self._totals.get(subject_name)
+        if total is None:
+            total = self._totals[subject_name] = self.score_sum(subject_name)
+        total_sum, count = total
+        return total_sum / count if count else None
+
+    def avg_score(self, subject_name: str) -> float | None:
+        return self._average(subject_name)
+
+    def avg_overall_score(self) -> float | None:
+        return self._average(None)
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]:
+        """Return scores of student rows in subject, in row order."""
+        parts = self._parts(subject_name)
+        scores = self._scatter(parts, 'student_scores', name, subject_name)
+        return list(chain.from_iterable(scores))
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        """Merge local top-k of subject partitions, each from its cached ranking."""
+        if k < 1:
+            return []
+        tops = self._scatter(
+            self._parts(subject_name), 'ranking_page', subject_name, None, k
+        )
+        return list(heapq.merge(*tops, key=ranking_key))[:k]
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        """Merge sorted and limited rows of partitions, ties keep global row order."""
+        parts = self._parts(query.subject_name)
+        offsets = self.partitions.offsets
+        entries = [
+            (offsets[part] + row_idx, name, subject_name, score)
+            for part, part_entries in zip(
+                parts, self._scatter(parts, 'query_entries', query)
+            )
+            for row_idx, name, subject_name, score in part_entries
+        ]
+        # stable sort by query order keeps global row order on ties
+        entries.sort()
+        entries.sort(key=order_key(query.order_by))
+        if query.limit is not None:
+            entries = entries[: max(query.limit, 0)]
+        return [entry[1:] for entry in entries]
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        if query.limit is not None:
+            scores = [score for _, _, score in self.query_rows(query)]
+            if not scores:
+                return 0, 0.0, None, None
+            return len(scores), sum(scores), min(scores), max(scores)
+
+        count, total = 0, 0.0
+        min_scores: list[float] = []
+        max_scores: list[float] = []
+        parts = self._parts(query.subject_name)
+        for part_count, part_total, part_min, part_max in self._scatter(
+            parts, 'query_stats', query
+        ):
+            count += part_count
+            total += part_total
+            if part_count:
+                min_scores.append(part_min)
+                max_scores.append(part_max)
+        if not count:
+            return 0, 0.0, None, None
+        return count, total, min(min_scores), max(max_scores)
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        """Merge partition sketches, cached per subject."""
+        sketches = self._sketches.get(subject_name)
+        if sketches is None:
+            sketches = merge_sketches(
+                self._scatter(self._parts(subject_name), 'score_sketches', subject_name)
+            )
+            self._sketches[subject_name] = sketches
+        return sketches
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        """
+        Merge next pages of subject partitions.
+
+        Rows with the cursor key live in one partition, so every partition
+        can resume from the same key.
+        """
+        if size < 1:
+            return []
+        pages = self._scatter(
+            self._parts(subject_name), 'ranking_page', subject_name, after, size
+        )
+        return list(heapq.merge(*pages, key=ranking_key))[:size]
@@ -0,0 +1,84 @@
+"""Query spec for students data and its pure-Python execution."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from dataclasses import dataclass
+
+ORDERS = ('score_desc', 'score_asc', 'name')
+
+# (count, sum, min, max) of selected scores
+QueryStats = tuple[int, float, float | None, float | None]
+
+# (score, name, seen): resume ranking after the seen-th row with this key
+RankingKey = tuple[float, str, int]
+
+# (name, subject) pairs whose rows are left out, e.g. replaced by the score log
+SkipKeys = Collection[tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class StudentsQuery:
+    """
+    Filter, order and limit over (student, subject, score) rows.
+
+    Semantics follow SQL: filters select rows, rows are ordered and cut by
+    limit, aggregates run over what is left. min_score/max_score are
+    inclusive, above is a strict lower bound. score_desc breaks ties by name,
+    name order breaks ties by subject, remaining ties keep row order.
+    """
+
+    subject_name: str | None = None
+    min_score: float | None = None
+    max_score: float | None = None
+    above: float | None = None
+    name_prefix: str | None = None
+    order_by: str = 'score_desc'
+    limit: int | None = None
+
+    def matches(self, name: str, subject_name: str, score: float) -> bool:
+        """Check row against filters."""
+        if self.subject_name is not None and subject_name != self.subject_name:
+            return False
+        if self.min_score is not None and score < self.min_score:
+            return False
+        if self.max_score is not None and score > self.max_score:
+            return False
+        if self.above is not None and score <= self.above:
+            return False
+        if self.name_prefix and not name.startswith(self.name_prefix):
+            return False
+        return True
+
+
+def ranking_key(item: tuple[str, float]) -> tuple[float, str]:
+    """Sort key of (name, score) subject ranking items."""
+    return -item[1], item[0]
+
+
+def order_key(order_by: str):
+    """Return sort key over (row_idx, name, subject, score) entries."""
+    if order_by == 'score_desc':
+        return lambda entry: (-entry[3], entry[1])
+    if order_by == 'score_asc':
+        return lambda entry: (entry[3], entry[1])
+    return lambda entry: (entry[1], entry[2])
+
+
+def select_entries(
+    entries: list[tuple[int, str, str, float]], query: StudentsQuery
+) -> list[tuple[int, str, str, float]]:
+    """Filter, order and limit (row_idx, name, subject, score) entries."""
+    selected = [entry for entry in entries if query.matches(*entry[1:])]
+    selected.sort(key=order_key(query.order_by))
+    if query.limit is not None:
+        selected = selected[: max(query.limit, 0)]
+    return selected
+
+
+def entries_stats(entries: list[tuple[int, str, str, float]]) -> QueryStats:
+    """Return (count, sum, min, max) summing scores in row order."""
+    if not entries:
+        return 0, 0.0, None, None
+    scores = [entry[3] for entry in sorted(entries)]
+    return len(scores), sum(scores), min(scores), max(scores)
@@ -0,0 +1,204 @@
+"""Mergeable score distribution sketches: t-digest and fixed-bin histogram."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+DEFAULT_COMPRESSION = 100
+# scores have one decimal, bin k is 0.1 wide and centered on k / 10
+HISTOGRAM_WIDTH = 0.1
+
+
+def _k_scale(q: float, compression: float) -> float:
+    """t-digest k1 scale: small centroids at the tails, large in the middle."""
+    return compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+
+@dataclass(frozen=True)
+class TDigest:
+    """
+    Merging t-digest over scores.
+
+    Centroids are (mean, weight) pairs sorted by mean. Two digests merge by
+    recompressing their joint centroids, so per-shard digests can be
+    combined without the raw scores.
+    """
+
+    means: tuple[float, ...]
+    weights: tuple[float, ...]
+    min_value: float
+    max_value: float
+    compression: float = DEFAULT_COMPRESSION
+
+    @property
+    def count(self) -> float:
+        return sum(self.weights)
+
+    @classmethod
+    def from_sorted(
+        cls, values: Sequence[float], compression: float = DEFAULT_COMPRESSION
+    ) -> TDigest | None:
+        """Build digest from ascending values, None for empty input."""
+        if not values:
+            return None
+        return cls.from_centroids(
+            [(value, 1.0) for value in values],
+            values[0],
+            values[-1],
+            compression,
+        )
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[float], compression: float = DEFAULT_COMPRESSION
+    ) -> TDigest | None:
+        """Build digest from values in any order."""
+        return cls.from_sorted(sorted(values), compression)
+
+    @classmethod
+    def from_centroids(
+        cls,
+        centroids: list[tuple[float, float]],
+        min_value: float,
+        max_value: float,
+        compression: float,
+    ) -> TDigest:
+        """Greedily merge centroids sorted by mean while they fit one k-scale unit."""
+        total = sum(weight for _, weight in centroids)
+        means: list[float] = []
+        weights: list[float] = []
+        weight_before = 0.0
+        current_mean, current_weight = centroids[0]
+        k_low = _k_scale(0.0, compression)
+        for mean, weight in centroids[1:]:
+            q_high = (weight_before + current_weight + weight) / total
+            if _k_scale(q_high, compression) - k_low <= 1.0:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+                continue
+            means.append(current_mean)
+            weights.append(current_weight)
+            weight_before += current_weight
+            k_low = _k_scale(weight_before / total, compression)
+            current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+        return cls(tuple(means), tuple(weights), min_value, max_value, compression)
+
+    def merge(self, other: TDigest | None) -> TDigest:
+        """Return digest of both inputs."""
+        if other is None:
+            return self
+        centroids = sorted(zip(self.means + other.means, self.weights + other.weights))
+        return self.from_centroids(
+            centroids,
+            min(self.min_value, other.min_value),
+            max(self.max_value, other.max_value),
+            max(self.compression, other.compression),
+        )
+
+    def quantile(self, q: float) -> float:
+        """Estimate q-quantile (0..1) interpolating between centroid centers."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError('q must be in [0, 1]')
+        total = self.count
+        target = q * total
+        # centroid centers as cumulative positions, min/max pinned at the ends
+        positions = [0.0]
+        values = [self.min_value]
+        cumulative = 0.0
+        for mean, weight in zip(self.means, self.weights):
+            positions.append(cumulative + weight / 2)
+            values.append(mean)
+            cumulative += weight
+        positions.append(total)
+        values.append(self.max_value)
+
+        for idx in range(1, len(positions)):
+            if target <= positions[idx]:
+                left, right = positions[idx - 1], positions[idx]
+                if right == left:
+                    return values[idx]
+                ratio = (target - left) / (right - left)
+                return values[idx - 1] + ratio * (values[idx] - values[idx - 1])
+        return self.max_value
+
+
+def histogram_bin(value: float, width: float = HISTOGRAM_WIDTH) -> int:
+    """Return index of the bin centered nearest to value."""
+    return math.floor(value / width + 0.5)
+
+
+@dataclass(frozen=True)
+class ScoreHistogram:
+    """
+    Histogram over bins of a fixed grid, spanning the bins of min..max score.
+
+    The range follows the data, so no score is clamped into an edge bin;
+    histograms on the same grid merge by widening to the union of ranges.
+    """
+
+    first: int
+    counts: tuple[int, ...]
+    width: float = HISTOGRAM_WIDTH
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[float], width: float = HISTOGRAM_WIDTH
+    ) -> ScoreHistogram | None:
+        """Build histogram from values in any order, None for empty input."""
+        bins = [histogram_bin(value, width) for value in values]
+        if not bins:
+            return None
+        first = min(bins)
+        counts = [0] * (max(bins) - first + 1)
+        for idx in bins:
+            counts[idx - first] += 1
+        return cls(first, tuple(counts), width)
+
+    @property
+    def low(self) -> float:
+        return round((self.first - 0.5) * self.width, 6)
+
+    @property
+    def high(self) -> float:
+        return round((self.first + len(self.counts) - 0.5) * self.width, 6)
+
+    @property
+    def edges(self) -> list[float]:
+        return [
+            round((self.first + idx - 0.5) * self.width, 6)
+            for idx in range(len(self.counts) + 1)
+        ]
+
+    def merge(self, other: ScoreHistogram | None) -> ScoreHistogram:
+        """Return histogram of both inputs, bin widths must match."""
+        if other is None:
+            return self
+        if self.width != other.width:
+            raise ValueError('histograms have different bin widths')
+        first = min(self.first, other.first)
+        last = max(self.first + len(self.counts), other.first + len(other.counts))
+        counts = [0] * (last - first)
+        for histogram in (self, other):
+            offset = histogram.first - first
+            for idx, count in enumerate(histogram.counts):
+                counts[offset + idx] += count
+        return ScoreHistogram(first, tuple(counts), self.width)
+
+
+SubjectSketches = tuple[TDigest | None, ScoreHistogram | None]
+
+
+def merge_sketches(sketches: Iterable[SubjectSketches]) -> SubjectSketches:
+    """Merge (digest, histogram) pairs, e.g. of several subjects or shards."""
+    digest: TDigest | None = None
+    histogram: ScoreHistogram | None = None
+    for other_digest, other_histogram in sketches:
+        if other_digest is not None:
+            digest = other_digest.merge(digest)
+        if other_histogram is not None:
+            histogram = other_histogram.merge(histogram)
+    return digest, histogram
@@ -0,0 +1,93 @@
+"""Versioned immutable snapshots of students data for lock-free reads."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from . import _common
+from ._index import ScoreIndex, get_students_index
+
+
+@dataclass(frozen=True, eq=False)
+class StudentsSnapshot:
+    """
+    One consistent version of students rows and their aggregates.
+
+    Snapshots are never modified: a reload builds a new one and swaps the
+    module reference, so a caller holding a snapshot keeps reading the same
+    data version until it asks for a new one. Memory-mapped columns stay
+    valid too, store writers put every version into new files.
+
+    The SQLite backend is the exception: its index and rows query the DB
+    file on each call, so a held SQLite snapshot answers from whatever file
+    is current once prepare_data replaces it. Only its version number is
+    pinned, and a new snapshot gets a new version when the file changes.
+    """
+
+    version: int
+    rows: Sequence[dict[str, str]]
+    index: ScoreIndex
+    # SQLite file signature, None for file stores
+    store_signature: tuple[int, int] | None = None
+
+
+_SNAPSHOT: StudentsSnapshot | None = None
+_RELOAD_LOCK = threading.Lock()
+# version of the next snapshot, never reused inside a process
+_NEXT_VERSION = 1
+
+
+def _store_signature() -> tuple[int, int] | None:
+    """
+    SQLite backend answers from one shared object, so its data version
+    follows the DB file; file stores get a new rows object per version.
+    """
+    if _common.STUDENTS_BACKEND == 'sqlite':
+        return _common._file_signature(_common.STUDENTS_DB)
+    return None
+
+
+# returns shared rows of the current data version
+RowsLoader = Callable[[], Sequence[dict[str, str]]]
+
+
+def _reload(
+    snapshot: StudentsSnapshot | None, load_rows: RowsLoader
+) -> StudentsSnapshot:
+    """Revalidate data off to the side, publish a new snapshot when it changed."""
+    global _SNAPSHOT, _NEXT_VERSION
+
+    rows = load_rows()
+    index = get_students_index(rows)
+    store_signature = _store_signature()
+    if (
+        snapshot is not None
+        and snapshot.rows is rows
+        and snapshot.index is index
+        and snapshot.store_signature == store_signature
+    ):
+        return snapshot
+    snapshot = StudentsSnapshot(_NEXT_VERSION, rows, index, store_signature)
+    _NEXT_VERSION += 1
+    _SNAPSHOT = snapshot
+    return snapshot
+
+
+def get_students_snapshot(load_rows: RowsLoader | None = None) -> StudentsSnapshot:
+    """
+    Return current snapshot, revalidating it when no other thread does.
+
+    Only one thread reloads at a time; others keep serving the previous
+    snapshot instead of waiting, so reads block only before the first load.
+    Underlying caches keep revalidation cheap between data changes.
+    API modules pass their module-level load_students_rows as load_rows.
+    """
+    snapshot = _SNAPSHOT
+    if not _RELOAD_LOCK.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        return _reload(_SNAPSHOT, load_rows or _common.load_students_rows)
+    finally:
+        _RELOAD_LOCK.release()
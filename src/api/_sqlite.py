@@ -0,0 +1,264 @@
+"""SQLite storage backend for students data."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from ._query import QueryStats, RankingKey, SkipKeys, StudentsQuery
+from ._sketches import ScoreHistogram, SubjectSketches, TDigest, merge_sketches
+
+ORDER_CLAUSES = {
+    'score_desc': 'score DESC, student_name, rowid',
+    'score_asc': 'score, student_name, rowid',
+    'name': 'student_name, subject_name, rowid',
+}
+
+
+def _format_row(student_name: str, subject_name: str, score: float) -> dict[str, str]:
+    return {
+        'student_name': student_name,
+        'subject_name': subject_name,
+        'score': f'{score:.1f}',
+    }
+
+
+class SqliteRows(Sequence):
+    """Read-only sequence of students rows stored in SQLite, in insert order."""
+
+    def __init__(self, backend: SqliteBackend):
+        self._backend = backend
+
+    def score_index(self) -> SqliteBackend:
+        """Answer aggregates with SQL instead of scanning rows."""
+        return self._backend
+
+    def __len__(self) -> int:
+        return self._backend.fetch_one('SELECT COUNT(*) FROM students')[0]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        row = self._backend.fetch_one(
+            'SELECT student_name, subject_name, score FROM students '
+            'ORDER BY rowid LIMIT 1 OFFSET ?',
+            (idx,),
+        )
+        if row is None:
+            raise IndexError('students index out of range')
+        return _format_row(*row)
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        cursor = self._backend.connection().execute(
+            'SELECT student_name, subject_name, score FROM students ORDER BY rowid'
+        )
+        for row in cursor:
+            yield _format_row(*row)
+
+
+class SqliteBackend:
+    """
+    Students stored in a SQLite file opened read-only.
+
+    Every thread gets its own connection, so one DB file can be shared by
+    many threads and worker processes. Connections are reopened when the
+    file is replaced by prepare_data.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._rows = SqliteRows(self)
+        # (file signature, {subject: sketches}) built on first request
+        self._sketches: tuple[tuple | None, dict[str, SubjectSketches]] = (None, {})
+
+    def connection(self) -> sqlite3.Connection:
+        stat = self.db_path.stat()
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.signature != signature:
+            if connection is not None:
+                connection.close()
+            connection = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            self._local.connection = connection
+            self._local.signature = signature
+        return connection
+
+    def fetch_one(self, query: str, params: tuple = ()) -> tuple | None:
+        return self.connection().execute(query, params).fetchone()
+
+    def load(self) -> Sequence[dict[str, str]]:
+        if not self.db_path.exists():
+            return []
+        return self._rows
+
+    def avg_score(self, subject_name: str) -> float | None:
+        total, count = self.score_sum(subject_name)
+        return total / count if count else None
+
+    def avg_overall_score(self) -> float | None:
+        total, count = self.score_sum(None)
+        return total / count if count else None
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]:
+        """
+        Return (sum, count) of subject scores, of all rows for None.
+
+        SQL SUM adds rows in the order of the index it scans, so scores are
+        fetched in rowid order and added by builtin sum, as a scan of
+        students.csv would; rows of (name, subject) pairs in skip are left
+        out, tail is added last.
+        """
+        scores: list[float] = []
+        if self.db_path.exists():
+            sql = 'SELECT student_name, subject_name, score FROM students'
+            params: tuple = ()
+            if subject_name is not None:
+                sql += ' WHERE subject_name = ?'
+                params = (subject_name,)
+            cursor = self.connection().execute(sql + ' ORDER BY rowid', params)
+            scores = [
+                score
+                for name, row_subject, score in cursor
+                if (name, row_subject) not in skip
+            ]
+        scores += tail
+        return sum(scores), len(scores)
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]:
+        if not self.db_path.exists():
+            return []
+        cursor = self.connection().execute(
+            'SELECT score FROM students WHERE subject_name = ? AND student_name = ? '
+            'ORDER BY rowid',
+            (subject_name, name),
+        )
+        return [score for (score,) in cursor]
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        if not self.db_path.exists() or k < 1:
+            return []
+        cursor = self.connection().execute(
+            'SELECT student_name, score FROM students WHERE subject_name = ? '
+            'ORDER BY score DESC, student_name, rowid LIMIT ?',
+            (subject_name, k),
+        )
+        return [(name, score) for name, score in cursor]
+
+    def _select_sql(self, query: StudentsQuery) -> tuple[str, list]:
+        """Build SELECT for query filters, order and limit."""
+        conditions: list[str] = []
+        params: list = []
+        if query.subject_name is not None:
+            conditions.append('subject_name = ?')
+            params.append(query.subject_name)
+        if query.min_score is not None:
+            conditions.append('score >= ?')
+            params.append(query.min_score)
+        if query.max_score is not None:
+            conditions.append('score <= ?')
+            params.append(query.max_score)
+        if query.above is not None:
+            conditions.append('score > ?')
+            params.append(query.above)
+        if query.name_prefix:
+            conditions.append('student_name >= ? AND student_name < ?')
+            params += [query.name_prefix, query.name_prefix + '\U0010ffff']
+
+        sql = 'SELECT rowid, student_name, subject_name, score FROM students'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY ' + ORDER_CLAUSES[query.order_by]
+        if query.limit is not None:
+            sql += ' LIMIT ?'
+            params.append(max(query.limit, 0))
+        return sql, params
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        if not self.db_path.exists():
+            return []
+        sql, params = self._select_sql(query)
+        cursor = self.connection().execute(sql, params)
+        return [(name, subject_name, score) for _, name, subject_name, score in cursor]
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        if not self.db_path.exists():
+            return 0, 0.0, None, None
+        sql, params = self._select_sql(query)
+        # summed in rowid order like entries_stats, not in SQL SUM scan order
+        cursor = self.connection().execute(
+            f'SELECT score FROM ({sql}) ORDER BY rowid', params
+        )
+        scores = [score for (score,) in cursor]
+        if not scores:
+            return 0, 0.0, None, None
+        return len(scores), sum(scores), min(scores), max(scores)
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        if not self.db_path.exists():
+            return None, None
+        connection = self.connection()
+        signature, sketches = self._sketches
+        if signature != self._local.signature:
+            sketches = {}
+            for (name,) in connection.execute(
+                'SELECT DISTINCT subject_name FROM students'
+            ):
+                scores = [
+                    score
+                    for (score,) in connection.execute(
+                        'SELECT score FROM students WHERE subject_name = ? '
+                        'ORDER BY score',
+                        (name,),
+                    )
+                ]
+                sketches[name] = (
+                    TDigest.from_sorted(scores),
+                    ScoreHistogram.from_values(scores),
+                )
+            self._sketches = (self._local.signature, sketches)
+        if subject_name is None:
+            return merge_sketches(sketches.values())
+        return sketches.get(subject_name, (None, None))
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        """Return next size ranking items after key as an index range scan."""
+        if not self.db_path.exists() or size < 1:
+            return []
+        if after is None:
+            return self.top_students(subject_name, size)
+
+        score, name, seen = after
+        (same_key,) = self.fetch_one(
+            'SELECT COUNT(*) FROM students '
+            'WHERE subject_name = ? AND score = ? AND student_name = ?',
+            (subject_name, score, name),
+        )
+        cursor = self.connection().execute(
+            'SELECT student_name, score FROM students WHERE subject_name = ? '
+            'AND (score < ? OR (score = ? AND student_name >= ?)) '
+            'ORDER BY score DESC, student_name, rowid LIMIT ? OFFSET ?',
+            (subject_name, score, score, name, size, min(seen, same_key)),
+        )
+        return [(student_name, value) for student_name, value in cursor]
+
+
+_BACKENDS: dict[Path, SqliteBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_sqlite_backend(db_path: Path) -> SqliteBackend:
+    """Return process-wide backend for DB file."""
+    backend = _BACKENDS.get(db_path)
+    if backend is None:
+        with _BACKENDS_LOCK:
+            backend = _BACKENDS.setdefault(db_path, SqliteBackend(db_path))
+    return backend
@@ -0,0 +1,349 @@
+"""NumPy-vectorized aggregates over memory-mapped students columns."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from functools import cached_property
+from itertools import chain
+
+import numpy as np
+
+from ._columns import StudentsColumns
+from ._query import QueryStats, RankingKey, SkipKeys, StudentsQuery
+from ._sketches import (
+    DEFAULT_COMPRESSION,
+    HISTOGRAM_WIDTH,
+    ScoreHistogram,
+    SubjectSketches,
+    TDigest,
+    merge_sketches,
+)
+
+# sorts after any real character, prefix range is [prefix, prefix + MAX_CHAR)
+MAX_CHAR = '\U0010ffff'
+# scores converted to Python floats at a time while summing
+SUM_CHUNK_ROWS = 1 << 16
+
+
+def iter_floats(values: np.ndarray) -> Iterator[float]:
+    """
+    Yield values as Python floats, converted by chunks.
+
+    builtin sum over them gives the same result as over the parsed CSV
+    scores; numpy float64 items would be added without the compensation
+    builtin sum applies to floats since Python 3.12.
+    """
+    for start in range(0, len(values), SUM_CHUNK_ROWS):
+        yield from values[start : start + SUM_CHUNK_ROWS].tolist()
+
+
+def digest_from_sorted(
+    values: np.ndarray, compression: float = DEFAULT_COMPRESSION
+) -> TDigest | None:
+    """
+    Build t-digest from ascending values without a per-value Python loop.
+
+    Values are pre-grouped by unit steps of the k-scale at their quantile,
+    then the few hundred groups are compressed as centroids.
+    """
+    count = len(values)
+    if not count:
+        return None
+    q = (np.arange(count) + 0.5) / count
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+    groups = np.floor(k - k[0]).astype(np.int64)
+    weights = np.bincount(groups).astype(np.float64)
+    sums = np.bincount(groups, weights=values)
+    used = weights > 0
+    centroids = list(zip((sums[used] / weights[used]).tolist(), weights[used].tolist()))
+    return TDigest.from_centroids(
+        centroids, float(values[0]), float(values[-1]), compression
+    )
+
+
+def histogram_from_values(values: np.ndarray) -> ScoreHistogram:
+    """Vectorized ScoreHistogram.from_values for non-empty values."""
+    bins = np.floor(values / HISTOGRAM_WIDTH + 0.5).astype(np.int64)
+    first = int(bins.min())
+    counts = np.bincount(bins - first)
+    return ScoreHistogram(first, tuple(counts.tolist()))
+
+
+class ColumnarIndex:
+    """
+    Answer score queries over StudentsColumns without per-row Python code.
+
+    Scores are stored as float32, so they are rounded back to one decimal in
+    float64 before use; this gives exactly the floats that parsing the CSV
+    would give. Averages add subject scores in row order with builtin sum,
+    so they match a plain scan of students.csv bit for bit on every Python
+    version (sum of floats is compensated since 3.12, numpy sums are not).
+    """
+
+    def __init__(self, columns: StudentsColumns):
+        self.columns = columns
+        self._subject_lookup = {
+            name: code for code, name in enumerate(columns.subject_names.tolist())
+        }
+        # subject code -> (negated scores, student codes) in ranking order
+        self._rankings: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+    @cached_property
+    def _scores(self) -> np.ndarray:
+        return np.round(self.columns.scores.astype(np.float64), 1)
+
+    @cached_property
+    def _subject_totals(self) -> dict[int, tuple[float, int]]:
+        """Return subject code -> (sum, count), summed in row order."""
+        order = np.argsort(self.columns.subject_codes, kind='stable')
+        bounds = np.searchsorted(
+            self.columns.subject_codes[order],
+            np.arange(len(self._subject_lookup) + 1),
+        ).tolist()
+        scores = self._scores[order]
+        return {
+            code: (sum(iter_floats(scores[low:high])), high - low)
+            for code, (low, high) in enumerate(zip(bounds, bounds[1:]))
+        }
+
+    @cached_property
+    def _sketches(self) -> dict[str, SubjectSketches]:
+        sketches: dict[str, SubjectSketches] = {}
+        for subject_name, code in self._subject_lookup.items():
+            values = np.sort(self._scores[self.columns.subject_codes == code])
+            if len(values):
+                sketches[subject_name] = (
+                    digest_from_sorted(values),
+                    histogram_from_values(values),
+                )
+        return sketches
+
+    @cached_property
+    def _total_sum(self) -> float:
+        return sum(iter_floats(self._scores))
+
+    def avg_score(self, subject_name: str) -> float | None:
+        """Return unrounded average for subject or None when it has no rows."""
+        code = self._subject_lookup.get(subject_name)
+        if code is None:
+            return None
+        total, count = self._subject_totals[code]
+        return total / count if count else None
+
+    def avg_overall_score(self) -> float | None:
+        """Return unrounded average across all rows or None when empty."""
+        if not len(self.columns):
+            return None
+        return self._total_sum / len(self.columns)
+
+    def row_values(self, subject_name: str | None, skip: SkipKeys = ()) -> np.ndarray:
+        """Return subject scores in row order, all for None, without skip rows."""
+        if subject_name is None:
+            mask = np.ones(len(self.columns), dtype=bool)
+        else:
+            code = self._subject_lookup.get(subject_name)
+            if code is None:
+                return self._scores[:0]
+            mask = self.columns.subject_codes == code
+        for name, skip_subject in skip:
+            mask[self._student_rows(name, skip_subject)] = False
+        return self._scores[mask]
+
+    def score_sum(
+        self, subject_name: str | None, skip: SkipKeys = (), tail: Sequence[float] = ()
+    ) -> tuple[float, int]:
+        """Return builtin sum and count of row_values followed by tail."""
+        values = self.row_values(subject_name, skip)
+        return sum(chain(iter_floats(values), tail)), len(values) + len(tail)
+
+    @cached_property
+    def _key_order(self) -> tuple[np.ndarray, np.ndarray]:
+        """Row indices sorted by (subject, student) code, and the sorted keys."""
+        keys = self.columns.subject_codes.astype(np.int64) * len(
+            self.columns.student_names
+        ) + np.asarray(self.columns.student_codes)
+        order = np.argsort(keys, kind='stable')
+        return order, keys[order]
+
+    def _student_rows(self, name: str, subject_name: str) -> np.ndarray:
+        """Return row indices of student in subject, in row order."""
+        code = self._subject_lookup.get(subject_name)
+        student_names = self.columns.student_names
+        student_code = int(np.searchsorted(student_names, name))
+        if (
+            code is None
+            or student_code == len(student_names)
+            or student_names[student_code] != name
+        ):
+            return np.empty(0, dtype=np.int64)
+        order, keys = self._key_order
+        key = code * len(student_names) + student_code
+        low, high = np.searchsorted(keys, [key, key + 1]).tolist()
+        return order[low:high]
+
+    def student_scores(self, name: str, subject_name: str) -> list[float]:
+        """Return scores of student rows in subject, in row order."""
+        return self._scores[self._student_rows(name, subject_name)].tolist()
+
+    def top_students(self, subject_name: str, k: int) -> list[tuple[str, float]]:
+        """Return first k (name, score) pairs ordered by (-score, name)."""
+        code = self._subject_lookup.get(subject_name)
+        if code is None or k < 1:
+            return []
+
+        rows_idx = np.flatnonzero(self.columns.subject_codes == code)
+        if not len(rows_idx):
+            return []
+        scores = self.columns.scores[rows_idx]
+
+        if k < len(rows_idx):
+            # keep every row tied with the k-th score, names decide among them
+            kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            keep = scores >= kth_score
+            rows_idx, scores = rows_idx[keep], scores[keep]
+
+        # stable lexsort: score desc, then name (code order is name order)
+        order = np.lexsort((self.columns.student_codes[rows_idx], -scores))[:k]
+        top_idx = rows_idx[order]
+
+        student_names = self.columns.student_names
+        names = [
+            str(student_names[code])
+            for code in self.columns.student_codes[top_idx].tolist()
+        ]
+        top_scores = np.round(self.columns.scores[top_idx].astype(np.float64), 1)
+        return list(zip(names, top_scores.tolist()))
+
+    def _filter(self, query: StudentsQuery) -> np.ndarray:
+        """Return row indices matching query filters in row order."""
+        columns = self.columns
+        mask = np.ones(len(columns), dtype=bool)
+        if query.subject_name is not None:
+            code = self._subject_lookup.get(query.subject_name)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= columns.subject_codes == code
+        if query.min_score is not None:
+            mask &= self._scores >= query.min_score
+        if query.max_score is not None:
+            mask &= self._scores <= query.max_score
+        if query.above is not None:
+            mask &= self._scores > query.above
+        if query.name_prefix:
+            low, high = np.searchsorted(
+                columns.student_names,
+                [query.name_prefix, query.name_prefix + MAX_CHAR],
+            )
+            mask &= (columns.student_codes >= low) & (columns.student_codes < high)
+        return np.flatnonzero(mask)
+
+    def _select(self, query: StudentsQuery) -> np.ndarray:
+        """Return row indices selected by query, ordered and limited."""
+        columns = self.columns
+        rows_idx = self._filter(query)
+        limit = len(rows_idx) if query.limit is None else max(query.limit, 0)
+        if limit == 0:
+            return rows_idx[:0]
+
+        scores = self._scores[rows_idx]
+        if query.order_by == 'name':
+            keys = (columns.subject_codes[rows_idx], columns.student_codes[rows_idx])
+        else:
+            signed = -scores if query.order_by == 'score_desc' else scores
+            if limit < len(rows_idx):
+                # keep every row tied with the limit-th score before sorting
+                kth = signed[np.argpartition(signed, limit - 1)[limit - 1]]
+                keep = signed <= kth
+                rows_idx, signed = rows_idx[keep], signed[keep]
+            keys = (columns.student_codes[rows_idx], signed)
+        return rows_idx[np.lexsort(keys)[:limit]]
+
+    def query_entries(self, query: StudentsQuery) -> list[tuple[int, str, str, float]]:
+        """Return (row_idx, name, subject, score) entries selected by query."""
+        rows_idx = self._select(query)
+        student_names = self.columns.student_names
+        subject_names = self.columns.subject_names.tolist()
+        return [
+            (
+                row_idx,
+                str(student_names[student_code]),
+                subject_names[subject_code],
+                score,
+            )
+            for row_idx, student_code, subject_code, score in zip(
+                rows_idx.tolist(),
+                self.columns.student_codes[rows_idx].tolist(),
+                self.columns.subject_codes[rows_idx].tolist(),
+                self._scores[rows_idx].tolist(),
+            )
+        ]
+
+    def query_rows(self, query: StudentsQuery) -> list[tuple[str, str, float]]:
+        """Return (name, subject, score) rows selected by query."""
+        return [entry[1:] for entry in self.query_entries(query)]
+
+    def query_stats(self, query: StudentsQuery) -> QueryStats:
+        """Return (count, sum, min, max) of selected scores, summed in row order."""
+        if query.limit is None:
+            rows_idx = self._filter(query)
+        else:
+            rows_idx = np.sort(self._select(query))
+        scores = self._scores[rows_idx]
+        if not len(scores):
+            return 0, 0.0, None, None
+        return (
+            len(scores),
+            float(np.cumsum(scores)[-1]),
+            float(scores.min()),
+            float(scores.max()),
+        )
+
+    def score_sketches(self, subject_name: str | None) -> SubjectSketches:
+        """Return (digest, histogram) of subject, of all subjects for None."""
+        if subject_name is None:
+            return merge_sketches(self._sketches.values())
+        return self._sketches.get(subject_name, (None, None))
+
+    def _ranking(self, code: int) -> tuple[np.ndarray, np.ndarray]:
+        """Sort subject rows by (-score, name) once and keep the result."""
+        ranking = self._rankings.get(code)
+        if ranking is None:
+            rows_idx = np.flatnonzero(self.columns.subject_codes == code)
+            neg_scores = -self._scores[rows_idx]
+            student_codes = np.asarray(self.columns.student_codes[rows_idx])
+            order = np.lexsort((student_codes, neg_scores))
+            ranking = (neg_scores[order], student_codes[order])
+            self._rankings[code] = ranking
+        return ranking
+
+    def ranking_page(
+        self, subject_name: str, after: RankingKey | None, size: int
+    ) -> list[tuple[str, float]]:
+        """Return next size ranking items after key using searchsorted."""
+        code = self._subject_lookup.get(subject_name)
+        if code is None or size < 1:
+            return []
+        neg_scores, student_codes = self._ranking(code)
+
+        start = 0
+        if after is not None:
+            score, name, seen = after
+            low = int(np.searchsorted(neg_scores, -score, side='left'))
+            high = int(np.searchsorted(neg_scores, -score, side='right'))
+            name_code = int(np.searchsorted(self.columns.student_names, name))
+            same_score = student_codes[low:high]
+            first = int(np.searchsorted(same_score, name_code, side='left'))
+            last = int(np.searchsorted(same_score, name_code, side='right'))
+            known_name = (
+                name_code < len(self.columns.student_names)
+                and self.columns.student_names[name_code] == name
+            )
+            start = low + first + (min(seen, last - first) if known_name else 0)
+
+        page_scores = (-neg_scores[start : start + size]).tolist()
+        student_names = self.columns.student_names
+        names = [
+            str(student_names[student_code])
+            for student_code in student_codes[start : start + size].tolist()
+        ]
+        return list(zip(names, page_scores))
@@ -0,0 +1,18 @@
+"""API function for adding a student score."""
+
+from __future__ import annotations
+
+from ._log import append_score
+
+
+def add_score(
+    student_name: str, subject_name: str, score: float
+) -> dict[str, float | str]:
+    """
+    Add score row for student in subject.
+
+    The row goes to the append-only score log and is visible to the next
+    API call without re-reading students data.
+    """
+    stored = append_score('add', student_name, subject_name, score)
+    return {'name': student_name, 'subject_name': subject_name, 'score': stored}
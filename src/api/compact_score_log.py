@@ -0,0 +1,15 @@
+"""API function for folding the score log into students data."""
+
+from __future__ import annotations
+
+from ._log import compact_log
+
+
+def compact_score_log() -> dict[str, int]:
+    """
+    Rewrite students data with logged scores applied and drop the log.
+
+    Also runs in a background thread when the log grows past
+    STUDENTS_LOG_COMPACT_BYTES.
+    """
+    return {'compacted': compact_log()}
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
 
 
 def get_avg_overall_score() -> dict[str, float]:
     """Return average score across all subjects."""
-    scores = [float(row['score']) for row in load_students_rows()]
-    if not scores:
+    avg_score = get_students_snapshot(load_students_rows).index.avg_overall_score()
+    if avg_score is None:
         return {}
-    return {'avg_score': round(sum(scores) / len(scores), 1)}
+    return {'avg_score': round(avg_score, 1)}
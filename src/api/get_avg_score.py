@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
 
 
 def get_avg_score(subject_name: str) -> dict[str, float]:
@@ -10,12 +11,8 @@ def get_avg_score(subject_name: str) -> dict[str, float]:
     if not subject_name.strip():
         return {}
 
-    scores: list[float] = []
-    for row in load_students_rows():
-        if row.get('subject_name') == subject_name:
-            scores.append(float(row['score']))
-
-    if not scores:
+    avg_score = get_students_snapshot(load_students_rows).index.avg_score(subject_name)
+    if avg_score is None:
         return {}
 
-    return {'avg_score': round(sum(scores) / len(scores), 1)}
+    return {'avg_score': round(avg_score, 1)}
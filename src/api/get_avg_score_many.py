@@ -0,0 +1,23 @@
+"""API function for average scores of several subjects."""
+
+from __future__ import annotations
+
+from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
+
+
+def get_avg_score_many(subject_names: list[str]) -> dict[str, dict[str, float]]:
+    """Return get_avg_score-like result for each subject, keyed by subject."""
+    index = get_students_snapshot(load_students_rows).index
+
+    result: dict[str, dict[str, float]] = {}
+    for subject_name in subject_names:
+        if not subject_name.strip():
+            result[subject_name] = {}
+            continue
+        avg_score = index.avg_score(subject_name)
+        if avg_score is None:
+            result[subject_name] = {}
+            continue
+        result[subject_name] = {'avg_score': round(avg_score, 1)}
+    return result
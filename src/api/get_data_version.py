@@ -0,0 +1,18 @@
+"""API function for current students data version."""
+
+from __future__ import annotations
+
+from ._snapshot import get_students_snapshot
+
+
+def get_data_version() -> dict[str, int]:
+    """
+    Return version of the students snapshot served to API calls.
+
+    The version changes whenever data or the score log changes and is
+    never reused inside a process, so it can be part of response cache keys.
+    With the SQLite backend a replaced DB file also changes the version, but
+    a snapshot already in use reads the new file, see StudentsSnapshot.
+    Example output: {'version': 3}
+    """
+    return {'version': get_students_snapshot().version}
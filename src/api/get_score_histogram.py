@@ -0,0 +1,26 @@
+"""API function for score histogram by subject."""
+
+from __future__ import annotations
+
+from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
+
+
+def get_score_histogram(subject_name: str | None) -> dict[str, list]:
+    """
+    Return score histogram for subject, all subjects for None.
+
+    Bins are 0.1 wide and centered on one-decimal scores, from the bin of
+    the lowest score to the bin of the highest one.
+    Example output: {'edges': [2.95, 3.05, ..., 5.05], 'counts': [1, 0, ...]}
+    """
+    if subject_name is not None and not subject_name.strip():
+        return {}
+
+    _, histogram = get_students_snapshot(load_students_rows).index.score_sketches(
+        subject_name
+    )
+    if histogram is None:
+        return {}
+
+    return {'edges': histogram.edges, 'counts': list(histogram.counts)}
@@ -0,0 +1,34 @@
+"""API function for score percentiles by subject."""
+
+from __future__ import annotations
+
+from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+def get_score_percentiles(
+    subject_name: str | None, percentiles: tuple[int, ...] = DEFAULT_PERCENTILES
+) -> dict[str, float]:
+    """
+    Return approximate score percentiles for subject, all subjects for None.
+
+    Values come from a t-digest built once per data version.
+    Example output: {'p25': 3.5, 'p50': 4.0, 'p75': 4.5, 'p90': 4.8}
+    """
+    if any(not 0 <= percentile <= 100 for percentile in percentiles):
+        raise ValueError('percentiles must be in [0, 100]')
+    if subject_name is not None and not subject_name.strip():
+        return {}
+
+    digest, _ = get_students_snapshot(load_students_rows).index.score_sketches(
+        subject_name
+    )
+    if digest is None:
+        return {}
+
+    return {
+        f'p{percentile:g}': round(digest.quantile(percentile / 100), 2)
+        for percentile in percentiles
+    }
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
 
 
 def get_top_students(subject_name: str, k: int = 3) -> list[dict[str, float | str]]:
@@ -14,12 +15,5 @@ def get_top_students(subject_name: str, k: int = 3) -> list[dict[str, float | st
     if k > 10:
         raise ValueError('k must be <= 10')
 
-    matches: list[dict[str, float | str]] = []
-    for row in load_students_rows():
-        if row.get('subject_name') != subject_name:
-            continue
-        score = float(row['score'])
-        matches.append({'name': row['student_name'], 'score': score})
-
-    matches.sort(key=lambda item: (-float(item['score']), item['name']))
-    return matches[:k]
+    top = get_students_snapshot(load_students_rows).index.top_students(subject_name, k)
+    return [{'name': name, 'score': score} for name, score in top]
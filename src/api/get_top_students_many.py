@@ -0,0 +1,36 @@
+"""API function for top students of several subjects."""
+
+from __future__ import annotations
+
+from ._common import load_students_rows
+from ._snapshot import get_students_snapshot
+
+
+def get_top_students_many(
+    subject_names: list[str], k: int | dict[str, int] = 3
+) -> dict[str, list[dict[str, float | str]]]:
+    """
+    Return get_top_students-like result for each subject, keyed by subject.
+
+    k is either one limit for all subjects or a per-subject mapping,
+    subjects missing from the mapping use the default k=3.
+    """
+    limits = {
+        subject_name: k.get(subject_name, 3) if isinstance(k, dict) else k
+        for subject_name in subject_names
+    }
+    if any(limit > 10 for limit in limits.values()):
+        raise ValueError('k must be <= 10')
+
+    index = get_students_snapshot(load_students_rows).index
+
+    result: dict[str, list[dict[str, float | str]]] = {}
+    for subject_name, limit in limits.items():
+        if not subject_name.strip() or limit < 1:
+            result[subject_name] = []
+            continue
+        result[subject_name] = [
+            {'name': name, 'score': score}
+            for name, score in index.top_students(subject_name, limit)
+        ]
+    return result
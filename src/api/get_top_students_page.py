@@ -0,0 +1,85 @@
+"""API functions for paging through subject ranking."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+
+from ._common import load_students_rows
+from ._query import RankingKey
+from ._snapshot import get_students_snapshot
+
+MAX_PAGE_SIZE = 1000
+
+
+def _encode_cursor(subject_name: str, key: RankingKey) -> str:
+    payload = json.dumps([subject_name, *key], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str, subject_name: str) -> RankingKey:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        cursor_subject, score, name, seen = payload
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as ex:
+        raise ValueError('invalid cursor') from ex
+    if cursor_subject != subject_name:
+        raise ValueError('cursor belongs to another subject')
+    return float(score), str(name), int(seen)
+
+
+def _next_key(page: list[tuple[str, float]], after: RankingKey | None) -> RankingKey:
+    """Key of last item, seen counts its repeats so duplicates are not lost."""
+    name, score = page[-1]
+    seen = 0
+    for item in reversed(page):
+        if item != (name, score):
+            break
+        seen += 1
+    if seen == len(page) and after is not None and after[:2] == (score, name):
+        seen += after[2]
+    return score, name, seen
+
+
+def get_top_students_page(
+    subject_name: str, page_size: int = 10, cursor: str | None = None
+) -> dict[str, list[dict[str, float | str]] | str | None]:
+    """
+    Return one page of subject ranking ordered by (-score, name).
+
+    cursor is the next_cursor of the previous page. It stores the last
+    (score, name), so each page costs O(page_size) on the precomputed
+    ranking and stays valid when data is reloaded.
+    Example output: {'students': [{'name': ..., 'score': 4.9}], 'next_cursor': '...'}
+    """
+    if page_size > MAX_PAGE_SIZE:
+        raise ValueError(f'page_size must be <= {MAX_PAGE_SIZE}')
+    if not subject_name.strip() or page_size < 1:
+        return {'students': [], 'next_cursor': None}
+
+    after = _decode_cursor(cursor, subject_name) if cursor else None
+    index = get_students_snapshot(load_students_rows).index
+    page = index.ranking_page(subject_name, after, page_size)
+
+    next_cursor = None
+    if len(page) == page_size:
+        next_cursor = _encode_cursor(subject_name, _next_key(page, after))
+    return {
+        'students': [{'name': name, 'score': score} for name, score in page],
+        'next_cursor': next_cursor,
+    }
+
+
+def iter_top_students(
+    subject_name: str, page_size: int = 100
+) -> Iterator[dict[str, float | str]]:
+    """Yield all students of subject in ranking order, page by page."""
+    cursor = None
+    while True:
+        page = get_top_students_page(subject_name, page_size, cursor)
+        yield from page['students']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return
@@ -0,0 +1,80 @@
+"""API function for filtered queries over student scores."""
+
+from __future__ import annotations
+
+from ._common import load_students_rows
+from ._query import ORDERS, StudentsQuery
+from ._snapshot import get_students_snapshot
+
+AGGREGATES = ('count', 'avg', 'min', 'max')
+THRESHOLDS = ('overall_avg', 'subject_avg')
+
+
+def query_students(
+    subject_name: str | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+    above: float | str | None = None,
+    name_prefix: str | None = None,
+    order_by: str = 'score_desc',
+    limit: int | None = None,
+    aggregate: str | None = None,
+) -> list[dict[str, float | str]] | dict[str, float | int]:
+    """
+    Filter, order and limit student scores, optionally aggregating the result.
+
+    Works like SQL: filters, then order_by ('score_desc', 'score_asc',
+    'name') and limit, then aggregate ('count', 'avg', 'min', 'max') over the
+    remaining rows. above is a strict lower bound and may be 'overall_avg' or
+    'subject_avg' to compare with get_avg_overall_score/get_avg_score values.
+
+    Example: how many of top-10 in Optimization Theory are above overall
+    average -> query_students('Optimization Theory', above='overall_avg',
+    limit=10, aggregate='count') -> {'count': 9}
+    """
+    if order_by not in ORDERS:
+        raise ValueError(f'order_by must be one of {ORDERS}')
+    if aggregate is not None and aggregate not in AGGREGATES:
+        raise ValueError(f'aggregate must be one of {AGGREGATES}')
+    if isinstance(above, str) and above not in THRESHOLDS:
+        raise ValueError(f'above must be a number or one of {THRESHOLDS}')
+    if subject_name is not None and not subject_name.strip():
+        subject_name = None
+
+    index = get_students_snapshot(load_students_rows).index
+
+    if above == 'overall_avg':
+        avg_score = index.avg_overall_score()
+        above = None if avg_score is None else round(avg_score, 1)
+    elif above == 'subject_avg':
+        if subject_name is None:
+            raise ValueError("above='subject_avg' requires subject_name")
+        avg_score = index.avg_score(subject_name)
+        above = None if avg_score is None else round(avg_score, 1)
+
+    query = StudentsQuery(
+        subject_name=subject_name,
+        min_score=min_score,
+        max_score=max_score,
+        above=above,
+        name_prefix=name_prefix,
+        order_by=order_by,
+        limit=limit,
+    )
+
+    if aggregate is None:
+        return [
+            {'name': name, 'subject_name': subject, 'score': score}
+            for name, subject, score in index.query_rows(query)
+        ]
+
+    count, total, min_score_value, max_score_value = index.query_stats(query)
+    if aggregate == 'count':
+        return {'count': count}
+    if not count:
+        return {}
+    if aggregate == 'avg':
+        return {'avg_score': round(total / count, 1)}
+    if aggregate == 'min':
+        return {'min_score': min_score_value}
+    return {'max_score': max_score_value}
@@ -0,0 +1,17 @@
+"""API function for setting a student score."""
+
+from __future__ import annotations
+
+from ._log import append_score
+
+
+def upsert_score(
+    student_name: str, subject_name: str, score: float
+) -> dict[str, float | str]:
+    """
+    Set score of student in subject, replacing all its previous rows.
+
+    Like add_score, the update goes to the append-only score log.
+    """
+    stored = append_score('upsert', student_name, subject_name, score)
+    return {'name': student_name, 'subject_name': subject_name, 'score': stored}
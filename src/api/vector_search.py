@@ -3,21 +3,94 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections.abc import Callable, Sequence
 from pathlib import Path
-
-import faiss
-import numpy as np
+from typing import Any
 
 from src.utils import get_embeddings
 
+# faiss and numpy are imported inside functions: importing them costs hundreds
+# of ms, and callers of the scalar students API should not pay it
+
 DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
 COURSES_DIR = DATA_DIR / 'courses'
 FAISS_INDEX_PATH = COURSES_DIR / 'faiss.index'
 RAG_CHUNKS_PATH = COURSES_DIR / 'rag_chunks.json'
+INDEX_META_PATH = COURSES_DIR / 'index_meta.json'
+RAG_CHUNKS_BLOB_PATH = COURSES_DIR / 'rag_chunks.bin'
+RAG_CHUNKS_OFFSETS_PATH = COURSES_DIR / 'rag_chunks_offsets.npy'
+FAISS_VECTORS_PATH = COURSES_DIR / 'faiss_vectors.npy'
+BM25_INDEX_PATH = COURSES_DIR / 'bm25.npz'
+# FAISS ids for fixed agent retrieval queries, written with the index
+QUERY_RESULTS_PATH = COURSES_DIR / 'query_results.json'
+
+# vector: FAISS only; lexical: BM25 only, no embeddings request;
+# hybrid: both rankings fused with reciprocal rank fusion
+SEARCH_MODES = ('vector', 'hybrid', 'lexical')
+SEARCH_MODE = os.getenv('VECTOR_SEARCH_MODE', 'vector')
+# RRF score of a chunk is sum of 1 / (RRF_K + rank) over rankings
+RRF_K = 60
+# candidates taken from each ranking before fusion
+HYBRID_DEPTH = 50
+
+# IVF inverted lists live in faiss-<id>.ivfdata next to the index and are mapped
+IVF_INDEX_TYPES = ('ivf', 'ivfpq')
+
+# (inode, mtime_ns, size) of index, chunks and index metadata files
+Signature = tuple[tuple[int, int, int] | None, ...]
+
+# name -> (signature, loaded data) of the last loaded files, entries are
+# replaced as a whole: 'vector' is (faiss index, chunks), 'lexical' is
+# (BM25 index, chunks), 'queries' is precomputed ids by query
+_SEARCH_CACHE: dict[str, tuple[Signature, Any]] = {}
+_SEARCH_LOCK = threading.Lock()
+
+
+def _file_signature(path: Path) -> tuple[int, int, int] | None:
+    """Return (inode, mtime_ns, size) of file or None when it is missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _search_signature() -> Signature:
+    return (
+        _file_signature(FAISS_INDEX_PATH),
+        _file_signature(RAG_CHUNKS_PATH),
+        _file_signature(INDEX_META_PATH),
+        _file_signature(RAG_CHUNKS_BLOB_PATH),
+        _file_signature(RAG_CHUNKS_OFFSETS_PATH),
+        _file_signature(FAISS_VECTORS_PATH),
+    )
+
 
+def _lexical_signature() -> Signature:
+    return (
+        _file_signature(BM25_INDEX_PATH),
+        _file_signature(RAG_CHUNKS_PATH),
+        _file_signature(RAG_CHUNKS_BLOB_PATH),
+        _file_signature(RAG_CHUNKS_OFFSETS_PATH),
+    )
+
+
+def _query_results_signature() -> Signature:
+    return (_file_signature(QUERY_RESULTS_PATH), _file_signature(INDEX_META_PATH))
+
+
+def _load_chunks() -> Sequence[str]:
+    """Load stored RAG chunks, memory-mapped when compact store exists."""
+    if RAG_CHUNKS_BLOB_PATH.exists() and RAG_CHUNKS_OFFSETS_PATH.exists():
+        from ._chunks import load_chunk_store
+
+        chunks = load_chunk_store(RAG_CHUNKS_BLOB_PATH, RAG_CHUNKS_OFFSETS_PATH)
+        if not len(chunks):
+            raise RuntimeError('vector_search // chunks list is empty')
+        return chunks
 
-def _load_chunks() -> list[str]:
-    """Load stored RAG chunks."""
     if not RAG_CHUNKS_PATH.exists():
         raise RuntimeError(
             'vector_search // chunks file is missing, run src/prepare_data.py first'
@@ -55,38 +128,306 @@ def _embed_query(query: str) -> list[float]:
         ) from ex
 
 
-def vector_search(query: str, k: int = 2) -> dict[str, list[str]]:
-    """Return top-k chunks for a query from RAG index."""
-    if not query:
-        return {'chunks': []}
-    if k < 1:
-        return {'chunks': []}
+def _read_index_meta() -> dict | None:
+    """Return metadata written by prepare_data, None for indexes built before it."""
+    try:
+        meta = json.loads(INDEX_META_PATH.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError):
+        raise RuntimeError('vector_search // failed to read index metadata')
+    if not isinstance(meta, dict) or not isinstance(meta.get('search_params'), dict):
+        raise RuntimeError('vector_search // index metadata has no search params')
+    return meta
+
 
+def _configure_index(faiss: Any, index: Any, meta: dict | None) -> None:
+    """Apply search parameters recorded by prepare_data (nprobe, efSearch)."""
+    if meta is None:
+        return
+    parameter_space = faiss.ParameterSpace()
+    for name, value in meta['search_params'].items():
+        try:
+            parameter_space.set_index_parameter(index, name, value)
+        except RuntimeError as exc:
+            raise RuntimeError(
+                f'vector_search // index does not support {name} parameter'
+            ) from exc
+
+
+def _read_index(faiss: Any, meta: dict | None) -> Any:
+    """
+    Open index so its vectors are shared between processes where possible.
+
+    Flat vectors are mapped from .npy, IVF lists from faiss-<id>.ivfdata; other
+    index types are read into memory.
+    """
+    index_type = meta['index_type'] if meta is not None else 'flat'
+    if index_type == 'flat' and FAISS_VECTORS_PATH.exists():
+        from ._chunks import load_flat_vectors
+
+        return load_flat_vectors(FAISS_VECTORS_PATH)
+
+    flags = 0
+    if index_type in IVF_INDEX_TYPES:
+        flags = faiss.IO_FLAG_ONDISK_SAME_DIR | faiss.IO_FLAG_READ_ONLY
+    try:
+        index = faiss.read_index(str(FAISS_INDEX_PATH), flags)
+    except RuntimeError as exc:
+        raise RuntimeError('vector_search // failed to load FAISS index') from exc
+    _configure_index(faiss, index, meta)
+    return index
+
+
+def _read_search_data() -> tuple[Any, Sequence[str]]:
+    """Open FAISS index and chunks and check they match."""
     if not FAISS_INDEX_PATH.exists():
         raise RuntimeError(
             'vector_search // FAISS index is missing, run src/prepare_data.py first'
         )
 
+    import faiss
+
+    chunks = _load_chunks()
+    index = _read_index(faiss, _read_index_meta())
+
+    if index.ntotal != len(chunks):
+        raise RuntimeError(
+            'vector_search // FAISS vectors count does not match chunks count'
+        )
+    return index, chunks
+
+
+def _load_cached(
+    name: str, signature_of: Callable[[], Signature], read: Callable[[], Any]
+) -> Any:
+    """
+    Return data read by read(), loaded once per version of its files.
+
+    Files are re-read when signature_of() changes, e.g. after prepare_data
+    rebuilds the index.
+    """
+    signature = signature_of()
+    cached = _SEARCH_CACHE.get(name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _SEARCH_LOCK:
+        cached = _SEARCH_CACHE.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        data = read()
+        # files changed while being read: serve them but do not cache
+        if signature == signature_of():
+            _SEARCH_CACHE[name] = (signature, data)
+        return data
+
+
+def _load_search_data() -> tuple[Any, Sequence[str]]:
+    """
+    Return FAISS index and chunks, loaded once per version of their files.
+
+    Loaded index is only searched, which FAISS allows from many threads
+    at once.
+    """
+    return _load_cached('vector', _search_signature, _read_search_data)
+
+
+def _read_lexical_data() -> tuple[Any, Sequence[str]]:
+    """Open BM25 index and chunks and check they match."""
+    if not BM25_INDEX_PATH.exists():
+        raise RuntimeError(
+            'vector_search // BM25 index is missing, run src/prepare_data.py first'
+        )
+
+    from ._bm25 import load_bm25_index
+
     chunks = _load_chunks()
+    bm25 = load_bm25_index(BM25_INDEX_PATH)
+    if bm25.n_docs != len(chunks):
+        raise RuntimeError(
+            'vector_search // BM25 documents count does not match chunks count'
+        )
+    return bm25, chunks
+
+
+def _load_lexical_data() -> tuple[Any, Sequence[str]]:
+    """Return BM25 index and chunks, cached like _load_search_data."""
+    return _load_cached('lexical', _lexical_signature, _read_lexical_data)
+
+
+def _read_query_results() -> dict[str, list[int]]:
+    """
+    Read precomputed FAISS ids of fixed queries, empty when file is missing.
 
+    Ids are valid only for the index build they were computed on, so a
+    table with another build_id than index_meta.json is ignored.
+    """
     try:
-        index = faiss.read_index(str(FAISS_INDEX_PATH))
-    except RuntimeError as exc:
-        raise RuntimeError('vector_search // failed to load FAISS index') from exc
+        payload = json.loads(QUERY_RESULTS_PATH.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError):
+        raise RuntimeError('vector_search // failed to read query results')
+    if not isinstance(payload, dict) or not isinstance(payload.get('queries'), dict):
+        raise RuntimeError('vector_search // query results have invalid format')
+
+    meta = _read_index_meta()
+    if (
+        meta is None
+        or meta.get('build_id') in (None, '')
+        or (payload.get('build_id') != meta['build_id'])
+    ):
+        return {}
+    return payload['queries']
+
+
+def _load_query_results() -> dict[str, list[int]]:
+    return _load_cached('queries', _query_results_signature, _read_query_results)
+
+
+def clear_search_cache() -> None:
+    """Drop cached indexes and chunks, next call re-reads the files."""
+    with _SEARCH_LOCK:
+        _SEARCH_CACHE.clear()
+
+
+def warmup(mode: str | None = None) -> None:
+    """Load data of search mode ahead of the first query, call at service start."""
+    mode = _check_mode(mode)
+    if mode != 'lexical':
+        _load_search_data()
+        _load_query_results()
+    if mode != 'vector':
+        _load_lexical_data()
+
+
+def _check_mode(mode: str | None) -> str:
+    mode = SEARCH_MODE if mode is None else mode
+    if mode not in SEARCH_MODES:
+        raise ValueError(f'mode must be one of {SEARCH_MODES}')
+    return mode
 
-    embedding = _embed_query(query)
-    if index.d != len(embedding):
+
+def _search_ids(index: Any, n_chunks: int, embeddings: list, k: int) -> list[list[int]]:
+    """Run one FAISS search over all query embeddings, return chunk ids per query."""
+    import numpy as np
+
+    query_vectors = np.array(embeddings, dtype=np.float32)
+    if query_vectors.shape[1] != index.d:
         raise RuntimeError(
             'vector_search // embedding dimension mismatch with FAISS index'
         )
-    if index.ntotal != len(chunks):
+
+    _, indices = index.search(query_vectors, min(k, n_chunks))
+    return [[int(idx) for idx in row if idx >= 0] for row in indices]
+
+
+def _search(
+    index: Any, chunks: Sequence[str], embeddings: list, k: int
+) -> list[list[str]]:
+    """Run one FAISS search over all query embeddings, return chunks per query."""
+    return [
+        [chunks[idx] for idx in row]
+        for row in _search_ids(index, len(chunks), embeddings, k)
+    ]
+
+
+def _vector_ids(
+    index: Any,
+    n_chunks: int,
+    queries: list[str],
+    k: int,
+    embed: Callable[[list[str]], list],
+) -> list[list[int]]:
+    """
+    Return top-k FAISS ids per query.
+
+    Queries found in the precomputed table are answered from it without
+    embedding; the rest are embedded in one embed() call.
+    """
+    precomputed = _load_query_results()
+    top_k = min(k, n_chunks)
+    result: list[list[int]] = []
+    missing: list[int] = []
+    for position, query in enumerate(queries):
+        ids = precomputed.get(query)
+        if ids is not None and len(ids) >= top_k and max(ids, default=-1) < n_chunks:
+            result.append(ids[:top_k])
+        else:
+            result.append([])
+            missing.append(position)
+
+    if missing:
+        embeddings = embed([queries[position] for position in missing])
+        found = _search_ids(index, n_chunks, embeddings, k)
+        for position, ids in zip(missing, found):
+            result[position] = ids
+    return result
+
+
+def _fuse_ranks(rankings: list[list[int]], k: int) -> list[int]:
+    """Reciprocal rank fusion of chunk id rankings, ties keep first-seen order."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking, start=1):
+            scores[idx] = scores.get(idx, 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)[:k]
+
+
+def _retrieve(
+    queries: list[str],
+    k: int,
+    mode: str,
+    embed: Callable[[list[str]], list],
+) -> list[list[str]]:
+    """
+    Return top-k chunks for each non-empty query in given search mode.
+
+    embed turns queries into embeddings; it is not called in lexical mode
+    nor for queries with precomputed results.
+    """
+    if mode == 'lexical':
+        bm25, chunks = _load_lexical_data()
+        return [[chunks[idx] for idx in bm25.search(query, k)] for query in queries]
+
+    index, chunks = _load_search_data()
+    if mode == 'vector':
+        vector_ids = _vector_ids(index, len(chunks), queries, k, embed)
+        return [[chunks[idx] for idx in ids] for ids in vector_ids]
+
+    bm25, _ = _load_lexical_data()
+    if bm25.n_docs != index.ntotal:
         raise RuntimeError(
-            'vector_search // FAISS vectors count does not match chunks count'
+            'vector_search // BM25 documents count does not match FAISS index'
         )
+    depth = max(k, HYBRID_DEPTH)
+    vector_ids = _vector_ids(index, len(chunks), queries, depth, embed)
+    return [
+        [chunks[idx] for idx in _fuse_ranks([ids, bm25.search(query, depth)], k)]
+        for query, ids in zip(queries, vector_ids)
+    ]
 
-    query_vector = np.array([embedding], dtype=np.float32)
-    top_k = min(k, len(chunks))
-    _, indices = index.search(query_vector, top_k)
 
-    result_chunks = [chunks[int(idx)] for idx in indices[0]]
-    return {'chunks': result_chunks}
+def vector_search(
+    query: str, k: int = 2, mode: str | None = None
+) -> dict[str, list[str]]:
+    """
+    Return top-k chunks for a query from RAG index.
+
+    mode is one of SEARCH_MODES, VECTOR_SEARCH_MODE env var sets the default.
+    Lexical mode needs no embeddings endpoint and returns only chunks that
+    share terms with the query, so it may return fewer than k. Queries
+    precomputed by prepare_data are not embedded in vector and hybrid modes.
+    """
+    mode = _check_mode(mode)
+    if not query:
+        return {'chunks': []}
+    if k < 1:
+        return {'chunks': []}
+
+    return {
+        'chunks': _retrieve(
+            [query], k, mode, lambda queries: [_embed_query(queries[0])]
+        )[0]
+    }
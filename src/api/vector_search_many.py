@@ -0,0 +1,41 @@
+"""API function for vector search over several queries."""
+
+from __future__ import annotations
+
+from src.utils import get_embeddings_many
+
+from .vector_search import _check_mode, _retrieve
+
+
+def _embed_queries(queries: list[str]) -> list[list[float]]:
+    """Получить эмбеддинги всех запросов одним запросом к API."""
+    try:
+        return get_embeddings_many({'input': queries})
+    except Exception as ex:
+        raise RuntimeError(
+            'vector_search // cannot extract embeddings from response'
+        ) from ex
+
+
+def vector_search_many(
+    queries: list[str], k: int = 2, mode: str | None = None
+) -> dict[str, list[list[str]]]:
+    """
+    Return vector_search-like top-k chunks for each query, in query order.
+
+    All queries are embedded in one request and searched in one FAISS call;
+    mode is as in vector_search. Empty queries get empty chunk lists.
+    Example output: {'chunks': [['chunk 1', 'chunk 2'], []]}
+    """
+    mode = _check_mode(mode)
+    result: list[list[str]] = [[] for _ in queries]
+    positions = [idx for idx, query in enumerate(queries) if query]
+    if k < 1 or not positions:
+        return {'chunks': result}
+
+    found_chunks = _retrieve(
+        [queries[idx] for idx in positions], k, mode, _embed_queries
+    )
+    for idx, found in zip(positions, found_chunks):
+        result[idx] = found
+    return {'chunks': result}
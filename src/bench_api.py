@@ -0,0 +1,277 @@
+"""Benchmark src.api functions over generated rosters of different sizes."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import src.api._common as common
+from src.api import (
+    get_avg_overall_score,
+    get_avg_score,
+    get_top_students,
+    vector_search,
+)
+from src.prepare_data import SYNTHETIC_DIR, generate_synthetic_students
+
+DEFAULT_SIZES = [10**2, 10**3, 10**4, 10**5, 10**6, 10**7]
+DEFAULT_FORMATS = ['columns']
+SUBJECTS_COUNT = 3
+SUBJECTS_PER_STUDENT = 2
+# student hash buckets per subject for partitions format
+HASH_BUCKETS = 4
+COLD_REPEATS = 3
+WARM_REPEATS = 200
+REGRESSION_THRESHOLD = 1.25
+
+BENCH_FUNCTIONS: dict[str, Callable[[], object]] = {
+    'get_top_students': lambda: get_top_students('Optimization Theory', k=10),
+    'get_avg_score': lambda: get_avg_score('Machine Learning'),
+    'get_avg_overall_score': get_avg_overall_score,
+}
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of values, q in 0..100."""
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _summary(timings: list[float]) -> dict[str, float | None]:
+    """
+    Return p50/p95 in ms and throughput in calls per second.
+
+    Throughput is None when calls took no measurable time, so the report
+    stays valid JSON.
+    """
+    total = sum(timings)
+    return {
+        'n': len(timings),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 4),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 4),
+        'throughput_per_s': round(len(timings) / total, 1) if total else None,
+    }
+
+
+def _time_call(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _use_dataset(data_dir: Path, output_format: str) -> None:
+    """Point src.api students loader to generated dataset."""
+    common.STUDENTS_BACKEND = 'csv'
+    common.STUDENTS_CSV = (
+        data_dir / 'students.csv'
+        if output_format == 'csv'
+        else data_dir / 'missing.csv'
+    )
+    common.STUDENTS_COLUMNS_DIR = (
+        data_dir / 'students_columns'
+        if output_format == 'columns'
+        else data_dir / 'missing_columns'
+    )
+    common.STUDENTS_PARTITIONS_DIR = (
+        data_dir / 'students_partitions'
+        if output_format == 'partitions'
+        else data_dir / 'missing_partitions'
+    )
+    common.clear_students_cache()
+
+
+def prepare_dataset(rows: int, output_format: str) -> Path:
+    """Generate roster with given number of rows once and reuse it later."""
+    data_dir = SYNTHETIC_DIR / f'bench_{rows}'
+    markers = {
+        'csv': data_dir / 'students.csv',
+        'columns': data_dir / 'students_columns' / 'meta.json',
+        'partitions': data_dir / 'students_partitions' / 'partitions.json',
+    }
+    marker = markers[output_format]
+    if not marker.exists():
+        generate_synthetic_students(
+            n_students=max(rows // SUBJECTS_PER_STUDENT, 1),
+            n_subjects=SUBJECTS_COUNT,
+            output_format=output_format,
+            output_dir=data_dir,
+            subjects_per_student=SUBJECTS_PER_STUDENT,
+            hash_buckets=HASH_BUCKETS,
+        )
+    return data_dir
+
+
+def bench_students_api(
+    rows: int, output_format: str, cold_repeats: int, warm_repeats: int
+) -> list[dict]:
+    """Measure cold (empty caches) and warm calls for students API functions."""
+    data_dir = prepare_dataset(rows, output_format)
+    results: list[dict] = []
+    for name, func in BENCH_FUNCTIONS.items():
+        cold: list[float] = []
+        for _ in range(cold_repeats):
+            _use_dataset(data_dir, output_format)
+            cold.append(_time_call(func))
+
+        warm = [_time_call(func) for _ in range(warm_repeats)]
+        for mode, timings in (('cold', cold), ('warm', warm)):
+            results.append(
+                {
+                    'function': name,
+                    'rows': rows,
+                    'format': output_format,
+                    'mode': mode,
+                    **_summary(timings),
+                }
+            )
+    return results
+
+
+def bench_vector_search(cold_repeats: int, warm_repeats: int) -> list[dict]:
+    """Measure vector_search, it needs the FAISS index and embeddings endpoint."""
+
+    def search() -> object:
+        return vector_search('Теория вероятности Лектор', k=3)
+
+    try:
+        cold = [_time_call(search)]
+    except Exception as ex:
+        print(f'vector_search skipped: {ex}', file=sys.stderr)
+        return []
+    cold += [_time_call(search) for _ in range(1, cold_repeats)]
+    warm = [_time_call(search) for _ in range(warm_repeats)]
+    return [
+        {
+            'function': 'vector_search',
+            'rows': None,
+            'format': 'faiss',
+            'mode': mode,
+            **_summary(timings),
+        }
+        for mode, timings in (('cold', cold), ('warm', warm))
+    ]
+
+
+def _result_key(result: dict) -> tuple:
+    return result['function'], result['rows'], result['format'], result['mode']
+
+
+def compare_with_baseline(
+    results: list[dict], baseline: list[dict], threshold: float
+) -> list[dict]:
+    """Return results whose p50 grew by more than threshold times vs baseline."""
+    baseline_by_key = {_result_key(item): item for item in baseline}
+    regressions: list[dict] = []
+    for result in results:
+        base = baseline_by_key.get(_result_key(result))
+        if base is None or not base['p50_ms']:
+            continue
+        ratio = result['p50_ms'] / base['p50_ms']
+        if ratio > threshold:
+            regressions.append(
+                {
+                    'function': result['function'],
+                    'rows': result['rows'],
+                    'format': result['format'],
+                    'mode': result['mode'],
+                    'baseline_p50_ms': base['p50_ms'],
+                    'p50_ms': result['p50_ms'],
+                    'ratio': round(ratio, 2),
+                }
+            )
+    return regressions
+
+
+def run_benchmarks(
+    sizes: list[int],
+    formats: list[str],
+    cold_repeats: int = COLD_REPEATS,
+    warm_repeats: int = WARM_REPEATS,
+    with_vector_search: bool = False,
+) -> dict:
+    """Run all benchmarks and return JSON-serializable report."""
+    saved = (
+        common.STUDENTS_BACKEND,
+        common.STUDENTS_CSV,
+        common.STUDENTS_COLUMNS_DIR,
+        common.STUDENTS_PARTITIONS_DIR,
+    )
+    results: list[dict] = []
+    try:
+        for output_format in formats:
+            for rows in sizes:
+                results += bench_students_api(
+                    rows, output_format, cold_repeats, warm_repeats
+                )
+    finally:
+        (
+            common.STUDENTS_BACKEND,
+            common.STUDENTS_CSV,
+            common.STUDENTS_COLUMNS_DIR,
+            common.STUDENTS_PARTITIONS_DIR,
+        ) = saved
+        common.clear_students_cache()
+
+    if with_vector_search:
+        results += bench_vector_search(cold_repeats, warm_repeats)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cold_repeats': cold_repeats,
+            'warm_repeats': warm_repeats,
+        },
+        'results': results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=['columns', 'csv', 'partitions'],
+        default=DEFAULT_FORMATS,
+    )
+    parser.add_argument('--cold-repeats', type=int, default=COLD_REPEATS)
+    parser.add_argument('--warm-repeats', type=int, default=WARM_REPEATS)
+    parser.add_argument('--vector-search', action='store_true')
+    parser.add_argument('--output', type=Path, help='write JSON report to file')
+    parser.add_argument('--baseline', type=Path, help='JSON report to compare with')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        sizes=args.sizes,
+        formats=args.formats,
+        cold_repeats=args.cold_repeats,
+        warm_repeats=args.warm_repeats,
+        with_vector_search=args.vector_search,
+    )
+
+    exit_code = 0
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        report['regressions'] = compare_with_baseline(
+            report['results'], baseline['results'], args.threshold
+        )
+        exit_code = 1 if report['regressions'] else 0
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(payload, encoding='utf-8')
+    print(payload)
+    return exit_code
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""Compare recall@k and search latency of FAISS index types with flat search."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from src.bench_api import _summary
+from src.prepare_data import (
+    COURSES_DIR,
+    EMBEDDINGS_PATH,
+    FAISS_VECTORS_PATH,
+    INDEX_TYPES,
+    create_faiss_index,
+)
+
+DEFAULT_K = 10
+DEFAULT_QUERIES = 200
+SYNTHETIC_CLUSTERS = 64
+SEED = 42
+
+
+def synthetic_vectors(n_vectors: int, dim: int, seed: int = SEED) -> np.ndarray:
+    """Clustered Gaussian vectors, closer to text embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(SYNTHETIC_CLUSTERS, dim))
+    labels = rng.integers(0, SYNTHETIC_CLUSTERS, size=n_vectors)
+    vectors = centers[labels] + 0.3 * rng.normal(size=(n_vectors, dim))
+    return vectors.astype(np.float32)
+
+
+def corpus_vectors(courses_dir: Path = COURSES_DIR) -> np.ndarray:
+    """
+    Read course chunk embeddings saved by build_faiss_index.
+
+    embeddings.npz is written for every index type; faiss_vectors.npy of a
+    flat index is the fallback for builds that predate it.
+    """
+    try:
+        with np.load(courses_dir / EMBEDDINGS_PATH.name) as arrays:
+            return arrays['vectors']
+    except FileNotFoundError:
+        pass
+    try:
+        return np.load(courses_dir / FAISS_VECTORS_PATH.name)
+    except FileNotFoundError as exc:
+        raise RuntimeError(
+            'bench_index // no course embeddings, run prepare_data first'
+        ) from exc
+
+
+def sample_queries(vectors: np.ndarray, n_queries: int, seed: int = SEED) -> np.ndarray:
+    """Corpus vectors with small noise, so queries are near but not on points."""
+    rng = np.random.default_rng(seed + 1)
+    picked = vectors[rng.integers(0, len(vectors), size=n_queries)]
+    noise = 0.05 * vectors.std() * rng.normal(size=picked.shape)
+    return (picked + noise).astype(np.float32)
+
+
+def _recall(found: np.ndarray, expected: np.ndarray) -> float:
+    """Mean share of exact top-k ids found by approximate search."""
+    hits = sum(
+        len(set(row.tolist()) & set(exact.tolist()))
+        for row, exact in zip(found, expected)
+    )
+    return hits / expected.size
+
+
+def bench_index_types(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = DEFAULT_K,
+    index_types: tuple[str, ...] = INDEX_TYPES,
+    **build_params,
+) -> list[dict]:
+    """
+    Build every index type over vectors and measure it on queries.
+
+    Queries are searched one by one like vector_search does; recall@k is
+    measured against IndexFlatL2 results.
+    """
+    k = min(k, len(vectors))
+    exact_index, _ = create_faiss_index(vectors, 'flat')
+    _, expected = exact_index.search(queries, k)
+
+    results: list[dict] = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index, meta = create_faiss_index(vectors, index_type, **build_params)
+        build_s = time.perf_counter() - start
+        parameter_space = faiss.ParameterSpace()
+        for name, value in meta['search_params'].items():
+            parameter_space.set_index_parameter(index, name, value)
+
+        timings: list[float] = []
+        found = np.empty_like(expected)
+        for idx in range(len(queries)):
+            start = time.perf_counter()
+            _, found[idx : idx + 1] = index.search(queries[idx : idx + 1], k)
+            timings.append(time.perf_counter() - start)
+
+        results.append(
+            {
+                'index_type': index_type,
+                'params': {**meta['params'], **meta['search_params']},
+                'vectors': len(vectors),
+                'k': k,
+                f'recall_at_{k}': round(_recall(found, expected), 4),
+                'build_s': round(build_s, 3),
+                **_summary(timings),
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--synthetic',
+        type=int,
+        help='benchmark N synthetic vectors instead of the course index',
+    )
+    parser.add_argument('--dim', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES)
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument(
+        '--index-types', nargs='+', choices=INDEX_TYPES, default=list(INDEX_TYPES)
+    )
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--nprobe', type=int, default=None)
+    parser.add_argument('--hnsw-m', type=int, default=None)
+    parser.add_argument('--ef-search', type=int, default=None)
+    parser.add_argument('--pq-m', type=int, default=None)
+    parser.add_argument('--output', type=Path, help='write JSON report to file')
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dim)
+    else:
+        vectors = corpus_vectors()
+    build_params = {
+        name: value
+        for name, value in (
+            ('nlist', args.nlist),
+            ('nprobe', args.nprobe),
+            ('hnsw_m', args.hnsw_m),
+            ('ef_search', args.ef_search),
+            ('pq_m', args.pq_m),
+        )
+        if value is not None
+    }
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'faiss': faiss.__version__,
+            'queries': args.queries,
+        },
+        'results': bench_index_types(
+            vectors,
+            sample_queries(vectors, args.queries),
+            args.k,
+            tuple(args.index_types),
+            **build_params,
+        ),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text, encoding='utf-8')
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
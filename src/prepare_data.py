@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
 import json
+import math
+import os
 import random
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import faiss
 import numpy as np
 
-from src.utils import get_embeddings
+from src.utils import get_embeddings_many
 
 SUBJECTS = [
     'Machine Learning',
@@ -54,10 +68,66 @@ STUDENTS = [
 DATA_DIR = Path(__file__).resolve().parent / 'data'
 COURSES_DIR = DATA_DIR / 'courses'
 STUDENTS_CSV = DATA_DIR / 'students.csv'
+STUDENTS_COLUMNS_DIR = DATA_DIR / 'students_columns'
+STUDENTS_PARTITIONS_DIR = DATA_DIR / 'students_partitions'
+STUDENTS_DB = DATA_DIR / 'students.db'
+SYNTHETIC_DIR = DATA_DIR / 'synthetic'
 FAISS_INDEX_PATH = COURSES_DIR / 'faiss.index'
 RAG_CHUNKS_PATH = COURSES_DIR / 'rag_chunks.json'
+INDEX_META_PATH = COURSES_DIR / 'index_meta.json'
+RAG_CHUNKS_BLOB_PATH = COURSES_DIR / 'rag_chunks.bin'
+RAG_CHUNKS_OFFSETS_PATH = COURSES_DIR / 'rag_chunks_offsets.npy'
+FAISS_VECTORS_PATH = COURSES_DIR / 'faiss_vectors.npy'
+FAISS_IVFDATA_PATH = COURSES_DIR / 'faiss.ivfdata'
+BM25_INDEX_PATH = COURSES_DIR / 'bm25.npz'
+# sha256 of every chunk with its embedding, rebuilds embed only new chunks
+EMBEDDINGS_PATH = COURSES_DIR / 'embeddings.npz'
+QUERY_RESULTS_PATH = COURSES_DIR / 'query_results.json'
+
+# FAISS index types for build_faiss_index, all use L2 distance
+INDEX_TYPES = ('flat', 'ivf', 'hnsw', 'ivfpq')
+DEFAULT_NPROBE = 8
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
 DEFAULT_SEED = 42
 
+# intent_type values of src_example.classify_intent_vector_search, with
+# SUBJECTS they enumerate fixed queries of src_example.agent._build_vector_query
+VECTOR_INTENT_TYPES = (
+    'lecturer_name',
+    'lecture_schedule',
+    'lecture_location',
+    'books_for_course',
+    'other',
+)
+
+# course pages are split into sections, long sections into parts up to this
+# many characters, so retrieval returns e.g. only the lecturer section
+MAX_CHUNK_CHARS = 1200
+# short line without sentence punctuation, e.g. 'Экзамен', starts a section
+MAX_HEADING_WORDS = 7
+# chunks are embedded in batches, one request per batch, on a thread pool;
+# requests start at most EMBEDDING_RATE_LIMIT times per second (0 = no limit)
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_WORKERS = 4
+EMBEDDING_RATE_LIMIT = 5.0
+EMBEDDING_RETRIES = 3
+EMBEDDING_RETRY_DELAY = 1.0
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+_MARKDOWN_HEADING_RE = re.compile(r'#{1,6}\s+(.+?)\s*#*$')
+
+# (subject_name, score DESC, student_name) index turns top-k into a range scan
+STUDENTS_DB_SCHEMA = """
+CREATE TABLE students (
+    student_name TEXT NOT NULL,
+    subject_name TEXT NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX idx_students_subject_score
+    ON students (subject_name, score DESC, student_name);
+"""
+
 
 def _subjects_for_student(student_idx: int, student_name: str) -> list[str]:
     """Return 1-2 subjects assigned to student."""
@@ -91,72 +161,1116 @@ def build_students_rows(seed: int = DEFAULT_SEED) -> list[dict[str, str]]:
     return rows
 
 
+def _file_signature(path: Path) -> list[int] | None:
+    """Return [mtime_ns, size] of file or None when it is missing."""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _rows_to_columns(rows: list[dict[str, str]]) -> dict[str, np.ndarray]:
+    """Dictionary-encode students rows into column arrays."""
+    student_names = sorted({row['student_name'] for row in rows})
+    subject_names = sorted({row['subject_name'] for row in rows})
+    student_lookup = {name: code for code, name in enumerate(student_names)}
+    subject_lookup = {name: code for code, name in enumerate(subject_names)}
+
+    return {
+        'student_names': np.array(student_names, dtype=str),
+        'subject_names': np.array(subject_names, dtype=str),
+        'student_codes': np.fromiter(
+            (student_lookup[row['student_name']] for row in rows),
+            dtype=np.int32,
+            count=len(rows),
+        ),
+        'subject_codes': np.fromiter(
+            (subject_lookup[row['subject_name']] for row in rows),
+            dtype=np.int32,
+            count=len(rows),
+        ),
+        'scores': np.fromiter(
+            (float(row['score']) for row in rows),
+            dtype=np.float32,
+            count=len(rows),
+        ),
+    }
+
+
+def _read_store_meta(meta_path: Path) -> dict:
+    """Return store metadata JSON, empty dict when it is missing or malformed."""
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _new_version_name() -> str:
+    return f'v-{uuid.uuid4().hex}'
+
+
+def _publish_store(store_dir: Path, meta_name: str, meta: dict) -> None:
+    """
+    Swap store metadata to the version in meta['data_dir'], drop old versions.
+
+    Files of a version are never rewritten, so readers that memory-mapped an
+    older one keep valid pages. The previous version is kept for readers
+    that read the old metadata but have not opened its files yet.
+    """
+    meta_path = store_dir / meta_name
+    previous = _read_store_meta(meta_path).get('data_dir')
+    _replace_file(
+        meta_path,
+        lambda tmp_path: tmp_path.write_text(
+            json.dumps(meta, ensure_ascii=False), encoding='utf-8'
+        ),
+    )
+    for old_dir in store_dir.glob('v-*'):
+        if old_dir.name not in {meta['data_dir'], previous}:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _save_arrays(columns: dict[str, np.ndarray], data_dir: Path) -> None:
+    """Save column arrays as .npy files into a new directory."""
+    data_dir.mkdir(parents=True)
+    for name, values in columns.items():
+        np.save(data_dir / f'{name}.npy', values)
+
+
+def _save_columns(
+    columns: dict[str, np.ndarray], columns_dir: Path, source_path: Path | None
+) -> Path:
+    """Save column arrays as a new store version, meta.json is swapped last."""
+    version = _new_version_name()
+    _save_arrays(columns, columns_dir / version)
+    meta = {
+        'format_version': 1,
+        'rows': len(columns['scores']),
+        'source_signature': (
+            _file_signature(source_path) if source_path is not None else None
+        ),
+        'data_dir': version,
+    }
+    _publish_store(columns_dir, 'meta.json', meta)
+    return columns_dir
+
+
+def write_students_columns(
+    rows: list[dict[str, str]],
+    columns_dir: Path = STUDENTS_COLUMNS_DIR,
+    source_path: Path | None = STUDENTS_CSV,
+) -> Path:
+    """
+    Write dictionary-encoded columnar copy of students rows as .npy files.
+
+    meta.json is written last and records the source CSV signature,
+    so readers ignore columns left from an older CSV.
+    """
+    return _save_columns(_rows_to_columns(rows), columns_dir, source_path)
+
+
+def _student_buckets(student_names: np.ndarray, hash_buckets: int) -> np.ndarray:
+    """Return crc32 hash bucket of every student name in dictionary."""
+    return np.fromiter(
+        (
+            zlib.crc32(name.encode('utf-8')) % hash_buckets
+            for name in student_names.tolist()
+        ),
+        dtype=np.int64,
+        count=len(student_names),
+    )
+
+
+def _write_partitions(
+    columns: dict[str, np.ndarray],
+    partitions_dir: Path,
+    hash_buckets: int,
+    source_path: Path | None,
+) -> Path:
+    """
+    Split column arrays by subject and student hash bucket.
+
+    Every partition is a columns directory with its own compact student
+    dictionary, all of them go into a new version directory. partitions.json
+    is swapped last and lists partitions in (subject, bucket) order, which is
+    the row order readers use.
+    """
+    if hash_buckets < 1:
+        raise ValueError('hash_buckets must be positive')
+    version = _new_version_name()
+
+    student_codes = np.asarray(columns['student_codes'])
+    subject_codes = np.asarray(columns['subject_codes'])
+    buckets = _student_buckets(columns['student_names'], hash_buckets)
+    keys = subject_codes.astype(np.int64) * hash_buckets + buckets[student_codes]
+    order = np.argsort(keys, kind='stable')
+    bounds = np.flatnonzero(np.diff(keys[order])) + 1
+    subject_names = columns['subject_names'].tolist()
+
+    partitions: list[dict] = []
+    for rows_idx in np.split(order, bounds) if len(order) else []:
+        key = int(keys[rows_idx[0]])
+        subject_code, bucket = divmod(key, hash_buckets)
+        codes, part_student_codes = np.unique(
+            student_codes[rows_idx], return_inverse=True
+        )
+        part_name = f'{version}/part-{len(partitions):05d}'
+        _save_arrays(
+            {
+                'student_names': columns['student_names'][codes],
+                'subject_names': np.array([subject_names[subject_code]], dtype=str),
+                'student_codes': part_student_codes.astype(np.int32),
+                'subject_codes': np.zeros(len(rows_idx), dtype=np.int32),
+                'scores': np.asarray(columns['scores'])[rows_idx],
+            },
+            partitions_dir / part_name,
+        )
+        partitions.append(
+            {
+                'dir': part_name,
+                'subject_name': subject_names[subject_code],
+                'bucket': bucket,
+                'rows': len(rows_idx),
+            }
+        )
+
+    manifest = {
+        'format_version': 1,
+        'hash_buckets': hash_buckets,
+        'rows': len(order),
+        'source_signature': (
+            _file_signature(source_path) if source_path is not None else None
+        ),
+        'partitions': partitions,
+        'data_dir': version,
+    }
+    partitions_dir.mkdir(parents=True, exist_ok=True)
+    _publish_store(partitions_dir, 'partitions.json', manifest)
+    return partitions_dir
+
+
+def write_students_partitions(
+    rows: list[dict[str, str]],
+    partitions_dir: Path = STUDENTS_PARTITIONS_DIR,
+    hash_buckets: int = 1,
+    source_path: Path | None = STUDENTS_CSV,
+) -> Path:
+    """Write students rows as per-subject columnar partitions."""
+    return _write_partitions(
+        _rows_to_columns(rows), partitions_dir, hash_buckets, source_path
+    )
+
+
+def partition_students_columns(
+    columns_dir: Path,
+    partitions_dir: Path,
+    hash_buckets: int = 1,
+    source_path: Path | None = None,
+) -> Path:
+    """Split existing columnar data into partitions without parsing rows."""
+    data_dir = columns_dir / _read_store_meta(columns_dir / 'meta.json').get(
+        'data_dir', ''
+    )
+    columns = {
+        name: np.load(data_dir / f'{name}.npy', mmap_mode='r')
+        for name in (
+            'student_names',
+            'subject_names',
+            'student_codes',
+            'subject_codes',
+            'scores',
+        )
+    }
+    return _write_partitions(columns, partitions_dir, hash_buckets, source_path)
+
+
+def _students_columns_fresh(columns_dir: Path = STUDENTS_COLUMNS_DIR) -> bool:
+    """Check that columns exist and were written from current students.csv."""
+    meta = _read_store_meta(columns_dir / 'meta.json')
+    return bool(meta) and meta.get('source_signature') == _file_signature(STUDENTS_CSV)
+
+
 def ensure_students_csv(force: bool = False, seed: int = DEFAULT_SEED) -> Path:
-    """Create students.csv when missing or when force=True."""
+    """Create students.csv and its columnar copy when missing or force=True."""
     if STUDENTS_CSV.exists() and not force:
+        if not _students_columns_fresh():
+            with STUDENTS_CSV.open('r', encoding='utf-8', newline='') as file:
+                write_students_columns(list(csv.DictReader(file)))
         return STUDENTS_CSV
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with STUDENTS_CSV.open('w', encoding='utf-8', newline='') as file:
+    rows = build_students_rows(seed=seed)
+    write_students_csv(rows)
+    write_students_columns(rows)
+    return STUDENTS_CSV
+
+
+def write_students_csv(
+    rows: list[dict[str, str]], csv_path: Path = STUDENTS_CSV
+) -> Path:
+    """Write students rows into CSV via a temporary file replacing csv_path."""
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = csv_path.with_name(csv_path.name + '.tmp')
+    with tmp_path.open('w', encoding='utf-8', newline='') as file:
         writer = csv.DictWriter(
             file,
             fieldnames=['student_name', 'subject_name', 'score'],
         )
         writer.writeheader()
-        for row in build_students_rows(seed=seed):
+        for row in rows:
             writer.writerow(row)
-    return STUDENTS_CSV
+    tmp_path.replace(csv_path)
+    return csv_path
 
 
-def _load_markdown_chunks() -> list[str]:
-    """Load markdown files from data directory as one chunk per file."""
+def write_students_db(rows: list[dict[str, str]], db_path: Path = STUDENTS_DB) -> Path:
+    """
+    Write students rows into a new SQLite file.
+
+    Data goes into a temporary file that atomically replaces db_path,
+    so readers never see a half-written database.
+    """
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(STUDENTS_DB_SCHEMA)
+        connection.executemany(
+            'INSERT INTO students (student_name, subject_name, score) VALUES (?, ?, ?)',
+            (
+                (row['student_name'], row['subject_name'], float(row['score']))
+                for row in rows
+            ),
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    tmp_path.replace(db_path)
+    return db_path
+
+
+def ensure_students_db(force: bool = False) -> Path:
+    """Create students.db from students.csv when missing or when force=True."""
+    if STUDENTS_DB.exists() and not force:
+        return STUDENTS_DB
+    ensure_students_csv()
+    with STUDENTS_CSV.open('r', encoding='utf-8', newline='') as file:
+        return write_students_db(list(csv.DictReader(file)))
+
+
+def synthetic_subject_names(n_subjects: int) -> list[str]:
+    """Return subject names for synthetic roster, real subjects go first."""
+    extra = [f'Subject {idx:04d}' for idx in range(len(SUBJECTS), n_subjects)]
+    return (SUBJECTS + extra)[:n_subjects]
+
+
+def synthetic_student_names(n_students: int) -> list[str]:
+    """Return zero-padded student names, sorted order equals index order."""
+    width = len(str(max(n_students - 1, 0)))
+    return [f'Student {idx:0{width}d}' for idx in range(n_students)]
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 finalizer over uint64 array."""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def synthetic_scores(
+    student_idx: np.ndarray, subject_idx: np.ndarray, seed: int = DEFAULT_SEED
+) -> np.ndarray:
+    """
+    Build seed-deterministic scores in range 3.0..5.0 for (student, subject) cells.
+
+    Like _score_for, every cell depends only on (seed, student, subject), but
+    the value comes from a counter-based hash instead of a random.Random per
+    cell, so any chunk of cells is computed in one vectorized step and the
+    result does not depend on chunking or worker count.
+    """
+    with np.errstate(over='ignore'):
+        keys = _splitmix64(np.full(student_idx.shape, seed, dtype=np.uint64))
+        keys = _splitmix64(keys ^ student_idx.astype(np.uint64))
+        keys = _splitmix64(keys ^ subject_idx.astype(np.uint64))
+    uniform = (keys >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    return np.round(3.0 + 2.0 * uniform, 1)
+
+
+def _synthetic_chunk(
+    args: tuple[int, int, int, int, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (student_idx, subject_idx, scores) for students [start, stop)."""
+    start, stop, n_subjects, subjects_per_student, seed = args
+    per_student = min(subjects_per_student, n_subjects)
+    student_idx = np.repeat(np.arange(start, stop, dtype=np.int64), per_student)
+    offsets = np.tile(np.arange(per_student, dtype=np.int64), stop - start)
+    subject_idx = (student_idx + offsets) % n_subjects
+    return student_idx, subject_idx, synthetic_scores(student_idx, subject_idx, seed)
+
+
+def _map_bounded(executor, fn, tasks: list, window: int):
+    """
+    Yield fn(task) for tasks in order, keeping at most window tasks submitted.
+
+    executor.map submits every task up front, so results of all chunks could
+    pile up while the writer falls behind.
+    """
+    pending: deque[Future] = deque()
+    try:
+        for task in tasks:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, task))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # writer failed or stopped early: drop chunks not started yet
+        for future in pending:
+            future.cancel()
+
+
+def generate_synthetic_students(
+    n_students: int,
+    n_subjects: int,
+    output_format: str = 'columns',
+    output_dir: Path = SYNTHETIC_DIR,
+    seed: int = DEFAULT_SEED,
+    subjects_per_student: int = 2,
+    chunk_students: int = 500_000,
+    workers: int | None = None,
+    hash_buckets: int = 1,
+) -> Path:
+    """
+    Generate large deterministic roster as students.csv or students_columns/.
+
+    output_format='partitions' also splits the columns into
+    students_partitions/ by subject and hash_buckets student buckets.
+
+    Student i takes subjects i, i+1, ... (mod n_subjects), like the fixed
+    roster. Chunks of students are scored on a process pool (workers=1 runs
+    in-process) and streamed to disk in order. At most two chunks per worker
+    are submitted ahead of the writer, so memory stays bounded by that many
+    chunks for CSV and by the mmap'd output for columns.
+    """
+    if output_format not in {'csv', 'columns', 'partitions'}:
+        raise ValueError(f'Unknown output format: {output_format}')
+    if n_students < 1 or n_subjects < 1:
+        raise ValueError('n_students and n_subjects must be positive')
+
+    student_names = synthetic_student_names(n_students)
+    subject_names = synthetic_subject_names(n_subjects)
+    tasks = [
+        (
+            start,
+            min(start + chunk_students, n_students),
+            n_subjects,
+            subjects_per_student,
+            seed,
+        )
+        for start in range(0, n_students, chunk_students)
+    ]
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if workers == 1:
+        chunks = map(_synthetic_chunk, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunks = _map_bounded(
+            executor, _synthetic_chunk, tasks, 2 * (workers or os.cpu_count() or 1)
+        )
+
+    try:
+        if output_format == 'csv':
+            return _write_synthetic_csv(
+                chunks, output_dir / 'students.csv', student_names, subject_names
+            )
+        n_rows = n_students * min(subjects_per_student, n_subjects)
+        columns_dir = _write_synthetic_columns(
+            chunks,
+            output_dir / 'students_columns',
+            n_rows,
+            student_names,
+            subject_names,
+        )
+        if output_format == 'columns':
+            return columns_dir
+        return partition_students_columns(
+            columns_dir, output_dir / 'students_partitions', hash_buckets
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _write_synthetic_csv(chunks, csv_path: Path, student_names, subject_names) -> Path:
+    """Stream generated chunks into students.csv."""
+    with csv_path.open('w', encoding='utf-8', newline='') as file:
+        file.write('student_name,subject_name,score\n')
+        for student_idx, subject_idx, scores in chunks:
+            file.writelines(
+                f'{student_names[student]},{subject_names[subject]},{score:.1f}\n'
+                for student, subject, score in zip(
+                    student_idx.tolist(), subject_idx.tolist(), scores.tolist()
+                )
+            )
+    return csv_path
+
+
+def _write_synthetic_columns(
+    chunks, columns_dir: Path, n_rows: int, student_names, subject_names
+) -> Path:
+    """Stream generated chunks into preallocated .npy files of a new version."""
+    version = _new_version_name()
+    data_dir = columns_dir / version
+    data_dir.mkdir(parents=True)
+
+    # dictionaries must be sorted, map generator subject index to sorted code
+    subject_order = np.argsort(np.array(subject_names, dtype=str), kind='stable')
+    subject_codes_by_idx = np.empty(len(subject_names), dtype=np.int32)
+    subject_codes_by_idx[subject_order] = np.arange(len(subject_names))
+
+    np.save(data_dir / 'student_names.npy', np.array(student_names, dtype=str))
+    np.save(data_dir / 'subject_names.npy', np.array(sorted(subject_names), dtype=str))
+    student_codes = np.lib.format.open_memmap(
+        data_dir / 'student_codes.npy', mode='w+', dtype=np.int32, shape=(n_rows,)
+    )
+    subject_codes = np.lib.format.open_memmap(
+        data_dir / 'subject_codes.npy', mode='w+', dtype=np.int32, shape=(n_rows,)
+    )
+    scores_column = np.lib.format.open_memmap(
+        data_dir / 'scores.npy', mode='w+', dtype=np.float32, shape=(n_rows,)
+    )
+
+    offset = 0
+    for student_idx, subject_idx, scores in chunks:
+        stop = offset + len(scores)
+        student_codes[offset:stop] = student_idx
+        subject_codes[offset:stop] = subject_codes_by_idx[subject_idx]
+        scores_column[offset:stop] = scores
+        offset = stop
+    for column in (student_codes, subject_codes, scores_column):
+        column.flush()
+    del student_codes, subject_codes, scores_column
+
+    meta = {
+        'format_version': 1,
+        'rows': n_rows,
+        'source_signature': None,
+        'data_dir': version,
+    }
+    _publish_store(columns_dir, 'meta.json', meta)
+    return columns_dir
+
+
+def _section_heading(line: str) -> str | None:
+    """Return heading text if line is a section heading."""
+    markdown_heading = _MARKDOWN_HEADING_RE.fullmatch(line)
+    if markdown_heading:
+        return markdown_heading.group(1)
+    heading = line.removesuffix(':')
+    # 'Лекции:' introduces a section, a long line with colon is a sentence
+    max_words = MAX_HEADING_WORDS if heading == line else 3
+    if (
+        not heading
+        or len(heading.split()) > max_words
+        or heading[0] in '|-*+>'
+        or heading[0].isdigit()
+        or heading[-1] in '.,;!?)'
+        or ':' in heading
+        # 'ПР — средняя оценка', 'Руководитель курса - Виктор Кантор'
+        or any(dash in heading for dash in (' - ', ' – ', ' — '))
+    ):
+        return None
+    return heading
+
+
+def _split_long_paragraph(paragraph: str, max_chars: int) -> list[str]:
+    """Split paragraph by lines, then sentences; table parts repeat the header."""
+    lines = paragraph.splitlines()
+    header: list[str] = []
+    if len(lines) > 2 and lines[0].startswith('|') and lines[1].startswith('|'):
+        header, lines = lines[:2], lines[2:]
+    lines = [
+        piece
+        for line in lines
+        for piece in (_SENTENCE_END_RE.split(line) if len(line) > max_chars else [line])
+    ]
+
+    parts: list[str] = []
+    current: list[str] = []
+    for line in lines:
+        if current and len('\n'.join([*header, *current, line])) > max_chars:
+            parts.append('\n'.join([*header, *current]))
+            current = []
+        current.append(line)
+    if current:
+        parts.append('\n'.join([*header, *current]))
+    return parts
+
+
+def _pack_paragraphs(paragraphs: list[str], max_chars: int) -> list[str]:
+    """Join consecutive paragraphs into parts of at most max_chars."""
+    parts: list[str] = []
+    current = ''
+    for paragraph in paragraphs:
+        pieces = (
+            _split_long_paragraph(paragraph, max_chars)
+            if len(paragraph) > max_chars
+            else [paragraph]
+        )
+        for piece in pieces:
+            if current and len(current) + 2 + len(piece) > max_chars:
+                parts.append(current)
+                current = ''
+            current = f'{current}\n\n{piece}' if current else piece
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_course_page(
+    text: str, file_name: str, max_chars: int = MAX_CHUNK_CHARS
+) -> list[tuple[str, dict[str, str]]]:
+    """
+    Split course page into (chunk, metadata) pairs by sections.
+
+    First line is the course title, a section starts at a markdown heading
+    or a short standalone line. Chunk text starts with 'title — section'
+    so a chunk stays meaningful without the rest of the page; max_chars
+    caps the body, only a single sentence longer than it is kept whole.
+    """
+    paragraphs = [
+        paragraph.strip()
+        for paragraph in re.split(r'\n\s*\n', text.strip())
+        if paragraph.strip()
+    ]
+    if not paragraphs:
+        return []
+    title_lines = paragraphs[0].split('\n', 1)
+    title = _section_heading(title_lines[0]) or title_lines[0]
+    if len(title_lines) > 1:
+        paragraphs[0] = title_lines[1].strip()
+    else:
+        paragraphs.pop(0)
+
+    sections: list[tuple[str, list[str]]] = [('', [])]
+    for paragraph in paragraphs:
+        first_line, _, rest = paragraph.partition('\n')
+        heading = _section_heading(first_line)
+        if heading is None:
+            sections[-1][1].append(paragraph)
+            continue
+        sections.append((heading, [rest.strip()] if rest.strip() else []))
+
+    chunks: list[tuple[str, dict[str, str]]] = []
+    for section, section_paragraphs in sections:
+        header = f'{title} — {section}' if section else title
+        metadata = {'file': file_name, 'title': title, 'section': section}
+        for part in _pack_paragraphs(section_paragraphs, max_chars):
+            chunks.append((f'{header}\n\n{part}', metadata))
+    return chunks
+
+
+def _load_course_chunks() -> tuple[list[str], list[dict[str, str]]]:
+    """Load markdown files from data directory as section chunks with metadata."""
     chunks: list[str] = []
+    metadata: list[dict[str, str]] = []
     for file_path in sorted(COURSES_DIR.glob('*.md')):
-        text = file_path.read_text(encoding='utf-8').strip()
-        if text:
-            chunks.append(text)
-    return chunks
+        text = file_path.read_text(encoding='utf-8')
+        for chunk, chunk_metadata in split_course_page(text, file_path.name):
+            chunks.append(chunk)
+            metadata.append(chunk_metadata)
+    return chunks, metadata
+
 
+def _load_markdown_chunks() -> list[str]:
+    """Load markdown files from data directory as section chunks."""
+    return _load_course_chunks()[0]
 
-def _extract_embeddings(chunks: list[str]) -> list[list[float]]:
-    """Fetch embedding for each chunk one by one."""
+
+class _RateLimiter:
+    """Space calls at least 1 / rate seconds apart across threads."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self._interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+def _embed_batch(
+    batch_idx: int, texts: list[str], limiter: _RateLimiter, retries: int
+) -> list[list[float]]:
+    """Embed one batch, retrying failed requests with exponential backoff."""
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            return get_embeddings_many({'input': texts})
+        except Exception as ex:
+            if attempt == retries:
+                raise RuntimeError(
+                    f'Embeddings batch {batch_idx} failed after '
+                    f'{retries + 1} attempts: {ex}'
+                ) from ex
+            delay = EMBEDDING_RETRY_DELAY * 2**attempt
+            print(
+                f'Embeddings batch {batch_idx} failed ({ex}), '
+                f'retry {attempt + 1}/{retries} in {delay:.1f}s',
+                file=sys.stderr,
+            )
+            time.sleep(delay)
+    raise AssertionError('unreachable')
+
+
+def _extract_embeddings(
+    chunks: list[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    workers: int = EMBEDDING_WORKERS,
+    rate_limit: float = EMBEDDING_RATE_LIMIT,
+    retries: int = EMBEDDING_RETRIES,
+) -> list[list[float]]:
+    """
+    Fetch embeddings of chunks in batches on a bounded thread pool.
+
+    Embeddings are returned in chunk order. Every batch is retried on its
+    own; when some still fail, the error names all failed batches, and
+    batches that succeeded stay in the embeddings cache for the next run.
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive')
+    batches = [
+        chunks[start : start + batch_size]
+        for start in range(0, len(chunks), batch_size)
+    ]
+    limiter = _RateLimiter(rate_limit)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = [
+            executor.submit(_embed_batch, batch_idx, batch, limiter, retries)
+            for batch_idx, batch in enumerate(batches)
+        ]
     embeddings: list[list[float]] = []
-    for chunk in chunks:
-        embedding = get_embeddings({'input': chunk}, verbose=True)
-        embeddings.append(embedding)
+    errors: list[str] = []
+    for future in futures:
+        try:
+            embeddings.extend(future.result())
+        except RuntimeError as ex:
+            errors.append(str(ex))
+    if errors:
+        raise RuntimeError(
+            f'{len(errors)} of {len(batches)} embeddings batches failed: '
+            + '; '.join(errors)
+        )
     return embeddings
 
 
-def build_faiss_index(force: bool = True) -> Path:
-    """Build and persist FAISS index for markdown chunks."""
+def _chunk_hash(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+
+def _embedding_model() -> str:
+    from src_example import config
+
+    return config.default_embedding_model
+
+
+def _load_embeddings(
+    model: str, embeddings_path: Path = EMBEDDINGS_PATH
+) -> dict[str, np.ndarray]:
+    """Return stored embeddings by chunk hash, empty if missing or for other model."""
+    try:
+        with np.load(embeddings_path) as arrays:
+            stored_model = str(arrays['model'])
+            hashes = arrays['hashes'].tolist()
+            vectors = arrays['vectors']
+    except (FileNotFoundError, KeyError, OSError, ValueError):
+        return {}
+    if stored_model != model or vectors.ndim != 2 or len(vectors) != len(hashes):
+        return {}
+    return dict(zip(hashes, vectors))
+
+
+def embed_chunks(
+    chunks: list[str],
+    reembed: bool = False,
+    embeddings_path: Path = EMBEDDINGS_PATH,
+    **extract_params,
+) -> np.ndarray:
+    """
+    Return float32 embeddings of chunks, fetching only chunks not seen before.
+
+    Embeddings are stored by chunk content hash for the current embedding
+    model; hashes and vectors share one .npz file, so a rebuild replaces
+    them together, and it holds only current chunks, so removed chunks are
+    dropped. reembed=True ignores stored embeddings.
+    extract_params are passed to _extract_embeddings.
+    """
+    model = _embedding_model()
+    hashes = [_chunk_hash(chunk) for chunk in chunks]
+    stored = {} if reembed else _load_embeddings(model, embeddings_path)
+
+    missing = {
+        chunk_hash: chunk
+        for chunk_hash, chunk in zip(hashes, chunks)
+        if chunk_hash not in stored
+    }
+    if missing:
+        embeddings = _extract_embeddings(list(missing.values()), **extract_params)
+        if len(embeddings) != len(missing):
+            raise RuntimeError(
+                f'Embeddings count mismatch: expected {len(missing)}, '
+                f'got {len(embeddings)}'
+            )
+        fetched = np.array(embeddings, dtype=np.float32)
+        if stored and fetched.shape[1] != next(iter(stored.values())).shape[0]:
+            raise RuntimeError('Embeddings dimension changed, rebuild with reembed')
+        stored.update(zip(missing, fetched))
+
+    vectors = np.array([stored[chunk_hash] for chunk_hash in hashes], dtype=np.float32)
+
+    def write(tmp_path: Path) -> None:
+        with tmp_path.open('wb') as file:
+            np.savez(
+                file, model=np.array(model), hashes=np.array(hashes), vectors=vectors
+            )
+
+    _replace_file(embeddings_path, write)
+    return vectors
+
+
+def _pq_subquantizers(dim: int) -> int:
+    """Largest divisor of dim up to 64, PQ needs dim % m == 0."""
+    return max(m for m in range(1, min(dim, 64) + 1) if dim % m == 0)
+
+
+def create_faiss_index(
+    vectors: np.ndarray,
+    index_type: str = 'flat',
+    nlist: int | None = None,
+    nprobe: int = DEFAULT_NPROBE,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    ef_search: int = DEFAULT_EF_SEARCH,
+    pq_m: int | None = None,
+) -> tuple[faiss.Index, dict]:
+    """
+    Build and fill FAISS index of given type, return it with its metadata.
+
+    nlist defaults to 4 * sqrt(n) inverted lists and is capped by the number
+    of vectors, as are PQ centroids, so tiny corpora still train. Metadata
+    keeps build parameters and search parameters vector_search applies.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f'index_type must be one of {INDEX_TYPES}')
+    n_vectors, dim = vectors.shape
+    params: dict[str, int] = {}
+    search_params: dict[str, int] = {}
+
+    if index_type == 'flat':
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        params['M'] = hnsw_m
+        search_params['efSearch'] = ef_search
+    else:
+        if nlist is None:
+            nlist = int(4 * math.sqrt(n_vectors))
+        nlist = min(max(nlist, 1), n_vectors)
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == 'ivf':
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            pq_m = pq_m or _pq_subquantizers(dim)
+            nbits = min(8, max(int(math.log2(n_vectors)), 1))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, nbits)
+            params.update(pq_m=pq_m, nbits=nbits)
+        params['nlist'] = nlist
+        search_params['nprobe'] = min(max(nprobe, 1), nlist)
+        index.train(vectors)
+
+    index.add(vectors)
+    meta = {
+        'index_type': index_type,
+        'params': params,
+        'search_params': search_params,
+    }
+    return index, meta
+
+
+def _replace_file(path: Path, write) -> None:
+    """
+    Write file next to path and rename it over path.
+
+    Processes that mapped the old file keep reading its inode instead of
+    seeing it truncated.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    write(tmp_path)
+    tmp_path.replace(path)
+
+
+def _save_npy(path: Path, values: np.ndarray) -> None:
+    def write(tmp_path: Path) -> None:
+        with tmp_path.open('wb') as file:
+            np.save(file, values)
+
+    _replace_file(path, write)
+
+
+def write_chunk_store(
+    chunks: list[str],
+    blob_path: Path = RAG_CHUNKS_BLOB_PATH,
+    offsets_path: Path = RAG_CHUNKS_OFFSETS_PATH,
+) -> None:
+    """Write chunks as one UTF-8 blob and n + 1 int64 byte offsets."""
+    encoded = [chunk.encode('utf-8') for chunk in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    _replace_file(blob_path, lambda tmp_path: tmp_path.write_bytes(b''.join(encoded)))
+    _save_npy(offsets_path, offsets)
+
+
+def write_bm25_index(chunks: list[str], bm25_path: Path = BM25_INDEX_PATH) -> None:
+    """Write BM25 postings of chunks for lexical and hybrid vector_search."""
+    # imported here so that prepare_data does not load the src.api package
+    from src.api._bm25 import build_bm25_arrays
+
+    arrays = build_bm25_arrays(chunks)
+
+    def write(tmp_path: Path) -> None:
+        with tmp_path.open('wb') as file:
+            np.savez(file, **arrays)
+
+    _replace_file(bm25_path, write)
+
+
+def write_faiss_index(
+    index: faiss.Index,
+    meta: dict,
+    vectors: np.ndarray,
+    index_path: Path = FAISS_INDEX_PATH,
+) -> None:
+    """
+    Persist index in a layout vector_search can memory-map.
+
+    Flat vectors are also saved as .npy; IVF inverted lists are moved to a
+    new faiss-<id>.ivfdata next to the index, which faiss maps read-only on
+    load. The lists file is recorded in meta['ivfdata'] and the index is
+    swapped in after it, so the lists of the previous build are never
+    rewritten; older lists files are removed.
+    """
+    vectors_path = index_path.with_name(FAISS_VECTORS_PATH.name)
+    if meta['index_type'] == 'flat':
+        _save_npy(vectors_path, vectors)
+    else:
+        vectors_path.unlink(missing_ok=True)
+
+    if meta['index_type'] not in ('ivf', 'ivfpq'):
+        _replace_file(
+            index_path, lambda tmp_path: faiss.write_index(index, str(tmp_path))
+        )
+        return
+
+    previous = _read_store_meta(index_path.with_name(INDEX_META_PATH.name)).get(
+        'ivfdata', FAISS_IVFDATA_PATH.name
+    )
+    ivfdata_path = index_path.with_name(
+        f'{FAISS_IVFDATA_PATH.stem}-{uuid.uuid4().hex}{FAISS_IVFDATA_PATH.suffix}'
+    )
+    invlists = faiss.OnDiskInvertedLists(
+        index.nlist, index.code_size, str(ivfdata_path)
+    )
+    sources = faiss.InvertedListsPtrVector()
+    sources.push_back(index.invlists)
+    invlists.merge_from(sources.data(), sources.size())
+    # index takes ownership of the lists, Python must not free them
+    invlists.this.disown()
+    index.replace_invlists(invlists, True)
+    meta['ivfdata'] = ivfdata_path.name
+    _replace_file(index_path, lambda tmp_path: faiss.write_index(index, str(tmp_path)))
+    for old_path in index_path.parent.glob(f'{FAISS_IVFDATA_PATH.stem}*.ivfdata'):
+        if old_path.name not in {ivfdata_path.name, previous}:
+            old_path.unlink(missing_ok=True)
+
+
+def retrieval_templates() -> list[str]:
+    """Return distinct retrieval queries the agent builds for known subjects."""
+    from src_example.agent import _build_vector_query
+
+    templates = [
+        _build_vector_query('', {'intent_type': intent_type, 'subject_name': subject})
+        for intent_type in VECTOR_INTENT_TYPES
+        for subject in SUBJECTS
+    ]
+    return list(dict.fromkeys(templates))
+
+
+def write_query_results(
+    index: faiss.Index,
+    meta: dict,
+    queries: list[str],
+    depth: int | None = None,
+    results_path: Path = QUERY_RESULTS_PATH,
+) -> None:
+    """
+    Embed queries once and store their top-depth FAISS ids for vector_search.
+
+    depth defaults to vector_search HYBRID_DEPTH, which covers hybrid search
+    candidates, so every search mode and k up to depth is served from the
+    table. build_id ties the table to meta's index.
+    """
+    if depth is None:
+        from src.api.vector_search import HYBRID_DEPTH
+
+        depth = HYBRID_DEPTH
+    faiss.ParameterSpace().set_index_parameters(
+        index,
+        ','.join(f'{name}={value}' for name, value in meta['search_params'].items()),
+    )
+    ids: list[list[int]] = []
+    if queries:
+        embeddings = np.array(get_embeddings_many({'input': queries}), dtype=np.float32)
+        _, found = index.search(embeddings, min(depth, index.ntotal))
+        ids = [[int(idx) for idx in row if idx >= 0] for row in found]
+    payload = {
+        'build_id': meta['build_id'],
+        'queries': dict(zip(queries, ids)),
+    }
+    _replace_file(
+        results_path,
+        lambda tmp_path: tmp_path.write_text(
+            json.dumps(payload, ensure_ascii=False), encoding='utf-8'
+        ),
+    )
+
+
+def build_faiss_index(
+    force: bool = True,
+    index_type: str = 'flat',
+    nlist: int | None = None,
+    nprobe: int = DEFAULT_NPROBE,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    ef_search: int = DEFAULT_EF_SEARCH,
+    pq_m: int | None = None,
+    embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+    embedding_workers: int = EMBEDDING_WORKERS,
+    embedding_rate_limit: float = EMBEDDING_RATE_LIMIT,
+    reembed: bool = False,
+) -> Path:
+    """
+    Build and persist FAISS and BM25 indexes for markdown chunks.
+
+    index_type is one of INDEX_TYPES; the choice and its search parameters
+    are written to index_meta.json for vector_search, along with a build_id
+    that invalidates results precomputed for the agent's retrieval queries.
+    Only new or changed chunks are embedded unless reembed is set, see
+    embed_chunks;
+    embedding_* options are passed to _extract_embeddings.
+    Every file is written next to its path and renamed over it, so
+    processes serving the previous build never read a half-written file.
+    """
     if FAISS_INDEX_PATH.exists() and RAG_CHUNKS_PATH.exists() and not force:
         return FAISS_INDEX_PATH
 
     COURSES_DIR.mkdir(parents=True, exist_ok=True)
-    chunks = _load_markdown_chunks()
+    chunks, metadata = _load_course_chunks()
     if not chunks:
         raise RuntimeError(
             'No markdown files found in src/data/courses to build FAISS index'
         )
 
-    embeddings = _extract_embeddings(chunks)
-    if len(embeddings) != len(chunks):
-        raise RuntimeError(
-            f'Embeddings count mismatch: expected {len(chunks)}, got {len(embeddings)}'
-        )
-
-    vectors = np.array(embeddings, dtype=np.float32)
-    index = faiss.IndexFlatL2(vectors.shape[1])
-    index.add(vectors)
-    faiss.write_index(index, str(FAISS_INDEX_PATH))
-    RAG_CHUNKS_PATH.write_text(
-        json.dumps({'chunks': chunks}, ensure_ascii=False, indent=2),
-        encoding='utf-8',
+    vectors = embed_chunks(
+        chunks,
+        reembed,
+        batch_size=embedding_batch_size,
+        workers=embedding_workers,
+        rate_limit=embedding_rate_limit,
+    )
+    index, meta = create_faiss_index(
+        vectors, index_type, nlist, nprobe, hnsw_m, ef_search, pq_m
+    )
+    meta['build_id'] = uuid.uuid4().hex
+    write_query_results(index, meta, retrieval_templates())
+    write_faiss_index(index, meta, vectors)
+    write_chunk_store(chunks)
+    write_bm25_index(chunks)
+    _replace_file(
+        RAG_CHUNKS_PATH,
+        lambda tmp_path: tmp_path.write_text(
+            json.dumps(
+                {'chunks': chunks, 'metadata': metadata}, ensure_ascii=False, indent=2
+            ),
+            encoding='utf-8',
+        ),
+    )
+    # written last: its build_id switches readers to the precomputed results
+    # and search parameters of this build
+    _replace_file(
+        INDEX_META_PATH,
+        lambda tmp_path: tmp_path.write_text(json.dumps(meta), encoding='utf-8'),
     )
     return FAISS_INDEX_PATH
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prepare students data and index')
+    parser.add_argument(
+        '--synthetic-students',
+        type=int,
+        help='generate synthetic roster with N students into src/data/synthetic',
+    )
+    parser.add_argument('--synthetic-subjects', type=int, default=len(SUBJECTS))
+    parser.add_argument(
+        '--format', choices=['columns', 'csv', 'partitions'], default='columns'
+    )
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--index-type', choices=INDEX_TYPES, default='flat')
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE)
+    parser.add_argument('--hnsw-m', type=int, default=DEFAULT_HNSW_M)
+    parser.add_argument('--ef-search', type=int, default=DEFAULT_EF_SEARCH)
+    parser.add_argument('--pq-m', type=int, default=None)
+    parser.add_argument(
+        '--embedding-batch-size', type=int, default=EMBEDDING_BATCH_SIZE
+    )
+    parser.add_argument('--embedding-workers', type=int, default=EMBEDDING_WORKERS)
+    parser.add_argument(
+        '--embedding-rate-limit',
+        type=float,
+        default=EMBEDDING_RATE_LIMIT,
+        help='max embeddings requests per second, 0 disables the limit',
+    )
+    parser.add_argument(
+        '--reembed',
+        action='store_true',
+        help='embed all chunks again instead of reusing stored embeddings',
+    )
+    parser.add_argument(
+        '--hash-buckets',
+        type=int,
+        default=1,
+        help='student hash buckets per subject for --format partitions',
+    )
+    args = parser.parse_args()
+
+    if args.synthetic_students:
+        synthetic_path = generate_synthetic_students(
+            n_students=args.synthetic_students,
+            n_subjects=args.synthetic_subjects,
+            output_format=args.format,
+            workers=args.workers,
+            hash_buckets=args.hash_buckets,
+        )
+        print(f'Сгенерирован синтетический набор: {synthetic_path}')
+        raise SystemExit(0)
+
     students_csv_path = ensure_students_csv(force=True, seed=DEFAULT_SEED)
 
     print(f'Сгенерирован файл со студентами: {students_csv_path}')
@@ -165,7 +1279,21 @@ if __name__ == '__main__':
         print(f'Всего строк: {len(rows) - 1}')
         print(f'Колонки: {", ".join(rows[0])}')
 
-    faiss_index_path = build_faiss_index()
+    students_db_path = ensure_students_db(force=True)
+    print(f'Сгенерирована база SQLite: {students_db_path}')
+
+    faiss_index_path = build_faiss_index(
+        index_type=args.index_type,
+        nlist=args.nlist,
+        nprobe=args.nprobe,
+        hnsw_m=args.hnsw_m,
+        ef_search=args.ef_search,
+        pq_m=args.pq_m,
+        embedding_batch_size=args.embedding_batch_size,
+        embedding_workers=args.embedding_workers,
+        embedding_rate_limit=args.embedding_rate_limit,
+        reembed=args.reembed,
+    )
 
     print(f'\nСгенерирован FAISS-индекс: {faiss_index_path}')
     rag_chunks_file = Path(
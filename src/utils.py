@@ -1,5 +1,33 @@
 """GigaChat API wrapper functions."""
 
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+# query embeddings kept in memory, 0 disables the cache
+EMBEDDINGS_CACHE_SIZE = int(os.getenv('EMBEDDINGS_CACHE_SIZE', '1024'))
+# seconds a cached embedding stays valid, 0 means forever
+EMBEDDINGS_CACHE_TTL = float(os.getenv('EMBEDDINGS_CACHE_TTL', '86400'))
+# SQLite file that keeps embeddings across restarts, unset disables it
+EMBEDDINGS_CACHE_DB: Path | None = (
+    Path(os.environ['EMBEDDINGS_CACHE_DB'])
+    if os.getenv('EMBEDDINGS_CACHE_DB')
+    else None
+)
+
+# (model, input) -> (created_at, embedding), least recently used first
+_EMBEDDINGS_CACHE: OrderedDict[tuple[str, str], tuple[float, tuple[float, ...]]] = (
+    OrderedDict()
+)
+_EMBEDDINGS_LOCK = threading.Lock()
+_DISK_LOCAL = threading.local()
+
 
 def get_chat_completions(payload: dict, **kwargs) -> dict:
     """
@@ -11,18 +39,148 @@ def get_chat_completions(payload: dict, **kwargs) -> dict:
     return post_chat_completions(payload, **kwargs)
 
 
+def _is_fresh(created_at: float) -> bool:
+    return EMBEDDINGS_CACHE_TTL <= 0 or time.time() - created_at < EMBEDDINGS_CACHE_TTL
+
+
+def _disk_connection() -> sqlite3.Connection | None:
+    """Return this thread's connection to the disk cache, None when disabled."""
+    if EMBEDDINGS_CACHE_DB is None:
+        return None
+    connection = getattr(_DISK_LOCAL, 'connection', None)
+    if connection is None or _DISK_LOCAL.path != EMBEDDINGS_CACHE_DB:
+        EMBEDDINGS_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(EMBEDDINGS_CACHE_DB, timeout=30)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings ('
+            'model TEXT NOT NULL, input TEXT NOT NULL, created_at REAL NOT NULL, '
+            'vector BLOB NOT NULL, PRIMARY KEY (model, input))'
+        )
+        connection.commit()
+        _DISK_LOCAL.connection = connection
+        _DISK_LOCAL.path = EMBEDDINGS_CACHE_DB
+    return connection
+
+
+def _remember(key: tuple[str, str], created_at: float, embedding: tuple) -> None:
+    """Put embedding into the in-memory LRU, evicting the oldest entries."""
+    if EMBEDDINGS_CACHE_SIZE <= 0:
+        return
+    with _EMBEDDINGS_LOCK:
+        _EMBEDDINGS_CACHE[key] = (created_at, embedding)
+        _EMBEDDINGS_CACHE.move_to_end(key)
+        while len(_EMBEDDINGS_CACHE) > EMBEDDINGS_CACHE_SIZE:
+            _EMBEDDINGS_CACHE.popitem(last=False)
+
+
+def _cached_embedding(key: tuple[str, str]) -> tuple[float, ...] | None:
+    """Look embedding up in memory, then on disk."""
+    with _EMBEDDINGS_LOCK:
+        cached = _EMBEDDINGS_CACHE.get(key)
+        if cached is not None:
+            if _is_fresh(cached[0]):
+                _EMBEDDINGS_CACHE.move_to_end(key)
+                return cached[1]
+            del _EMBEDDINGS_CACHE[key]
+
+    connection = _disk_connection()
+    if connection is None:
+        return None
+    row = connection.execute(
+        'SELECT created_at, vector FROM embeddings WHERE model = ? AND input = ?',
+        key,
+    ).fetchone()
+    if row is None or not _is_fresh(row[0]):
+        return None
+    embedding = tuple(array('d', row[1]))
+    _remember(key, row[0], embedding)
+    return embedding
+
+
+def _store_embedding(key: tuple[str, str], embedding: tuple[float, ...]) -> None:
+    created_at = time.time()
+    _remember(key, created_at, embedding)
+    connection = _disk_connection()
+    if connection is not None:
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)',
+                (*key, created_at, array('d', embedding).tobytes()),
+            )
+
+
+def clear_embeddings_cache() -> None:
+    """Drop in-memory embeddings, the disk cache is kept."""
+    with _EMBEDDINGS_LOCK:
+        _EMBEDDINGS_CACHE.clear()
+
+
 def get_embeddings(payload: dict, **kwargs) -> list[float]:
     """
     Create vector embeddings for input text.
 
+    Embeddings are cached by (model, exact input) in a bounded LRU and,
+    when EMBEDDINGS_CACHE_DB is set, in SQLite across restarts.
+
     Example input: {'input': 'машинное обучение'}
     Example output: [0.935546875, -0.092529296]
     """
     # raise NotImplementedError('Not implemented')
-    from src_example import post_embeddings
+    from src_example import config, post_embeddings
 
     assert 'input' in payload, 'input is required'
     assert isinstance(payload['input'], str), 'input must be a string'
 
+    key = (payload.get('model') or config.default_embedding_model, payload['input'])
+    cached = _cached_embedding(key)
+    if cached is not None:
+        return list(cached)
+
     response = post_embeddings(payload, **kwargs)
-    return response['data'][0]['embedding']
+    embedding = response['data'][0]['embedding']
+    _store_embedding(key, tuple(embedding))
+    return embedding
+
+
+def get_embeddings_many(payload: dict, **kwargs) -> list[list[float]]:
+    """
+    Create vector embeddings for a list of texts in one request.
+
+    Cached inputs are not sent, the rest go to the endpoint together.
+    Embeddings are returned in input order.
+
+    Example input: {'input': ['машинное обучение', 'оптимизация']}
+    Example output: [[0.935546875, -0.092529296], [0.103515625, 0.51171875]]
+    """
+    from src_example import config, post_embeddings
+
+    assert 'input' in payload, 'input is required'
+    assert isinstance(payload['input'], list), 'input must be a list'
+    assert all(isinstance(text, str) for text in payload['input']), (
+        'input must contain strings'
+    )
+
+    model = payload.get('model') or config.default_embedding_model
+    embeddings: dict[str, tuple[float, ...]] = {}
+    missing: list[str] = []
+    for text in payload['input']:
+        if text in embeddings or text in missing:
+            continue
+        cached = _cached_embedding((model, text))
+        if cached is None:
+            missing.append(text)
+        else:
+            embeddings[text] = cached
+
+    if missing:
+        response = post_embeddings({**payload, 'input': missing}, **kwargs)
+        if 'error' in response:
+            raise RuntimeError(f'get_embeddings // {response["error"]}')
+        data = sorted(response['data'], key=lambda item: item.get('index', 0))
+        if len(data) != len(missing):
+            raise RuntimeError('get_embeddings // embeddings count mismatch')
+        for text, item in zip(missing, data):
+            embeddings[text] = tuple(item['embedding'])
+            _store_embedding((model, text), embeddings[text])
+
+    return [list(embeddings[text]) for text in payload['input']]
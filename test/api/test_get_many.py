@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+from src.api import (
+    get_avg_score,
+    get_avg_score_many,
+    get_top_students,
+    get_top_students_many,
+)
+from src.prepare_data import SUBJECTS, ensure_students_csv
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+def test_get_avg_score_many_matches_single_calls():
+    ensure_students_csv()
+    subject_names = [*SUBJECTS, 'Unknown Subject', '']
+
+    result = get_avg_score_many(subject_names)
+
+    assert result == {name: get_avg_score(name) for name in subject_names}
+
+
+def test_get_top_students_many_supports_per_subject_k():
+    ensure_students_csv()
+    limits = {'Machine Learning': 3, 'Probability Theory': 5, 'Optimization Theory': 10}
+
+    result = get_top_students_many(list(limits), k=limits)
+
+    assert result == {
+        name: get_top_students(name, k=limit) for name, limit in limits.items()
+    }
+
+
+def test_get_top_students_many_handles_invalid_input():
+    ensure_students_csv()
+
+    assert get_top_students_many(['', 'Unknown Subject'], k=3) == {
+        '': [],
+        'Unknown Subject': [],
+    }
+    assert get_top_students_many(['Machine Learning'], k=0) == {'Machine Learning': []}
+    with pytest.raises(ValueError):
+        get_top_students_many(['Machine Learning'], k={'Machine Learning': 11})
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import src.api._common as common
+from src.api import get_top_students, get_top_students_page, iter_top_students
+from src.api._columns import load_students_columns
+from src.api._index import StudentsIndex
+from src.api._sqlite import SqliteBackend
+from src.api._vectorized import ColumnarIndex
+from src.prepare_data import (
+    ensure_students_csv,
+    write_students_columns,
+    write_students_db,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+def _rows_with_duplicates(count: int, seed: int) -> list[dict[str, str]]:
+    rng = random.Random(seed)
+    rows = [
+        {
+            'student_name': f'student_{rng.randrange(count // 4):04d}',
+            'subject_name': 'S',
+            'score': f'{rng.choice([3.0, 4.0, 4.5, 5.0]):.1f}',
+        }
+        for _ in range(count)
+    ]
+    return rows + rows[:50]
+
+
+def _page_all(index, page_size: int) -> list[tuple[str, float]]:
+    items: list[tuple[str, float]] = []
+    after = None
+    while True:
+        page = index.ranking_page('S', after, page_size)
+        items += page
+        if len(page) < page_size:
+            return items
+        name, score = page[-1]
+        seen = sum(1 for item in items if item == (name, score))
+        after = (score, name, seen)
+
+
+@pytest.mark.parametrize('page_size', [1, 7, 100])
+def test_ranking_pages_cover_full_ranking_for_all_engines(tmp_path, page_size: int):
+    rows = _rows_with_duplicates(400, 5)
+    python_index = StudentsIndex.from_rows(rows)
+    columnar_index = ColumnarIndex(
+        load_students_columns(
+            write_students_columns(rows, tmp_path / 'columns', source_path=None)
+        )
+    )
+    sqlite_index = SqliteBackend(write_students_db(rows, tmp_path / 'students.db'))
+
+    expected = python_index.top_students('S', len(rows))
+    for index in (python_index, columnar_index, sqlite_index):
+        assert _page_all(index, page_size) == expected
+
+
+def test_get_top_students_page_resumes_from_cursor():
+    ensure_students_csv()
+
+    first = get_top_students_page('Optimization Theory', page_size=4)
+    second = get_top_students_page(
+        'Optimization Theory', page_size=4, cursor=first['next_cursor']
+    )
+
+    assert first['students'] + second['students'] == get_top_students(
+        'Optimization Theory', k=8
+    )
+    all_students = list(iter_top_students('Optimization Theory', page_size=3))
+    assert len(all_students) == 20
+    assert all_students[:10] == get_top_students('Optimization Theory', k=10)
+
+
+def test_get_top_students_page_cursor_with_duplicate_rows(tmp_path, monkeypatch):
+    rows = _rows_with_duplicates(200, 9)
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'missing.csv')
+    monkeypatch.setattr(
+        common,
+        'STUDENTS_COLUMNS_DIR',
+        write_students_columns(rows, tmp_path / 'columns', source_path=None),
+    )
+    common.clear_students_cache()
+
+    paged = list(iter_top_students('S', page_size=2))
+
+    common.clear_students_cache()
+    expected = StudentsIndex.from_rows(rows).top_students('S', len(rows))
+    assert [(item['name'], item['score']) for item in paged] == expected
+
+
+def test_get_top_students_page_validates_input():
+    ensure_students_csv()
+    cursor = get_top_students_page('Optimization Theory', page_size=1)['next_cursor']
+
+    assert get_top_students_page('', page_size=5) == {
+        'students': [],
+        'next_cursor': None,
+    }
+    assert get_top_students_page('Unknown Subject')['students'] == []
+    with pytest.raises(ValueError):
+        get_top_students_page('Optimization Theory', page_size=1001)
+    with pytest.raises(ValueError):
+        get_top_students_page('Machine Learning', cursor=cursor)
+    with pytest.raises(ValueError):
+        get_top_students_page('Optimization Theory', cursor='not-a-cursor')
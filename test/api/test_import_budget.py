@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+# generous on purpose: faiss + numpy alone take well over this
+IMPORT_BUDGET_US = 150_000
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_src_api_does_not_load_heavy_dependencies():
+    result = _run_python(
+        '-c',
+        'import sys, src.api; print(sorted({"faiss", "numpy"} & set(sys.modules)))',
+    )
+
+    assert result.stdout.strip() == '[]'
+
+
+def test_import_src_api_fits_time_budget():
+    result = _run_python('-X', 'importtime', '-c', 'import src.api')
+
+    cumulative_us = next(
+        int(line.split('|')[1])
+        for line in result.stderr.splitlines()
+        if line.split('|')[-1].strip() == 'src.api'
+    )
+    assert cumulative_us < IMPORT_BUDGET_US
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.api import get_avg_score, get_top_students, query_students
+from src.api._columns import load_students_columns
+from src.api._index import StudentsIndex
+from src.api._query import StudentsQuery
+from src.api._sqlite import SqliteBackend
+from src.api._vectorized import ColumnarIndex
+from src.prepare_data import (
+    SUBJECTS,
+    ensure_students_csv,
+    write_students_columns,
+    write_students_db,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+QUERIES = [
+    StudentsQuery(),
+    StudentsQuery(subject_name='B', limit=7),
+    StudentsQuery(subject_name='B', above=4.0, limit=10),
+    StudentsQuery(min_score=3.5, max_score=4.5, order_by='score_asc', limit=25),
+    StudentsQuery(name_prefix='student_01', order_by='name'),
+    StudentsQuery(subject_name='C', name_prefix='student_00', limit=3),
+    StudentsQuery(subject_name='Unknown'),
+    StudentsQuery(limit=0),
+]
+
+
+def _random_rows(count: int, seed: int) -> list[dict[str, str]]:
+    rng = random.Random(seed)
+    return [
+        {
+            'student_name': f'student_{rng.randrange(count):04d}',
+            'subject_name': rng.choice(['A', 'B', 'C']),
+            'score': f'{rng.uniform(3.0, 5.0):.1f}',
+        }
+        for _ in range(count)
+    ]
+
+
+def test_query_students_answers_multihop_count_in_one_call():
+    ensure_students_csv()
+
+    result = query_students(
+        'Optimization Theory', above='overall_avg', limit=10, aggregate='count'
+    )
+
+    assert result == {'count': 9}
+
+
+def test_query_students_is_consistent_with_api_functions():
+    ensure_students_csv()
+
+    for subject_name in SUBJECTS:
+        assert query_students(subject_name, aggregate='avg') == get_avg_score(
+            subject_name
+        )
+        top = query_students(subject_name, limit=5)
+        assert [
+            {'name': item['name'], 'score': item['score']} for item in top
+        ] == get_top_students(subject_name, k=5)
+
+
+def test_query_students_validates_arguments():
+    with pytest.raises(ValueError):
+        query_students(order_by='random')
+    with pytest.raises(ValueError):
+        query_students(aggregate='median')
+    with pytest.raises(ValueError):
+        query_students(above='subject_avg')
+    assert query_students('Unknown Subject', aggregate='avg') == {}
+    assert query_students('Unknown Subject', aggregate='count') == {'count': 0}
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_query_engines_return_same_results(tmp_path, query: StudentsQuery):
+    rows = _random_rows(2_000, 7)
+    python_index = StudentsIndex.from_rows(rows)
+    columnar_index = ColumnarIndex(
+        load_students_columns(
+            write_students_columns(rows, tmp_path / 'columns', source_path=None)
+        )
+    )
+    sqlite_index = SqliteBackend(write_students_db(rows, tmp_path / 'students.db'))
+
+    expected_rows = python_index.query_rows(query)
+    expected_count, expected_sum, expected_min, expected_max = python_index.query_stats(
+        query
+    )
+    for index in (columnar_index, sqlite_index):
+        assert index.query_rows(query) == expected_rows
+        count, total, min_score, max_score = index.query_stats(query)
+        assert (count, min_score, max_score) == (
+            expected_count,
+            expected_min,
+            expected_max,
+        )
+        assert total == pytest.approx(expected_sum)
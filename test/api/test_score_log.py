@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import src.api._common as common
+import src.api._log as score_log
+from src.api import (
+    add_score,
+    compact_score_log,
+    get_avg_overall_score,
+    get_avg_score,
+    get_top_students,
+    query_students,
+    upsert_score,
+)
+from src.api._index import StudentsIndex, get_students_index
+from src.api._log import LoggedIndex, merge_log_rows
+from src.api._query import StudentsQuery
+from src.prepare_data import (
+    SUBJECTS,
+    build_students_rows,
+    write_students_columns,
+    write_students_csv,
+    write_students_db,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+ENTRIES = [
+    ('add', 'Новый Студент', 'Machine Learning', 5.0),
+    ('add', 'Новый Студент', 'Machine Learning', 3.2),
+    ('upsert', 'Алексеева Елена', 'Machine Learning', 3.1),
+    ('upsert', 'Новый Студент', 'Machine Learning', 4.4),
+    ('add', 'Андреев Матвей', 'Optimization Theory', 5.0),
+    ('upsert', 'Андреев Матвей', 'Optimization Theory', 3.9),
+    ('add', 'Другой Студент', 'New Subject', 4.1),
+]
+
+
+@pytest.fixture
+def rows() -> list[dict[str, str]]:
+    return build_students_rows()
+
+
+@pytest.fixture(params=['csv', 'columns', 'sqlite'])
+def store(request, tmp_path, monkeypatch, rows) -> str:
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'students.csv')
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'columns')
+    monkeypatch.setattr(common, 'STUDENTS_DB', tmp_path / 'students.db')
+    monkeypatch.setattr(common, 'STUDENTS_LOG', tmp_path / 'students_log.jsonl')
+    monkeypatch.setattr(score_log, '_LOG_CACHE', (None, None, None, None, 0, 0.0))
+    if request.param == 'sqlite':
+        monkeypatch.setattr(common, 'STUDENTS_BACKEND', 'sqlite')
+        write_students_db(rows, common.STUDENTS_DB)
+    else:
+        monkeypatch.setattr(common, 'STUDENTS_BACKEND', 'csv')
+        write_students_csv(rows, common.STUDENTS_CSV)
+    if request.param == 'columns':
+        write_students_columns(rows, common.STUDENTS_COLUMNS_DIR, common.STUDENTS_CSV)
+    common.clear_students_cache()
+    yield request.param
+    common.clear_students_cache()
+
+
+def _assert_same_as_rebuilt(index, expected: StudentsIndex) -> None:
+    assert index.avg_overall_score() == expected.avg_overall_score()
+    for subject_name in [*SUBJECTS, 'New Subject']:
+        assert index.avg_score(subject_name) == expected.avg_score(subject_name)
+        ranking = expected.top_students(subject_name, 100)
+        assert index.top_students(subject_name, 100) == ranking
+        if len(ranking) < 7:
+            continue
+        after = (ranking[2][1], ranking[2][0], 1)
+        assert index.ranking_page(subject_name, after, 4) == ranking[3:7]
+    for query in [
+        StudentsQuery(subject_name='Machine Learning', limit=5),
+        StudentsQuery(min_score=4.0, order_by='name'),
+        StudentsQuery(name_prefix='Н', order_by='score_asc', limit=3),
+    ]:
+        assert index.query_rows(query) == expected.query_rows(query)
+        count, total, low, high = index.query_stats(query)
+        assert (count, round(total, 6), low, high) == (
+            expected.query_stats(query)[0],
+            round(expected.query_stats(query)[1], 6),
+            *expected.query_stats(query)[2:],
+        )
+
+
+def test_logged_index_matches_index_of_merged_rows(rows):
+    index = LoggedIndex(StudentsIndex.from_rows(rows))
+    for entry in ENTRIES:
+        index.apply(*entry)
+
+    expected = StudentsIndex.from_rows(merge_log_rows(rows, ENTRIES))
+
+    _assert_same_as_rebuilt(index, expected)
+    for subject_name in ['Machine Learning', None]:
+        digest, histogram = index.score_sketches(subject_name)
+        expected_digest, expected_histogram = expected.score_sketches(subject_name)
+        assert histogram == expected_histogram
+        assert digest.count == expected_digest.count
+
+
+def test_upsert_looks_up_replaced_rows_by_key(rows, monkeypatch):
+    """Applying entries does not scan or sort the base index."""
+    index = LoggedIndex(StudentsIndex.from_rows(rows))
+
+    def _scan(self, query):
+        raise AssertionError('base index was scanned')
+
+    with monkeypatch.context() as patched:
+        patched.setattr(StudentsIndex, 'query_rows', _scan)
+        patched.setattr(StudentsIndex, 'query_stats', _scan)
+        for entry in ENTRIES:
+            index.apply(*entry)
+
+    expected = StudentsIndex.from_rows(merge_log_rows(rows, ENTRIES))
+    assert index.avg_overall_score() == expected.avg_overall_score()
+    assert index.avg_score('Machine Learning') == expected.avg_score('Machine Learning')
+    assert index.student_scores('Новый Студент', 'Machine Learning') == [4.4]
+
+
+def test_student_scores_match_rows(store, rows):
+    index = get_students_index(common.load_students_rows())
+    expected = StudentsIndex.from_rows(rows)
+
+    for row in rows[:10]:
+        key = (row['student_name'], row['subject_name'])
+        assert index.student_scores(*key) == expected.student_scores(*key)
+        assert index.student_scores(*key) == [float(row['score'])]
+    assert index.student_scores('Нет Такого', 'Machine Learning') == []
+    assert index.student_scores(rows[0]['student_name'], 'Unknown Subject') == []
+
+
+def test_scores_are_visible_to_next_api_call(store, rows):
+    assert add_score('Новый Студент', 'Machine Learning', 5.04) == {
+        'name': 'Новый Студент',
+        'subject_name': 'Machine Learning',
+        'score': 5.0,
+    }
+    assert get_top_students('Machine Learning', k=1) == [
+        {'name': 'Новый Студент', 'score': 5.0}
+    ]
+
+    upsert_score('Новый Студент', 'Machine Learning', 3.0)
+    assert {'name': 'Новый Студент', 'score': 3.0} not in get_top_students(
+        'Machine Learning', k=10
+    )
+    assert query_students(name_prefix='Новый') == [
+        {'name': 'Новый Студент', 'subject_name': 'Machine Learning', 'score': 3.0}
+    ]
+
+    for entry in ENTRIES:
+        (add_score if entry[0] == 'add' else upsert_score)(*entry[1:])
+    entries = [
+        ('add', 'Новый Студент', 'Machine Learning', 5.0),
+        ('upsert', 'Новый Студент', 'Machine Learning', 3.0),
+        *ENTRIES,
+    ]
+    expected = StudentsIndex.from_rows(merge_log_rows(rows, entries))
+    _assert_same_as_rebuilt(get_students_index(common.load_students_rows()), expected)
+
+
+def test_compaction_folds_log_into_store(store, rows):
+    for entry in ENTRIES:
+        (add_score if entry[0] == 'add' else upsert_score)(*entry[1:])
+    before = (
+        get_avg_overall_score(),
+        [get_avg_score(name) for name in SUBJECTS],
+        [get_top_students(name, k=10) for name in SUBJECTS],
+    )
+
+    assert compact_score_log() == {'compacted': len(ENTRIES)}
+
+    assert not common.STUDENTS_LOG.exists()
+    assert list(common.load_students_rows()) == merge_log_rows(rows, ENTRIES)
+    assert before == (
+        get_avg_overall_score(),
+        [get_avg_score(name) for name in SUBJECTS],
+        [get_top_students(name, k=10) for name in SUBJECTS],
+    )
+    assert compact_score_log() == {'compacted': 0}
+
+
+def test_index_opened_before_compaction_stays_readable(store, rows):
+    """Compaction writes a new store version, held rows and index keep working."""
+    if store == 'sqlite':
+        pytest.skip('SQLite rows follow the current DB file')
+    old_rows = common.load_students_rows()
+    old_index = get_students_index(old_rows)
+    query = StudentsQuery(min_score=4.0, order_by='name')
+    before = (old_index.avg_overall_score(), old_index.query_rows(query))
+    for entry in ENTRIES:
+        (add_score if entry[0] == 'add' else upsert_score)(*entry[1:])
+
+    score_log.compact_log()
+    common.clear_students_cache()
+
+    assert list(old_rows) == rows
+    assert (old_index.avg_overall_score(), old_index.query_rows(query)) == before
+    assert list(common.load_students_rows()) == merge_log_rows(rows, ENTRIES)
+
+
+def test_log_is_compacted_when_it_grows(store, monkeypatch):
+    monkeypatch.setattr(common, 'STUDENTS_LOG_COMPACT_BYTES', 500)
+
+    for idx in range(10):
+        add_score(f'Студент {idx}', 'Machine Learning', 4.0)
+    score_log.wait_for_compaction()
+
+    assert not common.STUDENTS_LOG.exists() or common.STUDENTS_LOG.stat().st_size < 500
+    assert query_students(name_prefix='Студент', aggregate='count') == {'count': 10}
+
+
+@pytest.mark.skipif(score_log.fcntl is None, reason='needs fcntl')
+def test_append_waits_for_log_file_lock(store):
+    """Writers of other processes holding the lock file block appends."""
+    lock_path = common.STUDENTS_LOG.with_name(common.STUDENTS_LOG.name + '.lock')
+    writer = threading.Thread(
+        target=add_score, args=('Новый Студент', 'Machine Learning', 5.0)
+    )
+    with lock_path.open('ab') as lock:
+        score_log.fcntl.flock(lock.fileno(), score_log.fcntl.LOCK_EX)
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()
+        assert not common.STUDENTS_LOG.exists()
+    writer.join()
+
+    assert score_log._read_log(0)[1] == [
+        ('add', 'Новый Студент', 'Machine Learning', 5.0)
+    ]
+
+
+def test_log_of_replaced_store_is_ignored(store, rows, monkeypatch):
+    monkeypatch.setattr(common, 'STUDENTS_CACHE_TTL', 0.0)
+    add_score('Новый Студент', 'Machine Learning', 5.0)
+    assert get_top_students('Machine Learning', k=1)[0]['name'] == 'Новый Студент'
+
+    if store == 'sqlite':
+        write_students_db(rows[:-1], common.STUDENTS_DB)
+    else:
+        write_students_csv(rows[:-1], common.STUDENTS_CSV)
+        common.STUDENTS_COLUMNS_DIR.joinpath('meta.json').unlink(missing_ok=True)
+    common.clear_students_cache()
+
+    assert get_top_students('Machine Learning', k=1)[0]['name'] != 'Новый Студент'
+
+
+def test_add_score_validates_input(store):
+    with pytest.raises(ValueError):
+        add_score(' ', 'Machine Learning', 4.0)
+    with pytest.raises(ValueError):
+        upsert_score('Новый Студент', 'Machine Learning', float('nan'))
+    assert not common.STUDENTS_LOG.exists()
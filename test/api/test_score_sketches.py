@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from src.api import get_score_histogram, get_score_percentiles
+from src.api._columns import load_students_columns
+from src.api._index import StudentsIndex
+from src.api._sketches import ScoreHistogram, TDigest
+from src.api._sqlite import SqliteBackend
+from src.api._vectorized import (
+    ColumnarIndex,
+    digest_from_sorted,
+    histogram_from_values,
+)
+from src.prepare_data import (
+    SUBJECTS,
+    build_students_rows,
+    ensure_students_csv,
+    write_students_columns,
+    write_students_db,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+def _random_scores(count: int, seed: int) -> list[float]:
+    rng = random.Random(seed)
+    return [round(rng.gauss(4.0, 0.4), 1) for _ in range(count)]
+
+
+@pytest.mark.parametrize('q', [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+def test_tdigest_quantiles_are_close_to_exact(q: float):
+    scores = _random_scores(50_000, 1)
+
+    digest = TDigest.from_values(scores)
+    vectorized = digest_from_sorted(np.sort(np.array(scores)))
+
+    exact = float(np.quantile(scores, q))
+    assert digest.quantile(q) == pytest.approx(exact, abs=0.1)
+    assert vectorized.quantile(q) == pytest.approx(exact, abs=0.1)
+    assert len(digest.means) <= 200
+
+
+def test_tdigest_merge_matches_digest_of_union():
+    left, right = _random_scores(20_000, 2), _random_scores(30_000, 3)
+
+    merged = TDigest.from_values(left).merge(TDigest.from_values(right))
+
+    assert merged.count == len(left) + len(right)
+    for q in (0.1, 0.5, 0.9):
+        assert merged.quantile(q) == pytest.approx(
+            float(np.quantile(left + right, q)), abs=0.1
+        )
+
+
+def test_histogram_counts_one_decimal_scores_exactly():
+    scores = [3.0, 3.3, 3.3, 4.9, 5.0, 2.0, 6.0]
+
+    histogram = ScoreHistogram.from_values(scores)
+
+    counts = dict(zip(histogram.edges, histogram.counts))
+    assert (histogram.low, histogram.high) == (1.95, 6.05)
+    assert counts[1.95] == 1
+    assert counts[2.95] == 1
+    assert counts[3.25] == 2
+    assert counts[4.85] == 1
+    assert counts[4.95] == 1
+    assert counts[5.95] == 1
+    assert sum(histogram.counts) == len(scores)
+    assert histogram.merge(histogram).counts == tuple(
+        2 * count for count in histogram.counts
+    )
+
+
+def test_histogram_merge_widens_to_union_of_ranges():
+    low, high = [1.0, 1.2, 3.0], [4.0, 9.5]
+
+    merged = ScoreHistogram.from_values(low).merge(ScoreHistogram.from_values(high))
+    vectorized = histogram_from_values(np.array(low + high))
+
+    assert merged == ScoreHistogram.from_values(low + high) == vectorized
+    assert (merged.low, merged.high) == (0.95, 9.55)
+    assert ScoreHistogram.from_values([]) is None
+
+
+def test_score_sketches_are_same_for_all_engines(tmp_path):
+    rows = build_students_rows()
+    python_index = StudentsIndex.from_rows(rows)
+    columnar_index = ColumnarIndex(
+        load_students_columns(
+            write_students_columns(rows, tmp_path / 'columns', source_path=None)
+        )
+    )
+    sqlite_index = SqliteBackend(write_students_db(rows, tmp_path / 'students.db'))
+
+    for subject_name in [*SUBJECTS, None]:
+        digest, histogram = python_index.score_sketches(subject_name)
+        for index in (columnar_index, sqlite_index):
+            other_digest, other_histogram = index.score_sketches(subject_name)
+            assert other_histogram == histogram
+            assert other_digest.quantile(0.5) == pytest.approx(
+                digest.quantile(0.5), abs=0.05
+            )
+
+
+def test_score_api_functions_on_students_data():
+    ensure_students_csv()
+
+    percentiles = get_score_percentiles('Machine Learning')
+    histogram = get_score_histogram('Machine Learning')
+
+    assert list(percentiles) == ['p25', 'p50', 'p75', 'p90']
+    assert 3.0 <= percentiles['p25'] <= percentiles['p50'] <= percentiles['p90'] <= 5.0
+    assert sum(histogram['counts']) == 20
+    assert len(histogram['edges']) == len(histogram['counts']) + 1
+    assert sum(get_score_histogram(None)['counts']) == 60
+    assert get_score_percentiles('Unknown Subject') == {}
+    assert get_score_histogram('') == {}
+    with pytest.raises(ValueError):
+        get_score_percentiles('Machine Learning', percentiles=(150,))
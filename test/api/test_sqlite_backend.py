@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import src.api._common as common
+from src.api import (
+    get_avg_overall_score,
+    get_avg_score,
+    get_top_students,
+    query_students,
+)
+from src.api._index import StudentsIndex
+from src.api._query import StudentsQuery
+from src.api._sqlite import get_sqlite_backend
+from src.prepare_data import SUBJECTS, build_students_rows, write_students_db
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+@pytest.fixture
+def rows() -> list[dict[str, str]]:
+    return build_students_rows()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch, rows):
+    path = write_students_db(rows, tmp_path / 'students.db')
+    monkeypatch.setattr(common, 'STUDENTS_BACKEND', 'sqlite')
+    monkeypatch.setattr(common, 'STUDENTS_DB', path)
+    return path
+
+
+def test_sqlite_backend_loads_rows_in_order(db_path, rows):
+    loaded = common.load_students_rows()
+
+    assert len(loaded) == len(rows)
+    assert list(loaded) == rows
+    assert loaded[-1] == rows[-1]
+
+
+def test_sqlite_backend_matches_python_index(db_path, rows):
+    backend = get_sqlite_backend(db_path)
+    expected = StudentsIndex.from_rows(rows)
+
+    assert backend.avg_overall_score() == expected.avg_overall_score()
+    for subject_name in SUBJECTS:
+        assert backend.avg_score(subject_name) == expected.avg_score(subject_name)
+        assert backend.top_students(subject_name, 10) == expected.top_students(
+            subject_name, 10
+        )
+    assert backend.avg_score('Unknown Subject') is None
+
+
+def _scan_avg(rows, subject_name: str | None = None) -> float | None:
+    """Average as the original API computed it from students.csv rows."""
+    scores = [
+        float(row['score'])
+        for row in rows
+        if subject_name in (None, row['subject_name'])
+    ]
+    return round(sum(scores) / len(scores), 1) if scores else None
+
+
+@pytest.mark.parametrize(
+    'scores',
+    [
+        ['3.5', '3.1', '3.0', '4.7', '3.7', '3.3'],
+        # SQL SUM over the subject index gives 3.0500000000000003 here
+        ['3.1', '3.0', '3.0', '3.1', '3.1', '3.0'],
+    ],
+)
+def test_sqlite_averages_match_row_order_scan(db_path, monkeypatch, scores):
+    rows = [
+        {'student_name': f'Студент {idx}', 'subject_name': 'S', 'score': score}
+        for idx, score in enumerate(scores)
+    ]
+    rows += build_students_rows()[:7]
+    write_students_db(rows, db_path)
+    common.clear_students_cache()
+
+    assert get_avg_score('S') == {'avg_score': _scan_avg(rows, 'S')}
+    assert get_avg_overall_score() == {'avg_score': _scan_avg(rows)}
+    assert query_students('S', aggregate='avg') == {'avg_score': _scan_avg(rows, 'S')}
+
+
+def test_random_sqlite_rosters_match_row_order_scan(tmp_path):
+    rng = random.Random(11)
+    for idx in range(100):
+        rows = [
+            {
+                'student_name': f'Студент {rng.randrange(6)}',
+                'subject_name': rng.choice('AB'),
+                'score': f'{rng.uniform(3.0, 5.0):.1f}',
+            }
+            for _ in range(rng.randrange(2, 12))
+        ]
+        backend = get_sqlite_backend(
+            write_students_db(rows, tmp_path / f'students_{idx}.db')
+        )
+
+        assert round(backend.avg_overall_score(), 1) == _scan_avg(rows), idx
+        for subject_name in 'AB':
+            average = backend.avg_score(subject_name)
+            expected = _scan_avg(rows, subject_name)
+            assert (None if average is None else round(average, 1)) == expected
+            count, total, _, _ = backend.query_stats(
+                StudentsQuery(subject_name=subject_name)
+            )
+            assert (round(total / count, 1) if count else None) == expected
+
+
+def test_api_functions_use_sqlite_backend(db_path, rows):
+    assert get_avg_overall_score()['avg_score'] > 0
+    assert get_avg_score('Unknown Subject') == {}
+    assert len(get_top_students('Machine Learning', k=5)) == 5
+
+    write_students_db(rows[:1], db_path)
+
+    assert get_top_students(rows[0]['subject_name'], k=5) == [
+        {'name': rows[0]['student_name'], 'score': float(rows[0]['score'])}
+    ]
+
+
+def test_sqlite_backend_returns_empty_for_missing_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, 'STUDENTS_BACKEND', 'sqlite')
+    monkeypatch.setattr(common, 'STUDENTS_DB', tmp_path / 'missing.db')
+
+    assert get_avg_overall_score() == {}
+    assert get_top_students('Machine Learning') == []
+
+
+def test_sqlite_top_students_uses_subject_score_index(db_path):
+    plan = (
+        get_sqlite_backend(db_path)
+        .connection()
+        .execute(
+            'EXPLAIN QUERY PLAN SELECT student_name, score FROM students '
+            'WHERE subject_name = ? ORDER BY score DESC, student_name LIMIT ?',
+            ('Machine Learning', 3),
+        )
+        .fetchall()
+    )
+
+    details = ' '.join(str(row[-1]) for row in plan)
+    assert 'idx_students_subject_score' in details
+    assert 'TEMP B-TREE' not in details
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+import src.api._common as common
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+HEADER = 'student_name,subject_name,score\n'
+
+
+def _write_csv(path: Path, lines: list[str], mtime_ns: int) -> None:
+    path.write_text(HEADER + ''.join(lines), encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def students_csv(tmp_path, monkeypatch) -> Path:
+    path = tmp_path / 'students.csv'
+    monkeypatch.setattr(common, 'STUDENTS_CSV', path)
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'columns')
+    monkeypatch.setattr(common, 'STUDENTS_CACHE_TTL', 0.0)
+    common.clear_students_cache()
+    yield path
+    common.clear_students_cache()
+
+
+def test_load_students_rows_parses_file_once(students_csv, monkeypatch):
+    _write_csv(students_csv, ['A,Machine Learning,4.0\n'], 1_000_000_000)
+    calls: list[Path] = []
+    read_students_csv = common._read_students_csv
+
+    def _counting_read(path: Path) -> list[dict[str, str]]:
+        calls.append(path)
+        return read_students_csv(path)
+
+    monkeypatch.setattr(common, '_read_students_csv', _counting_read)
+
+    first = common.load_students_rows()
+    second = common.load_students_rows()
+
+    assert first is second
+    assert first == [
+        {'student_name': 'A', 'subject_name': 'Machine Learning', 'score': '4.0'}
+    ]
+    assert len(calls) == 1
+
+
+def test_load_students_rows_reloads_when_file_changes(students_csv):
+    _write_csv(students_csv, ['A,Machine Learning,4.0\n'], 1_000_000_000)
+    assert len(common.load_students_rows()) == 1
+
+    _write_csv(
+        students_csv,
+        ['A,Machine Learning,4.0\n', 'B,Machine Learning,3.0\n'],
+        2_000_000_000,
+    )
+
+    assert [row['student_name'] for row in common.load_students_rows()] == ['A', 'B']
+
+
+def test_load_students_rows_skips_revalidation_within_ttl(students_csv, monkeypatch):
+    _write_csv(students_csv, ['A,Machine Learning,4.0\n'], 1_000_000_000)
+    monkeypatch.setattr(common, 'STUDENTS_CACHE_TTL', 3600.0)
+    rows = common.load_students_rows()
+
+    students_csv.unlink()
+
+    assert common.load_students_rows() is rows
+
+
+def test_load_students_rows_returns_empty_for_missing_file(students_csv):
+    assert common.load_students_rows() == []
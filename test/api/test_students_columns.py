@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import src.api._common as common
+from src.api._columns import StudentsColumns, load_students_columns
+from src.api.get_avg_overall_score import get_avg_overall_score
+from src.api.get_avg_score import get_avg_score
+from src.api.get_top_students import get_top_students
+from src.prepare_data import SUBJECTS, build_students_rows, write_students_columns
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+@pytest.fixture
+def rows() -> list[dict[str, str]]:
+    return build_students_rows()
+
+
+@pytest.fixture
+def columns_dir(tmp_path, monkeypatch, rows):
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'students.csv')
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'columns')
+    common.clear_students_cache()
+    yield write_students_columns(rows, tmp_path / 'columns', source_path=None)
+    common.clear_students_cache()
+
+
+def test_students_columns_roundtrip_rows(columns_dir, rows):
+    columns = load_students_columns(columns_dir)
+
+    assert isinstance(columns.scores, np.memmap)
+    assert columns.scores.dtype == np.float32
+    assert len(columns) == len(rows)
+    assert list(columns) == rows
+    assert columns[1] == rows[1]
+
+
+def test_load_students_rows_prefers_columns_without_csv(columns_dir):
+    assert isinstance(common.load_students_rows(), StudentsColumns)
+
+
+def test_load_students_rows_ignores_columns_of_other_csv(columns_dir, rows):
+    common.STUDENTS_CSV.write_text(
+        'student_name,subject_name,score\nA,Machine Learning,4.0\n',
+        encoding='utf-8',
+    )
+
+    assert common.load_students_rows() == [
+        {'student_name': 'A', 'subject_name': 'Machine Learning', 'score': '4.0'}
+    ]
+
+
+def test_api_results_from_columns_match_rows(columns_dir, rows):
+    all_scores = [float(row['score']) for row in rows]
+    assert get_avg_overall_score() == {
+        'avg_score': round(sum(all_scores) / len(all_scores), 1)
+    }
+    for subject_name in SUBJECTS:
+        scores = [
+            float(row['score']) for row in rows if row['subject_name'] == subject_name
+        ]
+        assert get_avg_score(subject_name) == {
+            'avg_score': round(sum(scores) / len(scores), 1)
+        }
+        top = get_top_students(subject_name, k=10)
+        assert [item['score'] for item in top] == sorted(
+            (item['score'] for item in top), reverse=True
+        )
+
+
+def test_rewrite_keeps_mapped_columns_readable(columns_dir, rows):
+    """A rewrite with fewer rows goes to new files, old mappings stay valid."""
+    old_columns = load_students_columns(columns_dir)
+
+    for idx in range(3):
+        write_students_columns(rows[: 10 - idx], columns_dir, source_path=None)
+
+    assert list(old_columns) == rows
+    assert list(load_students_columns(columns_dir)) == rows[:8]
+    # current and previous versions are kept, older ones are removed
+    assert len(list(columns_dir.glob('v-*'))) == 2
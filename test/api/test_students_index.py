@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from src.api._index import StudentsIndex, get_students_index
+from src.prepare_data import SUBJECTS, build_students_rows
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+def _scan_top(rows: list[dict[str, str]], subject_name: str, k: int) -> list:
+    matches = [
+        (row['student_name'], float(row['score']))
+        for row in rows
+        if row['subject_name'] == subject_name
+    ]
+    matches.sort(key=lambda item: (-item[1], item[0]))
+    return matches[:k]
+
+
+@pytest.mark.parametrize('seed', [42, 777])
+def test_students_index_matches_full_scan(seed: int):
+    rows = build_students_rows(seed=seed)
+    index = StudentsIndex.from_rows(rows)
+
+    all_scores = [float(row['score']) for row in rows]
+    assert index.avg_overall_score() == sum(all_scores) / len(all_scores)
+    for subject_name in SUBJECTS:
+        scores = [
+            float(row['score']) for row in rows if row['subject_name'] == subject_name
+        ]
+        assert index.avg_score(subject_name) == sum(scores) / len(scores)
+        assert index.top_students(subject_name, 10) == _scan_top(rows, subject_name, 10)
+
+
+def test_students_index_breaks_ties_by_name():
+    rows = [
+        {'student_name': 'B', 'subject_name': 'S', 'score': '4.0'},
+        {'student_name': 'A', 'subject_name': 'S', 'score': '4.0'},
+        {'student_name': 'C', 'subject_name': 'S', 'score': '4.5'},
+    ]
+
+    assert StudentsIndex.from_rows(rows).top_students('S', 3) == [
+        ('C', 4.5),
+        ('A', 4.0),
+        ('B', 4.0),
+    ]
+
+
+def test_students_index_returns_none_for_missing_data():
+    index = StudentsIndex.from_rows([])
+
+    assert index.avg_score('S') is None
+    assert index.avg_overall_score() is None
+    assert index.top_students('S', 3) == []
+
+
+def test_get_students_index_reuses_index_for_same_rows():
+    rows = build_students_rows()
+
+    assert get_students_index(rows) is get_students_index(rows)
+    assert get_students_index(list(rows)) is not get_students_index(rows)
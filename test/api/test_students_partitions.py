@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import src.api._common as common
+import src.api._partitions as partitions
+from src.api import get_avg_overall_score, get_avg_score, get_top_students
+from src.api._columns import load_students_columns
+from src.api._index import StudentsIndex, get_students_index
+from src.api._partitions import PartitionedIndex, StudentsPartitions
+from src.api._query import StudentsQuery
+from src.api._vectorized import ColumnarIndex
+from src.prepare_data import (
+    SUBJECTS,
+    build_students_rows,
+    generate_synthetic_students,
+    write_students_columns,
+    write_students_csv,
+    write_students_partitions,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+# row order of partitions differs from source rows, so queries avoid
+# ties that only row order breaks
+QUERIES = [
+    StudentsQuery(order_by='name'),
+    StudentsQuery(subject_name='Machine Learning', limit=5),
+    StudentsQuery(min_score=4.0, order_by='name'),
+    StudentsQuery(name_prefix='П', order_by='score_asc', limit=4),
+]
+
+
+@pytest.fixture
+def rows() -> list[dict[str, str]]:
+    return build_students_rows() + build_students_rows(seed=7)[:20]
+
+
+@pytest.fixture
+def partitions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'students.csv')
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'columns')
+    monkeypatch.setattr(common, 'STUDENTS_PARTITIONS_DIR', tmp_path / 'partitions')
+    common.clear_students_cache()
+    yield tmp_path / 'partitions'
+    common.clear_students_cache()
+
+
+def _assert_matches(index, expected: StudentsIndex) -> None:
+    assert index.avg_overall_score() == expected.avg_overall_score()
+    for subject_name in SUBJECTS:
+        assert index.avg_score(subject_name) == expected.avg_score(subject_name)
+        ranking = expected.top_students(subject_name, 100)
+        assert index.top_students(subject_name, 10) == ranking[:10]
+        after = (ranking[4][1], ranking[4][0], 1)
+        assert index.ranking_page(subject_name, after, 6) == ranking[5:11]
+    for query in QUERIES:
+        assert index.query_rows(query) == expected.query_rows(query)
+        count, total, low, high = index.query_stats(query)
+        expected_count, expected_total, *expected_bounds = expected.query_stats(query)
+        assert (count, round(total, 9), [low, high]) == (
+            expected_count,
+            round(expected_total, 9),
+            expected_bounds,
+        )
+    for _, name, subject_name, _ in expected.entries[:30]:
+        assert index.student_scores(name, subject_name) == expected.student_scores(
+            name, subject_name
+        )
+    digest, histogram = index.score_sketches(None)
+    assert histogram == expected.score_sketches(None)[1]
+    assert digest.count == len(expected.entries)
+
+
+@pytest.mark.parametrize('hash_buckets', [1, 3])
+def test_partitioned_index_matches_python_index(partitions_dir, rows, hash_buckets):
+    write_students_partitions(rows, partitions_dir, hash_buckets, source_path=None)
+
+    loaded = common.load_students_rows()
+
+    assert isinstance(loaded, StudentsPartitions)
+    assert len(loaded.parts) == len(SUBJECTS) * hash_buckets
+    assert len(loaded) == len(rows)
+    assert sorted(map(tuple, (row.values() for row in loaded))) == sorted(
+        map(tuple, (row.values() for row in rows))
+    )
+    assert loaded[-1] == list(loaded)[-1]
+    index = get_students_index(loaded)
+    assert isinstance(index, PartitionedIndex)
+    _assert_matches(index, StudentsIndex.from_rows(loaded))
+
+
+def test_partitions_are_aggregated_on_process_pool(partitions_dir, rows, monkeypatch):
+    write_students_partitions(rows, partitions_dir, 2, source_path=None)
+    monkeypatch.setattr(common, 'STUDENTS_PARALLEL_MIN_ROWS', 0)
+    monkeypatch.setattr(common, 'STUDENTS_WORKERS', 2)
+    monkeypatch.setattr(partitions, '_EXECUTOR', None)
+
+    try:
+        loaded = common.load_students_rows()
+        index = get_students_index(loaded)
+        _assert_matches(index, StudentsIndex.from_rows(loaded))
+        assert not index._indexes
+    finally:
+        if partitions._EXECUTOR is not None:
+            partitions._EXECUTOR.shutdown()
+
+
+def test_stale_partitions_are_ignored(partitions_dir, rows):
+    write_students_csv(rows, common.STUDENTS_CSV)
+    write_students_partitions(rows, partitions_dir, source_path=common.STUDENTS_CSV)
+    assert isinstance(common.load_students_rows(), StudentsPartitions)
+
+    write_students_csv(rows[:1], common.STUDENTS_CSV)
+    common.clear_students_cache()
+
+    assert get_avg_overall_score() == {'avg_score': float(rows[0]['score'])}
+    assert get_top_students(rows[0]['subject_name'], k=3) == [
+        {'name': rows[0]['student_name'], 'score': float(rows[0]['score'])}
+    ]
+
+
+def _scan_avg(rows, subject_name: str | None = None) -> float | None:
+    """Average as the original API computed it, scanning rows in order."""
+    scores = [
+        float(row['score'])
+        for row in rows
+        if subject_name in (None, row['subject_name'])
+    ]
+    return round(sum(scores) / len(scores), 1) if scores else None
+
+
+@pytest.mark.parametrize(
+    'scores', [[3.5, 3.1, 3.0, 4.7, 3.7, 3.3], [3.5, 5.0, 5.0, 3.1, 4.0, 3.1]]
+)
+@pytest.mark.parametrize('hash_buckets', [1, 3])
+def test_averages_match_row_order_scan(partitions_dir, scores, hash_buckets):
+    """Sums of these scores round differently in another order or exactly."""
+    rows = [
+        {'student_name': f'Студент {idx}', 'subject_name': 'B', 'score': str(score)}
+        for idx, score in enumerate(scores)
+    ]
+    write_students_partitions(rows, partitions_dir, hash_buckets, source_path=None)
+    loaded = common.load_students_rows()
+    assert len(loaded.parts) == hash_buckets
+
+    assert get_avg_score('B') == {'avg_score': _scan_avg(loaded, 'B')}
+    assert get_avg_overall_score() == {'avg_score': _scan_avg(loaded)}
+    columns = load_students_columns(
+        write_students_columns(rows, partitions_dir.parent / 'columns', None)
+    )
+    assert round(ColumnarIndex(columns).avg_score('B'), 1) == _scan_avg(rows, 'B')
+
+
+def test_random_rosters_match_row_order_scan(partitions_dir):
+    rng = random.Random(5)
+    for idx in range(200):
+        rows = [
+            {
+                'student_name': f'Студент {rng.randrange(6)}',
+                'subject_name': rng.choice('AB'),
+                'score': f'{rng.uniform(3.0, 5.0):.1f}',
+            }
+            for _ in range(rng.randrange(2, 12))
+        ]
+        write_students_partitions(rows, partitions_dir, 3, source_path=None)
+        loaded = common.load_students_rows()
+        columns = load_students_columns(
+            write_students_columns(rows, partitions_dir.parent / 'columns', None)
+        )
+        for index, source in [
+            (StudentsIndex.from_rows(rows), rows),
+            (ColumnarIndex(columns), rows),
+            (loaded.score_index(), loaded),
+        ]:
+            assert round(index.avg_overall_score(), 1) == _scan_avg(source), idx
+            for subject_name in 'AB':
+                average = index.avg_score(subject_name)
+                expected = _scan_avg(source, subject_name)
+                assert (None if average is None else round(average, 1)) == expected
+
+
+@pytest.mark.parametrize('order_by', ['score_desc', 'score_asc'])
+def test_query_ties_across_partitions_keep_row_order(partitions_dir, order_by):
+    """Same student and score in several subjects ties across partitions."""
+    rows = [
+        {'student_name': name, 'subject_name': subject_name, 'score': '4.0'}
+        for subject_name in reversed(SUBJECTS)
+        for name in ['Б', 'А', 'В']
+    ]
+    write_students_partitions(rows, partitions_dir, hash_buckets=3, source_path=None)
+    loaded = common.load_students_rows()
+    expected = StudentsIndex.from_rows(loaded)
+
+    for limit in [None, 4]:
+        query = StudentsQuery(order_by=order_by, limit=limit)
+        assert loaded.score_index().query_rows(query) == expected.query_rows(query)
+
+
+def test_synthetic_partitions_match_columns(tmp_path, monkeypatch):
+    data_dir = generate_synthetic_students(
+        n_students=300,
+        n_subjects=4,
+        output_format='partitions',
+        output_dir=tmp_path,
+        workers=1,
+        hash_buckets=2,
+    )
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'missing.csv')
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'students_columns')
+    monkeypatch.setattr(common, 'STUDENTS_PARTITIONS_DIR', data_dir)
+    common.clear_students_cache()
+    partitioned = (get_avg_overall_score(), get_avg_score('Subject 0003'))
+
+    monkeypatch.setattr(common, 'STUDENTS_PARTITIONS_DIR', tmp_path / 'missing')
+    common.clear_students_cache()
+
+    assert partitioned == (get_avg_overall_score(), get_avg_score('Subject 0003'))
+    common.clear_students_cache()
+
+
+def test_rewrite_keeps_mapped_partitions_readable(partitions_dir, rows):
+    write_students_partitions(rows, partitions_dir, hash_buckets=3, source_path=None)
+    old_rows = common.load_students_rows()
+    expected = list(old_rows)
+
+    write_students_partitions(
+        rows[:5], partitions_dir, hash_buckets=3, source_path=None
+    )
+    common.clear_students_cache()
+
+    assert list(old_rows) == expected
+    assert sorted(map(str, common.load_students_rows())) == sorted(map(str, rows[:5]))
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import src.api._common as common
+import src.api._log as score_log
+from src.api import add_score, get_avg_overall_score, get_data_version
+from src.api._query import StudentsQuery
+from src.api._snapshot import get_students_snapshot
+from src.prepare_data import (
+    build_students_rows,
+    write_students_columns,
+    write_students_csv,
+    write_students_partitions,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+
+@pytest.fixture
+def rows() -> list[dict[str, str]]:
+    return build_students_rows()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, rows):
+    monkeypatch.setattr(common, 'STUDENTS_CSV', tmp_path / 'students.csv')
+    monkeypatch.setattr(common, 'STUDENTS_COLUMNS_DIR', tmp_path / 'columns')
+    monkeypatch.setattr(common, 'STUDENTS_PARTITIONS_DIR', tmp_path / 'partitions')
+    monkeypatch.setattr(common, 'STUDENTS_LOG', tmp_path / 'students_log.jsonl')
+    monkeypatch.setattr(common, 'STUDENTS_BACKEND', 'csv')
+    monkeypatch.setattr(common, 'STUDENTS_CACHE_TTL', 0.0)
+    monkeypatch.setattr(score_log, '_LOG_CACHE', (None, None, None, None, 0, 0.0))
+    write_students_csv(rows, common.STUDENTS_CSV)
+    common.clear_students_cache()
+    yield
+    common.clear_students_cache()
+
+
+def test_version_is_stable_until_data_changes(store, rows):
+    first = get_data_version()
+    assert get_data_version() == first
+
+    write_students_csv(rows[:1], common.STUDENTS_CSV)
+    common.clear_students_cache()
+
+    assert get_data_version()['version'] > first['version']
+    assert get_avg_overall_score() == {'avg_score': float(rows[0]['score'])}
+
+
+def test_held_snapshot_is_not_changed_by_score_log(store):
+    snapshot = get_students_snapshot()
+    before = snapshot.index.top_students('Machine Learning', 3)
+
+    add_score('Новый Студент', 'Machine Learning', 5.0)
+    add_score('Другой Студент', 'Machine Learning', 5.0)
+    current = get_students_snapshot()
+
+    assert current.version > snapshot.version
+    assert current.index.top_students('Machine Learning', 1)[0][0] == 'Другой Студент'
+    assert snapshot.index.top_students('Machine Learning', 3) == before
+
+
+def test_readers_do_not_wait_for_reload(store, rows, monkeypatch):
+    old_version = get_data_version()['version']
+    old_avg = get_avg_overall_score()
+    write_students_csv(rows[:1], common.STUDENTS_CSV)
+    common.clear_students_cache()
+
+    reading = threading.Event()
+    release = threading.Event()
+    read_students_csv = common._read_students_csv
+
+    def _slow_read(path):
+        reading.set()
+        release.wait(5)
+        return read_students_csv(path)
+
+    monkeypatch.setattr(common, '_read_students_csv', _slow_read)
+    reloader = threading.Thread(target=get_students_snapshot)
+    reloader.start()
+    try:
+        assert reading.wait(5)
+        assert get_data_version() == {'version': old_version}
+        assert get_avg_overall_score() == old_avg
+    finally:
+        release.set()
+        reloader.join()
+
+    assert get_data_version()['version'] > old_version
+    assert get_avg_overall_score() == {'avg_score': float(rows[0]['score'])}
+
+
+@pytest.mark.parametrize('layout', ['columns', 'partitions'])
+def test_held_snapshot_reads_survive_store_reload(store, rows, layout):
+    """Mapped files of a held snapshot are never rewritten by a reload."""
+
+    def _write(store_rows: list[dict[str, str]]) -> None:
+        write_students_csv(store_rows, common.STUDENTS_CSV)
+        if layout == 'columns':
+            write_students_columns(
+                store_rows, common.STUDENTS_COLUMNS_DIR, common.STUDENTS_CSV
+            )
+        else:
+            write_students_partitions(
+                store_rows, common.STUDENTS_PARTITIONS_DIR, 2, common.STUDENTS_CSV
+            )
+
+    _write(rows)
+    common.clear_students_cache()
+    snapshot = get_students_snapshot()
+    assert not isinstance(snapshot.rows, list)
+    query = StudentsQuery(order_by='name')
+
+    def _read() -> tuple:
+        return list(snapshot.rows), snapshot.index.query_rows(query)
+
+    expected = _read()
+    results: list[tuple] = []
+    stop = threading.Event()
+
+    def _reader() -> None:
+        while not stop.is_set():
+            results.append(_read())
+
+    reader = threading.Thread(target=_reader)
+    reader.start()
+    try:
+        for size in range(len(rows) - 1, len(rows) - 6, -1):
+            _write(rows[:size])
+            assert len(get_students_snapshot().rows) == size
+    finally:
+        stop.set()
+        reader.join()
+
+    assert results
+    assert all(result == expected for result in results)
+    assert _read() == expected
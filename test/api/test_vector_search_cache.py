@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import importlib
+import json
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+import src.bench_index as bench_index
+from src.api.vector_search import vector_search, warmup
+from src.prepare_data import INDEX_TYPES, create_faiss_index
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+vector_search_module = importlib.import_module('src.api.vector_search')
+SEARCH_PATHS = (
+    'FAISS_INDEX_PATH',
+    'RAG_CHUNKS_PATH',
+    'INDEX_META_PATH',
+    'RAG_CHUNKS_BLOB_PATH',
+    'RAG_CHUNKS_OFFSETS_PATH',
+    'FAISS_VECTORS_PATH',
+)
+
+CHUNKS = ['лектор Иванов', 'расписание П9', 'литература Боровков']
+
+
+def _write_index(courses_dir, chunks: list[str]) -> None:
+    vectors = np.eye(len(chunks), 4, dtype=np.float32)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    faiss.write_index(index, str(courses_dir / 'faiss.index'))
+    (courses_dir / 'rag_chunks.json').write_text(
+        json.dumps({'chunks': chunks}, ensure_ascii=False), encoding='utf-8'
+    )
+
+
+@pytest.fixture
+def courses_dir(tmp_path, monkeypatch):
+    for name in SEARCH_PATHS:
+        path = getattr(vector_search_module, name)
+        monkeypatch.setattr(vector_search_module, name, tmp_path / path.name)
+    # query text is 'e<i>' and embeds to i-th basis vector
+    monkeypatch.setattr(
+        vector_search_module,
+        '_embed_query',
+        lambda query: np.eye(4, dtype=np.float32)[int(query[1:])].tolist(),
+    )
+    _write_index(tmp_path, CHUNKS)
+    vector_search_module.clear_search_cache()
+    yield tmp_path
+    vector_search_module.clear_search_cache()
+
+
+def test_index_and_chunks_are_read_once(courses_dir, monkeypatch):
+    reads: list[str] = []
+    read_index = faiss.read_index
+
+    def _counting_read(path: str, *args):
+        reads.append(path)
+        return read_index(path, *args)
+
+    monkeypatch.setattr(faiss, 'read_index', _counting_read)
+
+    warmup()
+    first = vector_search('e1', k=1)
+    second = vector_search('e2', k=1)
+
+    assert (first, second) == ({'chunks': [CHUNKS[1]]}, {'chunks': [CHUNKS[2]]})
+    assert len(reads) == 1
+
+
+def test_rebuilt_index_is_reloaded(courses_dir):
+    assert vector_search('e0', k=1) == {'chunks': [CHUNKS[0]]}
+
+    _write_index(courses_dir, ['новый чанк', *CHUNKS[1:]])
+    for name in ('faiss.index', 'rag_chunks.json'):
+        os.utime(courses_dir / name, ns=(1, 1))
+
+    assert vector_search('e0', k=1) == {'chunks': ['новый чанк']}
+
+
+def test_missing_index_raises_after_cached_load(courses_dir):
+    warmup()
+    (courses_dir / 'faiss.index').unlink()
+
+    with pytest.raises(RuntimeError, match='FAISS index is missing'):
+        vector_search('e0', k=1)
+
+
+@pytest.mark.parametrize('index_type', INDEX_TYPES)
+def test_index_type_search_params_are_applied(courses_dir, index_type):
+    vectors = bench_index.synthetic_vectors(300, 8)
+    index, meta = create_faiss_index(vectors, index_type, nlist=4, nprobe=4)
+    faiss.write_index(index, str(courses_dir / 'faiss.index'))
+    (courses_dir / 'rag_chunks.json').write_text(
+        json.dumps({'chunks': [str(idx) for idx in range(len(vectors))]}),
+        encoding='utf-8',
+    )
+    (courses_dir / 'index_meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+    loaded, _ = vector_search_module._load_search_data()
+
+    assert meta['index_type'] == index_type
+    if index_type in ('ivf', 'ivfpq'):
+        assert faiss.extract_index_ivf(loaded).nprobe == 4
+    if index_type == 'hnsw':
+        assert loaded.hnsw.efSearch == meta['search_params']['efSearch']
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import importlib
+import time
+
+import faiss
+import numpy as np
+import pytest
+
+from src.api import vector_search, vector_search_many
+from src.api._bm25 import tokenize
+from src.prepare_data import write_bm25_index, write_chunk_store
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+vector_search_module = importlib.import_module('src.api.vector_search')
+vector_search_many_module = importlib.import_module('src.api.vector_search_many')
+SEARCH_PATHS = (
+    'FAISS_INDEX_PATH',
+    'RAG_CHUNKS_PATH',
+    'INDEX_META_PATH',
+    'RAG_CHUNKS_BLOB_PATH',
+    'RAG_CHUNKS_OFFSETS_PATH',
+    'FAISS_VECTORS_PATH',
+    'BM25_INDEX_PATH',
+)
+
+CHUNKS = [
+    'Теория вероятностей. Лектор: Иванов. Лекции в аудитории П9.',
+    'Машинное обучение. Лектор: Соколов. Задания сдаются в anytask.',
+    'Методы оптимизации. Литература: Нестеров, Поляк.',
+    'Философия науки. Семинары по средам.',
+]
+
+
+def _embed(query: str) -> list[float]:
+    """Every query embeds next to chunk 3, so vector search ranks it first."""
+    return np.eye(len(CHUNKS), dtype=np.float32)[3].tolist()
+
+
+@pytest.fixture
+def courses_dir(tmp_path, monkeypatch):
+    for name in SEARCH_PATHS:
+        path = getattr(vector_search_module, name)
+        monkeypatch.setattr(vector_search_module, name, tmp_path / path.name)
+    index = faiss.IndexFlatL2(len(CHUNKS))
+    index.add(np.eye(len(CHUNKS), dtype=np.float32))
+    faiss.write_index(index, str(tmp_path / 'faiss.index'))
+    write_chunk_store(
+        CHUNKS, tmp_path / 'rag_chunks.bin', tmp_path / 'rag_chunks_offsets.npy'
+    )
+    write_bm25_index(CHUNKS, tmp_path / 'bm25.npz')
+    monkeypatch.setattr(vector_search_module, '_embed_query', _embed)
+    monkeypatch.setattr(
+        vector_search_many_module,
+        'get_embeddings_many',
+        lambda payload: [_embed(query) for query in payload['input']],
+    )
+    vector_search_module.clear_search_cache()
+    yield tmp_path
+    vector_search_module.clear_search_cache()
+
+
+def test_tokenize_folds_case_and_word_endings():
+    assert tokenize('Лекции по Теории вероятностей, ауд. П9!') == tokenize(
+        'лекция по теория вероятности ауд п9'
+    )
+    assert tokenize('Ёжик') == ['ежик']
+
+
+def test_lexical_mode_finds_exact_terms_without_embeddings(courses_dir, monkeypatch):
+    def _no_network(query: str) -> list[float]:
+        raise RuntimeError('embeddings endpoint is down')
+
+    monkeypatch.setattr(vector_search_module, '_embed_query', _no_network)
+
+    assert vector_search('аудитория П9', k=2, mode='lexical') == {'chunks': [CHUNKS[0]]}
+    assert vector_search('anytask', k=2, mode='lexical') == {'chunks': [CHUNKS[1]]}
+    assert vector_search('Лектор Соколова', k=1, mode='lexical') == {
+        'chunks': [CHUNKS[1]]
+    }
+    assert vector_search('квантовая химия', k=2, mode='lexical') == {'chunks': []}
+
+
+def test_lexical_mode_does_not_load_faiss_index(courses_dir, monkeypatch):
+    (courses_dir / 'faiss.index').unlink()
+
+    assert vector_search('Нестеров', k=3, mode='lexical') == {'chunks': [CHUNKS[2]]}
+
+
+def test_hybrid_mode_fuses_vector_and_lexical_ranks(courses_dir):
+    # vector ranking puts chunk 3 first, BM25 puts chunk 1 first
+    result = vector_search('Соколов anytask', k=4, mode='hybrid')
+    vector_only = vector_search('Соколов anytask', k=4, mode='vector')
+
+    assert vector_only['chunks'][0] == CHUNKS[3]
+    assert set(result['chunks']) == set(CHUNKS)
+    assert result['chunks'][:2] == [CHUNKS[1], CHUNKS[3]]
+
+
+def test_fuse_ranks_uses_reciprocal_ranks():
+    fused = vector_search_module._fuse_ranks([[0, 1], [1, 2]], k=3)
+
+    assert fused == [1, 0, 2]
+    assert vector_search_module._fuse_ranks([[0, 1], [1, 2]], k=1) == [1]
+
+
+def test_default_mode_and_invalid_mode(courses_dir, monkeypatch):
+    monkeypatch.setattr(vector_search_module, 'SEARCH_MODE', 'lexical')
+
+    assert vector_search('П9', k=1) == {'chunks': [CHUNKS[0]]}
+    with pytest.raises(ValueError, match='mode must be one of'):
+        vector_search('П9', k=1, mode='bm25')
+
+
+def test_vector_search_many_supports_modes(courses_dir):
+    queries = ['П9', '', 'Поляк']
+
+    for mode in vector_search_module.SEARCH_MODES:
+        expected = [vector_search(query, k=2, mode=mode)['chunks'] for query in queries]
+        assert vector_search_many(queries, k=2, mode=mode) == {'chunks': expected}
+
+
+def test_missing_bm25_index_raises(courses_dir):
+    (courses_dir / 'bm25.npz').unlink()
+
+    with pytest.raises(RuntimeError, match='BM25 index is missing'):
+        vector_search('П9', k=1, mode='lexical')
+
+
+def test_lexical_search_is_submillisecond(courses_dir):
+    vector_search('аудитория П9', k=2, mode='lexical')
+    timings = []
+    for _ in range(50):
+        start = time.perf_counter()
+        vector_search('аудитория П9', k=2, mode='lexical')
+        timings.append(time.perf_counter() - start)
+
+    assert sorted(timings)[len(timings) // 2] < 1e-3
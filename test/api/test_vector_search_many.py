@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import importlib
+import json
+
+import faiss
+import numpy as np
+import pytest
+
+from src.api import vector_search, vector_search_many
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+vector_search_module = importlib.import_module('src.api.vector_search')
+SEARCH_PATHS = (
+    'FAISS_INDEX_PATH',
+    'RAG_CHUNKS_PATH',
+    'INDEX_META_PATH',
+    'RAG_CHUNKS_BLOB_PATH',
+    'RAG_CHUNKS_OFFSETS_PATH',
+    'FAISS_VECTORS_PATH',
+)
+vector_search_many_module = importlib.import_module('src.api.vector_search_many')
+
+CHUNKS = ['лектор Иванов', 'расписание П9', 'литература Боровков', 'anytask']
+
+
+def _embed(query: str) -> list[float]:
+    """Query 'e<i>' embeds to i-th basis vector."""
+    return np.eye(len(CHUNKS), dtype=np.float32)[int(query[1:])].tolist()
+
+
+@pytest.fixture
+def embed_calls(tmp_path, monkeypatch) -> list[list[str]]:
+    vectors = np.eye(len(CHUNKS), dtype=np.float32)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / 'faiss.index'))
+    (tmp_path / 'rag_chunks.json').write_text(
+        json.dumps({'chunks': CHUNKS}, ensure_ascii=False), encoding='utf-8'
+    )
+    for name in SEARCH_PATHS:
+        path = getattr(vector_search_module, name)
+        monkeypatch.setattr(vector_search_module, name, tmp_path / path.name)
+    monkeypatch.setattr(vector_search_module, '_embed_query', _embed)
+
+    calls: list[list[str]] = []
+
+    def _embed_many(payload: dict) -> list[list[float]]:
+        calls.append(payload['input'])
+        return [_embed(query) for query in payload['input']]
+
+    monkeypatch.setattr(vector_search_many_module, 'get_embeddings_many', _embed_many)
+    vector_search_module.clear_search_cache()
+    yield calls
+    vector_search_module.clear_search_cache()
+
+
+def test_vector_search_many_matches_single_queries(embed_calls):
+    queries = ['e2', 'e0', 'e3', 'e2']
+
+    result = vector_search_many(queries, k=2)
+
+    assert result == {
+        'chunks': [vector_search(query, k=2)['chunks'] for query in queries]
+    }
+    assert embed_calls == [queries]
+
+
+def test_vector_search_many_skips_empty_queries(embed_calls):
+    result = vector_search_many(['', 'e1'], k=10)
+
+    assert result['chunks'][0] == []
+    assert len(result['chunks'][1]) == len(CHUNKS)
+    assert result['chunks'][1][0] == CHUNKS[1]
+    assert embed_calls == [['e1']]
+
+
+def test_vector_search_many_without_queries_does_not_embed(embed_calls):
+    assert vector_search_many([], k=2) == {'chunks': []}
+    assert vector_search_many(['e1'], k=0) == {'chunks': [[]]}
+    assert embed_calls == []
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import importlib
+import json
+
+import faiss
+import numpy as np
+import pytest
+
+import src.bench_index as bench_index
+from src.api._chunks import ChunkStore, MmapFlatIndex
+from src.prepare_data import (
+    INDEX_TYPES,
+    create_faiss_index,
+    write_chunk_store,
+    write_faiss_index,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+vector_search_module = importlib.import_module('src.api.vector_search')
+SEARCH_PATHS = (
+    'FAISS_INDEX_PATH',
+    'RAG_CHUNKS_PATH',
+    'INDEX_META_PATH',
+    'RAG_CHUNKS_BLOB_PATH',
+    'RAG_CHUNKS_OFFSETS_PATH',
+    'FAISS_VECTORS_PATH',
+)
+
+
+@pytest.fixture
+def courses_dir(tmp_path, monkeypatch):
+    for name in SEARCH_PATHS:
+        path = getattr(vector_search_module, name)
+        monkeypatch.setattr(vector_search_module, name, tmp_path / path.name)
+    vector_search_module.clear_search_cache()
+    yield tmp_path
+    vector_search_module.clear_search_cache()
+
+
+def _write_corpus(courses_dir, index_type: str, vectors, chunks) -> faiss.Index:
+    """Write index and chunks like build_faiss_index, return in-memory copy."""
+    index, meta = create_faiss_index(vectors, index_type, nlist=8)
+    expected = faiss.deserialize_index(faiss.serialize_index(index))
+    write_faiss_index(index, meta, vectors, courses_dir / 'faiss.index')
+    write_chunk_store(
+        chunks, courses_dir / 'rag_chunks.bin', courses_dir / 'rag_chunks_offsets.npy'
+    )
+    (courses_dir / 'index_meta.json').write_text(json.dumps(meta), encoding='utf-8')
+    faiss.ParameterSpace().set_index_parameters(
+        expected, ','.join(f'{k}={v}' for k, v in meta['search_params'].items())
+    )
+    return expected
+
+
+def test_chunk_store_reads_chunks_lazily(courses_dir):
+    chunks = ['Лектор: Иванов', '', 'Аудитория П9 😀', 'anytask']
+    write_chunk_store(
+        chunks, courses_dir / 'rag_chunks.bin', courses_dir / 'rag_chunks_offsets.npy'
+    )
+
+    loaded = vector_search_module._load_chunks()
+
+    assert isinstance(loaded, ChunkStore)
+    assert list(loaded) == chunks
+    assert loaded[-1] == 'anytask'
+    assert loaded[1:3] == chunks[1:3]
+    with pytest.raises(IndexError):
+        loaded[len(chunks)]
+
+
+@pytest.mark.parametrize('index_type', INDEX_TYPES)
+def test_mapped_index_matches_in_memory_index(courses_dir, index_type):
+    vectors = bench_index.synthetic_vectors(500, 16)
+    queries = bench_index.sample_queries(vectors, 10)
+    chunks = [f'chunk {idx}' for idx in range(len(vectors))]
+    expected = _write_corpus(courses_dir, index_type, vectors, chunks)
+
+    index, loaded_chunks = vector_search_module._load_search_data()
+
+    if index_type == 'flat':
+        assert isinstance(index, MmapFlatIndex)
+    if index_type in ('ivf', 'ivfpq'):
+        invlists = faiss.downcast_InvertedLists(faiss.extract_index_ivf(index).invlists)
+        assert isinstance(invlists, faiss.OnDiskInvertedLists)
+    assert list(loaded_chunks) == chunks
+    found = vector_search_module._search(index, loaded_chunks, queries, 5)
+    _, expected_ids = expected.search(queries, 5)
+    assert found == [[chunks[idx] for idx in row] for row in expected_ids]
+
+
+def test_rebuild_keeps_old_mapping_readable(courses_dir):
+    vectors = bench_index.synthetic_vectors(200, 8)
+    chunks = [f'old {idx}' for idx in range(len(vectors))]
+    _write_corpus(courses_dir, 'ivf', vectors, chunks)
+    old_index, old_chunks = vector_search_module._load_search_data()
+
+    _write_corpus(courses_dir, 'ivf', vectors[::-1].copy(), ['new'] * len(vectors))
+    new_index, new_chunks = vector_search_module._load_search_data()
+
+    assert new_index is not old_index
+    assert old_chunks[0] == 'old 0'
+    assert new_chunks[0] == 'new'
+    _, ids = old_index.search(np.ascontiguousarray(vectors[:1]), 1)
+    assert ids[0][0] == 0
+
+
+def test_rebuild_writes_new_lists_file_and_drops_older_ones(courses_dir):
+    vectors = bench_index.synthetic_vectors(200, 8)
+    chunks = [f'chunk {idx}' for idx in range(len(vectors))]
+    names = []
+    for _ in range(3):
+        _write_corpus(courses_dir, 'ivf', vectors, chunks)
+        meta = json.loads((courses_dir / 'index_meta.json').read_text(encoding='utf-8'))
+        names.append(meta['ivfdata'])
+
+    assert len(set(names)) == 3
+    assert sorted(path.name for path in courses_dir.glob('*.ivfdata')) == sorted(
+        names[1:]
+    )
+    index, _ = vector_search_module._load_search_data()
+    _, ids = index.search(np.ascontiguousarray(vectors[:1]), 1)
+    assert ids[0][0] == 0
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import importlib
+import json
+
+import numpy as np
+import pytest
+
+import src.prepare_data as prepare_data
+from src.api import vector_search, vector_search_many
+from src.prepare_data import (
+    create_faiss_index,
+    write_bm25_index,
+    write_chunk_store,
+    write_faiss_index,
+    write_query_results,
+)
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+vector_search_module = importlib.import_module('src.api.vector_search')
+vector_search_many_module = importlib.import_module('src.api.vector_search_many')
+SEARCH_PATHS = (
+    'FAISS_INDEX_PATH',
+    'RAG_CHUNKS_PATH',
+    'INDEX_META_PATH',
+    'RAG_CHUNKS_BLOB_PATH',
+    'RAG_CHUNKS_OFFSETS_PATH',
+    'FAISS_VECTORS_PATH',
+    'BM25_INDEX_PATH',
+    'QUERY_RESULTS_PATH',
+)
+
+CHUNKS = [
+    'Теория вероятности — Лектор: Иванов',
+    'Машинное обучение — О курсе: лектор Соколов',
+    'Методы оптимизации — Литература',
+    'Философия науки — Семинары',
+]
+TEMPLATES = ['Теория вероятности Лектор', 'Методы оптимизации литература']
+# template i embeds next to chunk 2 * i
+EMBEDDINGS = {
+    TEMPLATES[0]: [1.0, 0.1, 0.0, 0.0],
+    TEMPLATES[1]: [0.0, 0.0, 1.0, 0.1],
+    'кто ведет семинары': [0.0, 0.0, 0.1, 1.0],
+}
+
+
+@pytest.fixture
+def embedded(tmp_path, monkeypatch) -> list[str]:
+    """Build course index with precomputed templates, return embedded queries."""
+    for name in SEARCH_PATHS:
+        path = getattr(vector_search_module, name)
+        monkeypatch.setattr(vector_search_module, name, tmp_path / path.name)
+
+    embedded: list[str] = []
+
+    def _embed_many(payload: dict) -> list[list[float]]:
+        embedded.extend(payload['input'])
+        return [EMBEDDINGS[query] for query in payload['input']]
+
+    def _embed_query(query: str) -> list[float]:
+        embedded.append(query)
+        return EMBEDDINGS[query]
+
+    monkeypatch.setattr(prepare_data, 'get_embeddings_many', _embed_many)
+    monkeypatch.setattr(vector_search_many_module, 'get_embeddings_many', _embed_many)
+    monkeypatch.setattr(vector_search_module, '_embed_query', _embed_query)
+
+    vectors = np.eye(len(CHUNKS), dtype=np.float32)
+    index, meta = create_faiss_index(vectors, 'flat')
+    meta['build_id'] = 'build-1'
+    write_query_results(
+        index, meta, TEMPLATES, results_path=tmp_path / 'query_results.json'
+    )
+    write_faiss_index(index, meta, vectors, tmp_path / 'faiss.index')
+    write_chunk_store(
+        CHUNKS, tmp_path / 'rag_chunks.bin', tmp_path / 'rag_chunks_offsets.npy'
+    )
+    write_bm25_index(CHUNKS, tmp_path / 'bm25.npz')
+    (tmp_path / 'index_meta.json').write_text(json.dumps(meta), encoding='utf-8')
+    embedded.clear()
+
+    vector_search_module.clear_search_cache()
+    yield embedded
+    vector_search_module.clear_search_cache()
+
+
+def test_query_results_store_ids_for_templates(embedded, tmp_path):
+    payload = json.loads((tmp_path / 'query_results.json').read_text(encoding='utf-8'))
+
+    assert payload['build_id'] == 'build-1'
+    assert payload['queries'][TEMPLATES[0]][:2] == [0, 1]
+    assert payload['queries'][TEMPLATES[1]][:2] == [2, 3]
+    assert all(len(ids) == len(CHUNKS) for ids in payload['queries'].values())
+
+
+@pytest.mark.parametrize('mode', ['vector', 'hybrid'])
+def test_template_query_is_served_without_embedding(embedded, mode):
+    result = vector_search(TEMPLATES[0], k=2, mode=mode)
+
+    assert result['chunks'][0] == CHUNKS[0]
+    assert embedded == []
+
+
+def test_precomputed_results_match_search(embedded, monkeypatch):
+    precomputed = vector_search(TEMPLATES[1], k=3)
+    monkeypatch.setattr(vector_search_module, '_load_query_results', dict)
+
+    assert vector_search(TEMPLATES[1], k=3) == precomputed
+    assert embedded == [TEMPLATES[1]]
+
+
+def test_other_queries_are_embedded(embedded):
+    result = vector_search_many([TEMPLATES[0], 'кто ведет семинары', TEMPLATES[1]], k=1)
+
+    assert result == {'chunks': [[CHUNKS[0]], [CHUNKS[3]], [CHUNKS[2]]]}
+    assert embedded == ['кто ведет семинары']
+
+
+def test_rebuilt_index_invalidates_precomputed_results(embedded, tmp_path):
+    vector_search(TEMPLATES[0], k=1)
+    meta_path = tmp_path / 'index_meta.json'
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    meta_path.write_text(
+        json.dumps({**meta, 'build_id': 'rebuilt-2'}), encoding='utf-8'
+    )
+
+    assert vector_search(TEMPLATES[0], k=1) == {'chunks': [CHUNKS[0]]}
+    assert embedded == [TEMPLATES[0]]
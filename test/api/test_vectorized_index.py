@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.api._columns import load_students_columns
+from src.api._index import StudentsIndex, get_students_index
+from src.api._vectorized import ColumnarIndex
+from src.prepare_data import write_students_columns
+
+pytestmark = [pytest.mark.api, pytest.mark.unit]
+
+SUBJECTS = ['A', 'B', 'C', 'D']
+
+
+def _random_rows(count: int, seed: int) -> list[dict[str, str]]:
+    rng = random.Random(seed)
+    return [
+        {
+            'student_name': f'student_{rng.randrange(count):06d}',
+            'subject_name': rng.choice(SUBJECTS[:3]),
+            'score': f'{rng.uniform(3.0, 5.0):.1f}',
+        }
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize(('count', 'seed'), [(50, 1), (5_000, 2), (20_000, 3)])
+def test_columnar_index_matches_python_index(tmp_path, count: int, seed: int):
+    rows = _random_rows(count, seed)
+    columns = load_students_columns(
+        write_students_columns(rows, tmp_path, source_path=None)
+    )
+
+    expected = StudentsIndex.from_rows(rows)
+    actual = ColumnarIndex(columns)
+
+    assert actual.avg_overall_score() == expected.avg_overall_score()
+    for subject_name in SUBJECTS:
+        assert actual.avg_score(subject_name) == expected.avg_score(subject_name)
+        for k in (1, 3, 10, 500):
+            assert actual.top_students(subject_name, k) == expected.top_students(
+                subject_name, k
+            )
+
+
+def test_get_students_index_selects_vectorized_path_for_columns(tmp_path):
+    rows = _random_rows(10, 0)
+    columns = load_students_columns(
+        write_students_columns(rows, tmp_path, source_path=None)
+    )
+
+    assert isinstance(get_students_index(columns), ColumnarIndex)
+    assert isinstance(get_students_index(rows), StudentsIndex)
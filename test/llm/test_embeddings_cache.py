@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+
+import src.utils as utils
+from src.utils import clear_embeddings_cache, get_embeddings, get_embeddings_many
+
+pytestmark = [pytest.mark.llm, pytest.mark.unit]
+
+
+@pytest.fixture
+def requests_sent(monkeypatch) -> list[dict]:
+    """Replace embeddings endpoint with a local one that records payloads."""
+    sent: list[dict] = []
+
+    def _post_embeddings(payload: dict, **kwargs) -> dict:
+        sent.append(dict(payload))
+        texts = payload['input']
+        if isinstance(texts, str):
+            return {'data': [{'embedding': [float(len(texts)), 0.5]}]}
+        # endpoint may return items out of order, index restores it
+        return {
+            'data': [
+                {'index': idx, 'embedding': [float(len(text)), 0.5]}
+                for idx, text in reversed(list(enumerate(texts)))
+            ]
+        }
+
+    fake = types.SimpleNamespace(
+        config=types.SimpleNamespace(default_embedding_model='default-model'),
+        post_embeddings=_post_embeddings,
+    )
+    monkeypatch.setitem(sys.modules, 'src_example', fake)
+    monkeypatch.setattr(utils, 'EMBEDDINGS_CACHE_DB', None)
+    clear_embeddings_cache()
+    yield sent
+    clear_embeddings_cache()
+
+
+def test_repeated_input_is_embedded_once(requests_sent):
+    first = get_embeddings({'input': 'Теория вероятности Лектор'})
+    second = get_embeddings({'input': 'Теория вероятности Лектор'})
+
+    assert first == second == [25.0, 0.5]
+    assert len(requests_sent) == 1
+
+
+def test_cache_is_keyed_by_model_and_exact_input(requests_sent):
+    get_embeddings({'input': 'лектор'})
+    get_embeddings({'input': 'лектор '})
+    get_embeddings({'input': 'лектор', 'model': 'other-model'})
+    get_embeddings({'input': 'лектор', 'model': 'default-model'})
+
+    assert len(requests_sent) == 3
+
+
+def test_cache_evicts_least_recently_used(requests_sent, monkeypatch):
+    monkeypatch.setattr(utils, 'EMBEDDINGS_CACHE_SIZE', 2)
+    for text in ['a', 'b', 'a', 'c', 'a', 'b']:
+        get_embeddings({'input': text})
+
+    assert [payload['input'] for payload in requests_sent] == ['a', 'b', 'c', 'b']
+
+
+def test_expired_embedding_is_fetched_again(requests_sent, monkeypatch):
+    monkeypatch.setattr(utils, 'EMBEDDINGS_CACHE_TTL', 60.0)
+    now = [1_000.0]
+    monkeypatch.setattr(utils.time, 'time', lambda: now[0])
+    get_embeddings({'input': 'расписание'})
+    now[0] += 59
+    get_embeddings({'input': 'расписание'})
+    now[0] += 2
+    get_embeddings({'input': 'расписание'})
+
+    assert len(requests_sent) == 2
+
+
+def test_disk_cache_survives_restart(requests_sent, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'EMBEDDINGS_CACHE_DB', tmp_path / 'embeddings.db')
+    embedding = get_embeddings({'input': 'Оптимизация Лектор'})
+
+    clear_embeddings_cache()
+
+    assert get_embeddings({'input': 'Оптимизация Лектор'}) == embedding
+    assert len(requests_sent) == 1
+
+
+def test_many_inputs_are_sent_in_one_request(requests_sent):
+    get_embeddings({'input': 'bb'})
+
+    embeddings = get_embeddings_many({'input': ['a', 'bb', 'ccc', 'a']})
+
+    assert embeddings == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+    assert [payload['input'] for payload in requests_sent] == ['bb', ['a', 'ccc']]
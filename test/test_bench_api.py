@@ -0,0 +1,84 @@
+"""Tests for src.api benchmark harness."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import src.api._common as common
+import src.bench_api as bench_api
+
+pytestmark = [pytest.mark.unit]
+
+
+def test_run_benchmarks_reports_cold_and_warm_stats(tmp_path, monkeypatch):
+    """Report has p50/p95/throughput for each function, size and mode."""
+    monkeypatch.setattr(bench_api, 'SYNTHETIC_DIR', tmp_path)
+    students_csv = common.STUDENTS_CSV
+
+    report = bench_api.run_benchmarks(
+        sizes=[100, 1000], formats=['columns', 'csv'], cold_repeats=2, warm_repeats=5
+    )
+
+    results = report['results']
+    assert len(results) == 2 * 2 * len(bench_api.BENCH_FUNCTIONS) * 2
+    assert all(item['p50_ms'] <= item['p95_ms'] for item in results)
+    assert all(item['throughput_per_s'] > 0 for item in results)
+    assert common.STUDENTS_CSV == students_csv
+
+
+def test_summary_has_no_throughput_for_zero_time():
+    """Report is strict JSON even when a timer did not advance."""
+    summary = bench_api._summary([0.0, 0.0])
+
+    assert summary['throughput_per_s'] is None
+    assert json.loads(json.dumps(summary, allow_nan=False)) == summary
+
+
+def test_compare_with_baseline_flags_only_slower_results():
+    """Only results slower than threshold times baseline are reported."""
+    baseline = [
+        {
+            'function': 'f',
+            'rows': 100,
+            'format': 'columns',
+            'mode': 'warm',
+            'p50_ms': 1.0,
+        },
+        {
+            'function': 'g',
+            'rows': 100,
+            'format': 'columns',
+            'mode': 'warm',
+            'p50_ms': 1.0,
+        },
+    ]
+    results = [
+        {
+            'function': 'f',
+            'rows': 100,
+            'format': 'columns',
+            'mode': 'warm',
+            'p50_ms': 1.1,
+        },
+        {
+            'function': 'g',
+            'rows': 100,
+            'format': 'columns',
+            'mode': 'warm',
+            'p50_ms': 2.0,
+        },
+        {
+            'function': 'h',
+            'rows': 100,
+            'format': 'columns',
+            'mode': 'warm',
+            'p50_ms': 9.0,
+        },
+    ]
+
+    regressions = bench_api.compare_with_baseline(results, baseline, threshold=1.25)
+
+    assert [item['function'] for item in regressions] == ['g']
+    assert regressions[0]['ratio'] == 2.0
@@ -0,0 +1,47 @@
+"""Tests for FAISS index types benchmark."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import src.bench_index as bench_index
+from src.prepare_data import INDEX_TYPES, create_faiss_index, write_faiss_index
+
+pytestmark = [pytest.mark.unit]
+
+
+def test_bench_index_types_reports_recall_against_flat():
+    """Flat search is the baseline, every type gets recall and latency."""
+    vectors = bench_index.synthetic_vectors(2_000, 32)
+    queries = bench_index.sample_queries(vectors, 20)
+
+    results = bench_index.bench_index_types(vectors, queries, k=5, nlist=16)
+
+    assert [item['index_type'] for item in results] == list(INDEX_TYPES)
+    by_type = {item['index_type']: item for item in results}
+    assert by_type['flat']['recall_at_5'] == 1.0
+    assert by_type['ivf']['params'] == {'nlist': 16, 'nprobe': 8}
+    assert by_type['hnsw']['recall_at_5'] > 0.8
+    assert all(0 <= item['recall_at_5'] <= 1 for item in results)
+    assert all(item['p50_ms'] <= item['p95_ms'] for item in results)
+
+
+def test_corpus_vectors_read_embeddings_of_any_index_type(tmp_path):
+    """IVF indexes cannot reconstruct vectors, stored embeddings are read."""
+    vectors = bench_index.synthetic_vectors(200, 8)
+    index, meta = create_faiss_index(vectors, 'ivf', nlist=4)
+    write_faiss_index(index, meta, vectors, tmp_path / 'faiss.index')
+    with (tmp_path / 'embeddings.npz').open('wb') as file:
+        np.savez(file, vectors=vectors)
+
+    assert (bench_index.corpus_vectors(tmp_path) == vectors).all()
+
+
+def test_corpus_vectors_fall_back_to_flat_vectors(tmp_path):
+    vectors = bench_index.synthetic_vectors(20, 4)
+    np.save(tmp_path / 'faiss_vectors.npy', vectors)
+
+    assert (bench_index.corpus_vectors(tmp_path) == vectors).all()
+    with pytest.raises(RuntimeError):
+        bench_index.corpus_vectors(tmp_path / 'missing')
@@ -0,0 +1,87 @@
+"""Tests for section-aware course chunking."""
+
+from __future__ import annotations
+
+import pytest
+
+import src.prepare_data as prepare_data
+from src.prepare_data import MAX_CHUNK_CHARS, split_course_page
+
+pytestmark = [pytest.mark.unit]
+
+PAGE = """Машинное обучение
+
+О курсе
+
+Лектор: Соколов Евгений Андреевич
+Лекции проходят по пятницам в ауд. П8а.
+
+Семинарская часть:
+
+| Группа | Преподаватель |
+| :--- | :--- |
+| 231 | Морозов Никита |
+
+ПР — средняя оценка за самостоятельные работы
+
+## Литература
+
+- Bishop C. Pattern Recognition and Machine Learning.
+"""
+
+
+def test_course_page_is_split_by_sections():
+    """Short standalone lines and markdown headings start sections."""
+    chunks = split_course_page(PAGE, 'ml.md')
+
+    assert [metadata['section'] for _, metadata in chunks] == [
+        'О курсе',
+        'Семинарская часть',
+        'Литература',
+    ]
+    assert all(metadata['title'] == 'Машинное обучение' for _, metadata in chunks)
+    assert all(metadata['file'] == 'ml.md' for _, metadata in chunks)
+    assert chunks[0][0] == (
+        'Машинное обучение — О курсе\n\n'
+        'Лектор: Соколов Евгений Андреевич\n'
+        'Лекции проходят по пятницам в ауд. П8а.'
+    )
+    # definition line with a dash stays in its section
+    assert chunks[1][0].endswith('ПР — средняя оценка за самостоятельные работы')
+
+
+def test_text_before_first_section_keeps_title():
+    chunks = split_course_page('Философия науки\nЛектор: Шиповалова\n', 'phil.md')
+
+    assert chunks == [
+        (
+            'Философия науки\n\nЛектор: Шиповалова',
+            {'file': 'phil.md', 'title': 'Философия науки', 'section': ''},
+        )
+    ]
+
+
+def test_long_section_is_split_and_table_header_repeated():
+    rows = [f'| 0{idx}.01 | Лекция {idx} {"x" * 40} |' for idx in range(30)]
+    page = '\n'.join(
+        ['Курс', '', 'Лекции', '', '| Дата | Тема |', '| :-- | :-- |', *rows]
+    )
+
+    chunks = split_course_page(page, 'course.md', max_chars=400)
+    bodies = [chunk.split('\n\n', 1)[1] for chunk, _ in chunks]
+
+    assert len(chunks) > 1
+    assert all(len(body) <= 400 for body in bodies)
+    assert all(body.startswith('| Дата | Тема |\n| :-- | :-- |\n') for body in bodies)
+    assert [row for body in bodies for row in body.splitlines()[2:]] == rows
+
+
+def test_course_files_are_chunked_below_size_cap():
+    """Real course pages give several chunks per file with metadata."""
+    chunks, metadata = prepare_data._load_course_chunks()
+    files = sorted(path.name for path in prepare_data.COURSES_DIR.glob('*.md'))
+
+    assert len(chunks) == len(metadata) > len(files)
+    assert sorted({item['file'] for item in metadata}) == files
+    assert all(len(chunk.split('\n\n', 1)[1]) <= MAX_CHUNK_CHARS for chunk in chunks)
+    assert prepare_data._load_markdown_chunks() == chunks
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 
-from src.prepare_data import build_students_rows
+import src.prepare_data as prepare_data
+from src.api._columns import load_students_columns
+from src.prepare_data import build_students_rows, generate_synthetic_students
 
 pytestmark = [pytest.mark.unit]
 
@@ -55,3 +61,53 @@ def test_top10_optimization_has_student_above_overall_average():
     top10_optimization = optimization_rows[:10]
 
     assert any(float(row['score']) > overall_avg_score for row in top10_optimization)
+
+
+def test_synthetic_students_do_not_depend_on_chunking(tmp_path):
+    """Chunk size and worker count must not change generated data."""
+    in_process = generate_synthetic_students(
+        200, 5, output_dir=tmp_path / 'a', workers=1, chunk_students=7
+    )
+    in_pool = generate_synthetic_students(
+        200, 5, output_dir=tmp_path / 'b', workers=2, chunk_students=64
+    )
+
+    columns_a = load_students_columns(in_process)
+    columns_b = load_students_columns(in_pool)
+    assert len(columns_a) == 400
+    assert np.array_equal(columns_a.scores, columns_b.scores)
+    assert np.array_equal(columns_a.subject_codes, columns_b.subject_codes)
+    assert 3.0 <= float(columns_a.scores.min()) <= float(columns_a.scores.max()) <= 5.0
+
+
+def test_synthetic_students_csv_matches_columns(tmp_path):
+    """CSV and columnar outputs describe the same rows."""
+    csv_path = generate_synthetic_students(
+        50, 4, output_format='csv', output_dir=tmp_path, workers=1
+    )
+    columns_dir = generate_synthetic_students(
+        50, 4, output_format='columns', output_dir=tmp_path, workers=1
+    )
+
+    with csv_path.open('r', encoding='utf-8', newline='') as file:
+        csv_rows = list(csv.DictReader(file))
+    assert csv_rows == list(load_students_columns(columns_dir))
+
+
+def test_synthetic_chunks_are_submitted_in_bounded_window():
+    """Only window chunks run ahead of the consumer, results keep task order."""
+    submitted: list[int] = []
+
+    def _square(task: int) -> int:
+        submitted.append(task)
+        return task * task
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = prepare_data._map_bounded(executor, _square, list(range(10)), 3)
+        first = next(results)
+        ahead = len(submitted)
+        rest = list(results)
+
+    assert first == 0
+    assert ahead <= 3
+    assert [first, *rest] == [task * task for task in range(10)]
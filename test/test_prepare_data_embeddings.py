@@ -0,0 +1,169 @@
+"""Tests for batched and incremental course chunk embedding."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import src.prepare_data as prepare_data
+
+pytestmark = [pytest.mark.unit]
+
+
+@pytest.fixture
+def batches_sent(monkeypatch) -> list[list[str]]:
+    """Local embeddings endpoint: 'chunk <i>' embeds to [i, 0]."""
+    sent: list[list[str]] = []
+    lock = threading.Lock()
+
+    def _embed_many(payload: dict) -> list[list[float]]:
+        with lock:
+            sent.append(payload['input'])
+        # later batches answer first, order must not depend on it
+        time.sleep(0.01 / (len(sent) + 1))
+        return [[float(text.split()[1]), 0.0] for text in payload['input']]
+
+    monkeypatch.setattr(prepare_data, 'get_embeddings_many', _embed_many)
+    monkeypatch.setattr(prepare_data, 'EMBEDDING_RETRY_DELAY', 0.0)
+    return sent
+
+
+def test_embeddings_are_batched_and_keep_chunk_order(batches_sent):
+    chunks = [f'chunk {idx}' for idx in range(10)]
+
+    embeddings = prepare_data._extract_embeddings(
+        chunks, batch_size=3, workers=4, rate_limit=0
+    )
+
+    assert embeddings == [[float(idx), 0.0] for idx in range(10)]
+    assert sorted(len(batch) for batch in batches_sent) == [1, 3, 3, 3]
+
+
+@pytest.mark.parametrize('batch_size', [0, -1])
+def test_non_positive_batch_size_is_rejected(batches_sent, batch_size):
+    with pytest.raises(ValueError, match='batch_size must be positive'):
+        prepare_data._extract_embeddings(['chunk 0'], batch_size=batch_size)
+
+    assert batches_sent == []
+
+
+def test_failed_batch_is_retried(batches_sent, monkeypatch, capsys):
+    embed_many = prepare_data.get_embeddings_many
+    failures = {'chunk 3': 2}
+
+    def _flaky(payload: dict) -> list[list[float]]:
+        first = payload['input'][0]
+        if failures.get(first):
+            failures[first] -= 1
+            raise RuntimeError('get_embeddings // 429 Too Many Requests')
+        return embed_many(payload)
+
+    monkeypatch.setattr(prepare_data, 'get_embeddings_many', _flaky)
+
+    embeddings = prepare_data._extract_embeddings(
+        [f'chunk {idx}' for idx in range(6)], batch_size=3, rate_limit=0
+    )
+
+    assert embeddings == [[float(idx), 0.0] for idx in range(6)]
+    assert capsys.readouterr().err.count('Embeddings batch 1 failed') == 2
+
+
+def test_failed_batches_are_reported(batches_sent, monkeypatch):
+    def _down(payload: dict) -> list[list[float]]:
+        if payload['input'][0] != 'chunk 0':
+            raise RuntimeError('get_embeddings // 503')
+        return [[0.0, 0.0]] * len(payload['input'])
+
+    monkeypatch.setattr(prepare_data, 'get_embeddings_many', _down)
+
+    with pytest.raises(RuntimeError) as exc_info:
+        prepare_data._extract_embeddings(
+            [f'chunk {idx}' for idx in range(6)], batch_size=2, rate_limit=0, retries=1
+        )
+
+    message = str(exc_info.value)
+    assert message.startswith('2 of 3 embeddings batches failed')
+    assert 'batch 1 failed after 2 attempts' in message
+    assert 'batch 2 failed after 2 attempts' in message
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    now = [100.0]
+    sleeps: list[float] = []
+    monkeypatch.setattr(prepare_data.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(prepare_data.time, 'sleep', sleeps.append)
+
+    limiter = prepare_data._RateLimiter(4.0)
+    for _ in range(3):
+        limiter.wait()
+
+    assert sleeps == [0.25, 0.5]
+
+
+@pytest.fixture
+def manifest_paths(tmp_path, monkeypatch, batches_sent):
+    monkeypatch.setattr(prepare_data, '_embedding_model', lambda: 'model-a')
+    return {'embeddings_path': tmp_path / 'embeddings.npz'}
+
+
+def test_rebuild_embeds_only_changed_chunks(batches_sent, manifest_paths):
+    chunks = [f'chunk {idx}' for idx in range(5)]
+    first = prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+    batches_sent.clear()
+
+    again = prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+    assert batches_sent == []
+    assert (again == first).all()
+
+    edited = [*chunks[:2], 'chunk 7 edited', *chunks[4:]]
+    vectors = prepare_data.embed_chunks(edited, rate_limit=0, **manifest_paths)
+
+    assert batches_sent == [['chunk 7 edited']]
+    assert vectors.tolist() == [[0.0, 0.0], [1.0, 0.0], [7.0, 0.0], [4.0, 0.0]]
+
+
+def test_removed_chunks_are_dropped_from_manifest(batches_sent, manifest_paths):
+    prepare_data.embed_chunks(['chunk 0', 'chunk 1'], rate_limit=0, **manifest_paths)
+    prepare_data.embed_chunks(['chunk 1'], rate_limit=0, **manifest_paths)
+    batches_sent.clear()
+
+    prepare_data.embed_chunks(['chunk 0', 'chunk 1'], rate_limit=0, **manifest_paths)
+
+    assert batches_sent == [['chunk 0']]
+
+
+def test_model_change_or_reembed_fetches_everything(
+    batches_sent, manifest_paths, monkeypatch
+):
+    chunks = ['chunk 0', 'chunk 1']
+    prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+    batches_sent.clear()
+
+    prepare_data.embed_chunks(chunks, reembed=True, rate_limit=0, **manifest_paths)
+    monkeypatch.setattr(prepare_data, '_embedding_model', lambda: 'model-b')
+    prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+
+    assert batches_sent == [chunks, chunks]
+
+
+def test_stored_embeddings_with_other_row_count_are_ignored(
+    batches_sent, manifest_paths
+):
+    chunks = ['chunk 0', 'chunk 1']
+    prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+    path = manifest_paths['embeddings_path']
+    with np.load(path) as arrays:
+        assert arrays['hashes'].tolist() == [
+            prepare_data._chunk_hash(chunk) for chunk in chunks
+        ]
+        stored = dict(arrays)
+    with path.open('wb') as file:
+        np.savez(file, **{**stored, 'vectors': stored['vectors'][:1]})
+    batches_sent.clear()
+
+    prepare_data.embed_chunks(chunks, rate_limit=0, **manifest_paths)
+
+    assert batches_sent == [chunks]